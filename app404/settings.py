@@ -18,6 +18,12 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["localhost", "127.0.0.
 
 TEAM_APPS = [s.strip() for s in env("TEAM_APPS", default="team1,team2,team3,team5,team6,team7,team8,team9,team10,team11,team12,team13,team14,team15").split(",") if s.strip()]
 
+# Teams whose URLs this process serves (defaults to all of TEAM_APPS). Models of every
+# TEAM_APPS entry stay installed, so a slim worker can run e.g. SERVED_TEAM_APPS=team1,team7.
+SERVED_TEAM_APPS = [s.strip() for s in env("SERVED_TEAM_APPS", default=",".join(TEAM_APPS)).split(",") if s.strip() in TEAM_APPS]
+# Import a team's URLconf/views on the first request under its prefix instead of at boot.
+LAZY_TEAM_URLS = env.bool("LAZY_TEAM_URLS", default=True)
+
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -84,6 +90,23 @@ for t in TEAM_APPS:
 
 DATABASE_ROUTERS = ["core.db_router.TeamPerAppRouter"]
 
+# Connection management for every alias (default + one per team).
+# Persistent connections are reused across requests for CONN_MAX_AGE seconds;
+# override per alias with e.g. TEAM7_CONN_MAX_AGE=0, DEFAULT_CONN_MAX_AGE=300 or
+# TEAM7_CONN_HEALTH_CHECKS=False. Django 4.2 has no connection pool; this is the reuse it offers.
+DB_CONN_MAX_AGE = env.int("DB_CONN_MAX_AGE", default=60)
+DB_CONN_HEALTH_CHECKS = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+# SQLite defaults: WAL journal and busy timeout are applied in core.db_connections.
+SQLITE_WAL = env.bool("SQLITE_WAL", default=True)
+SQLITE_BUSY_TIMEOUT_MS = env.int("SQLITE_BUSY_TIMEOUT_MS", default=5000)
+
+for alias, db in DATABASES.items():
+    db["CONN_MAX_AGE"] = env.int(f"{alias.upper()}_CONN_MAX_AGE", default=DB_CONN_MAX_AGE)
+    db["CONN_HEALTH_CHECKS"] = env.bool(f"{alias.upper()}_CONN_HEALTH_CHECKS", default=DB_CONN_HEALTH_CHECKS)
+    options = db.setdefault("OPTIONS", {})
+    if db["ENGINE"].endswith("sqlite3"):
+        options.setdefault("timeout", SQLITE_BUSY_TIMEOUT_MS / 1000)
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -120,6 +143,75 @@ JWT_REFRESH_TTL_SECONDS = env("JWT_REFRESH_TTL_SECONDS")
 JWT_COOKIE_SECURE = env.bool("JWT_COOKIE_SECURE", default=False)
 JWT_COOKIE_SAMESITE = env("JWT_COOKIE_SAMESITE", default="Lax")
 
+# Process-local cache of verified JWT principals (see core.principal_cache).
+# TTL bounds how long another worker may keep honouring a token after logout/deactivation.
+PRINCIPAL_CACHE_TTL_SECONDS = env.int("PRINCIPAL_CACHE_TTL_SECONDS", default=60)
+PRINCIPAL_CACHE_MAX_ENTRIES = env.int("PRINCIPAL_CACHE_MAX_ENTRIES", default=10000)
+
+# Gateway auth_request answers (core.gateway): upper bound for Cache-Control max-age,
+# and the key used to sign X-User-* headers (defaults to JWT_SECRET).
+GATEWAY_VERIFY_CACHE_SECONDS = env.int("GATEWAY_VERIFY_CACHE_SECONDS", default=PRINCIPAL_CACHE_TTL_SECONDS)
+GATEWAY_SIGNING_KEY = env("GATEWAY_SIGNING_KEY", default=JWT_SECRET)
+
+# team1 dictionary search backend (dotted path). Empty = FTS5 index on SQLite, icontains elsewhere.
+TEAM1_WORD_SEARCH_BACKEND = env("TEAM1_WORD_SEARCH_BACKEND", default="") or None
+
+# Shared LLM evaluation response cache (core.llm_cache), a SQLite file used by all workers.
+LLM_CACHE_ENABLED = env.bool("LLM_CACHE_ENABLED", default=True)
+LLM_CACHE_PATH = env("LLM_CACHE_PATH", default=str(BASE_DIR / "llm_cache.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = env.int("LLM_CACHE_MAX_ENTRIES", default=5000)
+LLM_CACHE_MAX_AGE_SECONDS = env.int("LLM_CACHE_MAX_AGE_SECONDS", default=7 * 24 * 3600)
+
+# team7 evaluation jobs (team7.jobs): submit-writing/speaking answer 202 and workers do the scoring.
+# Set TEAM7_EVAL_INPROCESS_WORKERS=0 when `manage.py run_evaluation_workers` runs separately.
+TEAM7_EVAL_ASYNC = env.bool("TEAM7_EVAL_ASYNC", default=True)
+TEAM7_EVAL_INPROCESS_WORKERS = env.int("TEAM7_EVAL_INPROCESS_WORKERS", default=2)
+TEAM7_EVAL_MAX_ATTEMPTS = env.int("TEAM7_EVAL_MAX_ATTEMPTS", default=3)
+# A running job is reclaimed when its worker stops renewing the lease (process died) for this long.
+TEAM7_EVAL_JOB_LEASE_SECONDS = env.int("TEAM7_EVAL_JOB_LEASE_SECONDS", default=120)
+TEAM7_EVAL_PROVIDER_LIMITS = {
+    "soniox": env.int("TEAM7_EVAL_SONIOX_CONCURRENCY", default=2),
+    "llm": env.int("TEAM7_EVAL_LLM_CONCURRENCY", default=4),
+}
+
+# team7 API request logging (team7.api_logging): buffered, written in batches by a background thread.
+# `manage.py compact_api_logs` rolls rows older than the retention into per-minute histograms.
+TEAM7_API_LOG_BUFFER_SIZE = env.int("TEAM7_API_LOG_BUFFER_SIZE", default=10000)
+TEAM7_API_LOG_BATCH_SIZE = env.int("TEAM7_API_LOG_BATCH_SIZE", default=200)
+TEAM7_API_LOG_FLUSH_MS = env.int("TEAM7_API_LOG_FLUSH_MS", default=1000)
+TEAM7_API_LOG_RETENTION_DAYS = env.int("TEAM7_API_LOG_RETENTION_DAYS", default=7)
+
+# team7 admin_health snapshot (team7.health): background refresh interval and LLM probe spacing.
+TEAM7_HEALTH_REFRESH_SECONDS = env.int("TEAM7_HEALTH_REFRESH_SECONDS", default=15)
+TEAM7_HEALTH_LLM_PROBE_SECONDS = env.int("TEAM7_HEALTH_LLM_PROBE_SECONDS", default=300)
+
+# team7 exam catalog (team7.catalog): upper bound on how long a pre-serialized payload is reused.
+TEAM7_EXAM_CATALOG_TTL = env.int("TEAM7_EXAM_CATALOG_TTL", default=600)
+
+# team15 compiled test layouts (team15.layout): shared-cache lifetime; keys are versioned by Test.updated_at.
+TEAM15_LAYOUT_CACHE_TTL = env.int("TEAM15_LAYOUT_CACHE_TTL", default=3600)
+# team15 test listing (team15.catalog): upper bound on how long the serialized listing is reused.
+TEAM15_TEST_CATALOG_TTL = env.int("TEAM15_TEST_CATALOG_TTL", default=600)
+
+# team11 assessment jobs (team11.jobs): submissions are queued and scored by a bounded worker pool.
+# Set TEAM11_ASSESSMENT_INPROCESS_WORKERS=0 when `manage.py run_assessment_workers` runs separately.
+TEAM11_ASSESSMENT_INPROCESS_WORKERS = env.int("TEAM11_ASSESSMENT_INPROCESS_WORKERS", default=2)
+TEAM11_ASSESSMENT_MAX_QUEUE = env.int("TEAM11_ASSESSMENT_MAX_QUEUE", default=500)
+TEAM11_ASSESSMENT_MAX_ATTEMPTS = env.int("TEAM11_ASSESSMENT_MAX_ATTEMPTS", default=3)
+# A running job is reclaimed when its worker stops renewing the lease (process died) for this long.
+TEAM11_ASSESSMENT_LEASE_SECONDS = env.int("TEAM11_ASSESSMENT_LEASE_SECONDS", default=120)
+# Per-process limits on upstream AI calls (team11.services.limits): concurrent calls and calls per minute.
+TEAM11_PROVIDER_CONCURRENCY = {
+    "llm": env.int("TEAM11_LLM_CONCURRENCY", default=4),
+    "transcription": env.int("TEAM11_TRANSCRIPTION_CONCURRENCY", default=2),
+}
+TEAM11_PROVIDER_RATE_PER_MINUTE = {
+    "llm": env.int("TEAM11_LLM_RATE_PER_MINUTE", default=60),
+    "transcription": env.int("TEAM11_TRANSCRIPTION_RATE_PER_MINUTE", default=30),
+}
+# Multipart speaking uploads (team11.uploads) are streamed to MEDIA_ROOT; larger files get 413.
+TEAM11_AUDIO_UPLOAD_MAX_BYTES = env.int("TEAM11_AUDIO_UPLOAD_MAX_BYTES", default=50 * 1024 * 1024)
+
 CORS_ALLOW_CREDENTIALS = True
 
 if DEBUG:
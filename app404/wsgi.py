@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app404.settings')
 
 application = get_wsgi_application()
+
+# Answer the gateway auth_request check before the full middleware stack.
+from core.gateway import GatewayVerifyApp  # noqa: E402
+
+application = GatewayVerifyApp(application)
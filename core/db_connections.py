@@ -0,0 +1,40 @@
+"""
+Connection bookkeeping for the per-team databases.
+
+`connection_created` fires every time Django really opens a connection, so
+counting it per alias shows whether CONN_MAX_AGE reuse is working. SQLite
+connections also get WAL journaling and a busy timeout here, so the team
+databases tolerate concurrent readers and a writer.
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+_open_counts = Counter()
+
+
+@receiver(connection_created)
+def _on_connection_created(sender, connection, **kwargs):
+    with _lock:
+        _open_counts[connection.alias] += 1
+
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            if getattr(settings, "SQLITE_WAL", True):
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(getattr(settings, 'SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+
+
+def connection_open_counts():
+    with _lock:
+        return dict(_open_counts)
+
+
+def reset_connection_open_counts():
+    with _lock:
+        _open_counts.clear()
@@ -0,0 +1,128 @@
+"""
+Lightweight auth check for the nginx `auth_request` hop.
+
+`GatewayVerifyApp` wraps the Django WSGI application and answers
+GATEWAY_VERIFY_PATH itself, so the check skips the middleware stack
+(sessions, CSRF, messages, ...) and URL resolution. The same view is also
+routed normally under /api/auth/gateway-verify/ for servers that do not use
+app404.wsgi. core/nginx/auth_cache.conf shows the matching gateway setup
+(auth_request plus a proxy_cache keyed on the token).
+"""
+import hashlib
+import hmac
+import time
+
+from django.conf import settings
+from django.core import signals
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import JsonResponse
+from django.utils.http import http_date
+from jwt import ExpiredSignatureError, InvalidTokenError
+
+from core.jwt_utils import decode_token
+from core.principal_cache import resolve_principal
+
+GATEWAY_VERIFY_PATH = "/api/auth/gateway-verify/"
+PRINCIPAL_HEADERS = (
+    "X-User-Id",
+    "X-User-Email",
+    "X-User-First-Name",
+    "X-User-Last-Name",
+    "X-User-Age",
+    "X-User-Expires",
+)
+
+
+def _token_from_request(request):
+    token = request.COOKIES.get("access_token")
+    if not token:
+        auth = request.META.get("HTTP_AUTHORIZATION", "")
+        if auth.startswith("Bearer "):
+            token = auth.split(" ", 1)[1].strip()
+    return token
+
+
+def sign_principal(values):
+    """HMAC over the X-User-* values so upstream apps can check they came from the gateway.
+
+    The values are signed as sent: Django MIME-encodes header values that are
+    not latin-1 (e.g. Persian names), and that encoded form is what upstream
+    apps receive and must pass to verify_principal.
+    """
+    key = getattr(settings, "GATEWAY_SIGNING_KEY", None) or settings.JWT_SECRET
+    msg = "\n".join(values).encode("utf-8")
+    return hmac.new(key.encode("utf-8"), msg, hashlib.sha256).hexdigest()
+
+
+def verify_principal(values, signature):
+    """True if `signature` matches the PRINCIPAL_HEADERS values as received."""
+    return hmac.compare_digest(sign_principal(values), signature or "")
+
+
+def _unauthorized():
+    resp = JsonResponse({"detail": "Authentication required"}, status=401)
+    resp["Cache-Control"] = "no-store"
+    return resp
+
+
+def gateway_verify(request):
+    token = _token_from_request(request)
+    if not token:
+        return _unauthorized()
+
+    try:
+        payload = decode_token(token)
+    except (ExpiredSignatureError, InvalidTokenError):
+        return _unauthorized()
+
+    user = resolve_principal(payload)
+    if user is None:
+        return _unauthorized()
+
+    exp = int(payload.get("exp") or 0)
+    principal = [
+        str(user.id),
+        user.email,
+        user.first_name or "",
+        user.last_name or "",
+        str(user.age or ""),
+        str(exp),
+    ]
+
+    resp = JsonResponse({"ok": True})
+    for name, value in zip(PRINCIPAL_HEADERS, principal):
+        resp[name] = value
+    # Read back: the stored values are the (possibly MIME-encoded) ones on the wire.
+    resp["X-User-Signature"] = sign_principal([resp[name] for name in PRINCIPAL_HEADERS])
+
+    # The gateway may reuse this answer until the token expires, but never longer
+    # than GATEWAY_VERIFY_CACHE_SECONDS so a logout is honoured reasonably fast.
+    # It is per user, so other caches must not store it (private); nginx's own
+    # auth cache goes by X-Accel-Expires and the per-token key set in
+    # core/nginx/auth_verify.conf, with Vary kept for anything keyed by URL.
+    now = int(time.time())
+    max_age = max(0, min(exp - now, settings.GATEWAY_VERIFY_CACHE_SECONDS))
+    resp["Cache-Control"] = f"private, max-age={max_age}"
+    resp["Vary"] = "Cookie, Authorization"
+    resp["X-Accel-Expires"] = str(max_age)
+    resp["Expires"] = http_date(now + max_age)
+    return resp
+
+
+class GatewayVerifyApp:
+    def __init__(self, application, path=GATEWAY_VERIFY_PATH):
+        self.application = application
+        self.path = path
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO") != self.path:
+            return self.application(environ, start_response)
+
+        # Keep the usual request signals so DB connections are recycled as in Django's handler.
+        signals.request_started.send(sender=self.__class__, environ=environ)
+        response = gateway_verify(WSGIRequest(environ))
+
+        status = "%d %s" % (response.status_code, response.reason_phrase)
+        response_headers = list(response.items())
+        start_response(status, response_headers)
+        return response
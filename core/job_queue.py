@@ -0,0 +1,130 @@
+"""Claim/lease machinery shared by the database-backed job queues (team7.jobs, team11.jobs).
+
+A job row has status, next_attempt_at, locked_at, locked_by and attempts
+columns. claim_next() moves one due row, or one whose lease ran out, to the
+running state with a conditional update, so two workers never take the same
+row. LeasedWorkerPool runs the worker threads plus a heartbeat that renews the
+lease of every job the pool holds (keyed on locked_by) every lease/4 seconds:
+long jobs keep their lease while the process lives, and the jobs of a process
+that died are claimed again one (short) lease later.
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next(jobs, worker_id, *, queued, running, lease_seconds, stamp=()):
+    """Atomically take the oldest due job in `jobs` (or one whose lease ran out), or return None.
+
+    `stamp` names extra fields set to the claim time (e.g. updated_at).
+    """
+    now = timezone.now()
+    candidates = (
+        jobs.filter(
+            Q(status=queued, next_attempt_at__lte=now)
+            | Q(status=running, locked_at__lt=now - timedelta(seconds=lease_seconds))
+        )
+        .order_by('next_attempt_at')
+        .values_list('pk', 'status', 'locked_at')[:10]
+    )
+    for pk, status, locked_at in candidates:
+        # Only one worker can move the row out of the state it read.
+        claimed = jobs.filter(pk=pk, status=status, locked_at=locked_at).update(
+            status=running,
+            locked_at=now,
+            locked_by=worker_id,
+            attempts=F('attempts') + 1,
+            **{name: now for name in stamp},
+        )
+        if claimed:
+            return jobs.get(pk=pk)
+    return None
+
+
+class LeasedWorkerPool:
+    """Worker threads that claim and run jobs, plus the lease heartbeat.
+
+    Subclasses implement claim(), run(), running_jobs() and lease_seconds();
+    setup_worker() builds per-thread state that is passed to run().
+    """
+
+    name = 'jobs'
+
+    def __init__(self, size, poll_interval=1.0):
+        self.size = size
+        self.poll_interval = poll_interval
+        self.worker_ids = [f"{socket.gethostname()}:{os.getpid()}:{index}" for index in range(size)]
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = []
+
+    def claim(self, worker_id):
+        raise NotImplementedError
+
+    def run(self, job, context):
+        raise NotImplementedError
+
+    def running_jobs(self):
+        """Queryset of the running jobs of this queue."""
+        raise NotImplementedError
+
+    def lease_seconds(self):
+        raise NotImplementedError
+
+    def setup_worker(self):
+        return None
+
+    def start(self):
+        for index in range(self.size):
+            thread = threading.Thread(target=self._run, args=(index,), name=f"{self.name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat, name=f"{self.name}-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def renew_leases(self):
+        """Push out the lease of the jobs this pool is running; returns how many."""
+        return self.running_jobs().filter(locked_by__in=self.worker_ids).update(locked_at=timezone.now())
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds() / 4):
+            close_old_connections()
+            try:
+                self.renew_leases()
+            except Exception as e:
+                logger.exception(f"{self.name} lease heartbeat error: {e}")
+        close_old_connections()
+
+    def _run(self, index):
+        worker_id = self.worker_ids[index]
+        context = self.setup_worker()
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                job = self.claim(worker_id)
+                if job is not None:
+                    self.run(job, context)
+                    continue
+            except Exception as e:
+                logger.exception(f"{self.name} worker {worker_id} error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        close_old_connections()
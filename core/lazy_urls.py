@@ -0,0 +1,91 @@
+"""
+Lazy mounting of team URLconfs.
+
+`include("teamN.urls")` imports the team's URLconf (and through it, its views
+and whatever SDKs they import at module level) while the root URLconf is
+loaded, i.e. at worker boot. `lazy_include` returns a resolver that imports it
+only when a request path falls under the prefix.
+
+Until then the resolver contributes nothing to the reverse map, so
+reverse()/{% url %} of core names (the landing and auth pages) does not pull
+in any team. Loading a team clears the URL caches, and the next reverse()
+rebuilds the map with that team's names. A team's own pages are served under
+its prefix, so its names are available by the time its views reverse them.
+System checks (`manage.py check`, runserver) still walk every URLconf.
+"""
+from importlib import import_module
+
+from django.urls import URLResolver, clear_url_caches
+from django.urls.resolvers import RoutePattern
+from django.utils.datastructures import MultiValueDict
+from django.utils.functional import cached_property
+
+
+class LazyURLResolver(URLResolver):
+    def __init__(self, pattern, urlconf_name, app_name=None, namespace=None):
+        super().__init__(pattern, urlconf_name)
+        self._declared_app_name = app_name
+        self._declared_namespace = namespace
+
+    @cached_property
+    def urlconf_module(self):
+        module = import_module(self.urlconf_name)
+        # Mark as loaded before dropping the caches, so the rebuilt reverse map includes it.
+        self.__dict__["urlconf_module"] = module
+        clear_url_caches()
+        return module
+
+    @property
+    def is_loaded(self):
+        return "urlconf_module" in self.__dict__
+
+    @property
+    def app_name(self):
+        if self._declared_app_name is not None or not self.is_loaded:
+            return self._declared_app_name
+        return getattr(self.urlconf_module, "app_name", None)
+
+    @app_name.setter
+    def app_name(self, value):
+        # URLResolver.__init__ assigns None; the real value comes from the module.
+        self._declared_app_name = value
+
+    @property
+    def namespace(self):
+        if self._declared_namespace is not None:
+            return self._declared_namespace
+        return self.app_name
+
+    @namespace.setter
+    def namespace(self, value):
+        self._declared_namespace = value
+
+    def _populate(self):
+        if self.is_loaded:
+            super()._populate()
+
+    @property
+    def reverse_dict(self):
+        return super().reverse_dict if self.is_loaded else MultiValueDict()
+
+    @property
+    def namespace_dict(self):
+        return super().namespace_dict if self.is_loaded else {}
+
+    @property
+    def app_dict(self):
+        return super().app_dict if self.is_loaded else {}
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<{self.__class__.__name__} {self.urlconf_name!r} ({state}) {self.pattern.describe()}>"
+
+
+def lazy_include(route, urlconf_name, app_name=None, namespace=None):
+    """Drop-in for path(route, include(urlconf_name)) that defers the import."""
+    return LazyURLResolver(
+        RoutePattern(route, is_endpoint=False),
+        urlconf_name,
+        app_name=app_name,
+        namespace=namespace,
+    )
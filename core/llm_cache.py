@@ -0,0 +1,232 @@
+"""
+Content-addressed cache for LLM evaluation responses.
+
+Identical requests (same model, system prompt, user prompt, temperature and
+rubric version) get the stored answer instead of another round trip, so a
+resubmitted essay is scored instantly and consistently. Entries live in a small
+SQLite file (LLM_CACHE_PATH) shared by all workers and surviving restarts;
+they expire after LLM_CACHE_MAX_AGE_SECONDS and the least recently used ones
+are dropped beyond LLM_CACHE_MAX_ENTRIES.
+
+`cached_chat_client(client, rubric_version)` wraps an OpenAI client so
+existing `client.chat.completions.create(...)` call sites go through the cache
+unchanged.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    latency REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+_PRUNE_EVERY = 50
+
+
+def make_cache_key(model, system_prompt, user_prompt, temperature, rubric_version="") -> str:
+    payload = json.dumps(
+        [model, system_prompt, user_prompt, None if temperature is None else float(temperature), rubric_version],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def looks_like_json(text: str) -> bool:
+    """Evaluation answers are JSON objects; anything else is not worth caching."""
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        return False
+    try:
+        json.loads(match.group(0))
+    except ValueError:
+        return False
+    return True
+
+
+class LLMResponseCache:
+    def __init__(self, path, max_entries=5000, max_age_seconds=7 * 24 * 3600):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key) -> Optional[str]:
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT response, latency, created_at FROM llm_responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or now - row[2] > self.max_age_seconds:
+            with self._lock:
+                self.misses += 1
+            return None
+        self._conn().execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+            self.latency_saved += row[1]
+        return row[0]
+
+    def set(self, key, response, latency=0.0):
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO llm_responses (key, response, latency, created_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, response, latency, now, now),
+        )
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % _PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        conn = self._conn()
+        removed = conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+        ).rowcount
+        removed += conn.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            "  SELECT key FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        return removed
+
+    def cached_call(self, produce: Callable[[], str], *, model, system_prompt, user_prompt, temperature,
+                    rubric_version="", validate: Optional[Callable[[str], bool]] = None) -> str:
+        key = make_cache_key(model, system_prompt, user_prompt, temperature, rubric_version)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        response = produce()
+        if response is not None and (validate is None or validate(response)):
+            self.set(key, response, time.perf_counter() - started)
+        return response
+
+    def clear(self):
+        self._conn().execute("DELETE FROM llm_responses")
+        with self._lock:
+            self.hits = self.misses = 0
+            self.latency_saved = 0.0
+
+    def stats(self):
+        size = self._conn().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "latency_saved_seconds": round(self.latency_saved, 3),
+            }
+
+
+def _message_text(content):
+    """Text of a chat message: a string, None, or a list of content parts."""
+    if isinstance(content, list):
+        return "".join(
+            part.get("text") or "" if isinstance(part, dict) else str(part)
+            for part in content
+            if not isinstance(part, dict) or part.get("type", "text") == "text"
+        )
+    return content or ""
+
+
+class _CachedCompletions:
+    def __init__(self, completions, cache, rubric_version, validate):
+        self._completions = completions
+        self._cache = cache
+        self._rubric_version = rubric_version
+        self._validate = validate
+
+    def create(self, **kwargs):
+        if kwargs.get("stream"):
+            return self._completions.create(**kwargs)
+
+        messages = kwargs.get("messages") or []
+        system_prompt = "\n".join(_message_text(m.get("content")) for m in messages if m.get("role") == "system")
+        user_prompt = json.dumps([m for m in messages if m.get("role") != "system"], ensure_ascii=False)
+        # Everything besides the messages (max_tokens, response_format, ...) is part of the request too.
+        extra = {k: v for k, v in kwargs.items() if k not in ("model", "messages", "temperature", "stream", "timeout")}
+        rubric_version = self._rubric_version
+        if extra:
+            rubric_version = f"{rubric_version}|{json.dumps(extra, sort_keys=True, default=str)}"
+
+        content = self._cache.cached_call(
+            lambda: self._completions.create(**kwargs).choices[0].message.content,
+            model=kwargs.get("model"),
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=kwargs.get("temperature"),
+            rubric_version=rubric_version,
+            validate=self._validate,
+        )
+        # Call sites only read choices[0].message.content.
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class CachedChatClient:
+    """OpenAI client proxy: chat completions are cached, everything else passes through."""
+
+    def __init__(self, client, cache, rubric_version="", validate=looks_like_json):
+        self._client = client
+        self.chat = SimpleNamespace(completions=_CachedCompletions(client.chat.completions, cache, rubric_version,
+                                                                   validate))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """The process-wide cache configured in settings, or None when disabled."""
+    global _cache
+    from django.conf import settings
+
+    if not getattr(settings, "LLM_CACHE_ENABLED", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(
+                    settings.LLM_CACHE_PATH,
+                    max_entries=getattr(settings, "LLM_CACHE_MAX_ENTRIES", 5000),
+                    max_age_seconds=getattr(settings, "LLM_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600),
+                )
+    return _cache
+
+
+def cached_chat_client(client, rubric_version=""):
+    cache = get_llm_response_cache()
+    if cache is None:
+        return client
+    return CachedChatClient(client, cache, rubric_version=rubric_version)
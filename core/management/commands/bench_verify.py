@@ -0,0 +1,96 @@
+"""
+Compare requests/sec of the full-stack /api/auth/verify/ view with the
+gateway fast path (core.gateway.GatewayVerifyApp).
+
+Both paths are driven in-process through their WSGI callables, so the numbers
+measure Django's own overhead rather than the network.
+
+Usage:
+    python manage.py bench_verify                      # first active user
+    python manage.py bench_verify --email a@b.c -n 5000
+"""
+import io
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+
+from core.gateway import GATEWAY_VERIFY_PATH, GatewayVerifyApp
+from core.jwt_utils import create_access_token
+from core.models import User
+from core.principal_cache import principal_cache
+
+
+def _environ(path, token):
+    host = next((h for h in settings.ALLOWED_HOSTS if h not in ("*", "")), "localhost").lstrip(".")
+    return {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "SCRIPT_NAME": "",
+        "QUERY_STRING": "",
+        "SERVER_NAME": host,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "HTTP_COOKIE": f"access_token={token}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(b""),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the old and the gateway verify paths (requests/sec)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", type=str, help="User to mint the access token for")
+        parser.add_argument("-n", "--requests", type=int, default=2000, help="Requests per path")
+
+    def _run(self, app, path, token, n):
+        statuses = {}
+
+        def start_response(status, headers):
+            statuses[status] = statuses.get(status, 0) + 1
+
+        # warm up (fills the principal cache, loads URLconf)
+        for _ in range(10):
+            for _chunk in app(_environ(path, token), start_response):
+                pass
+
+        statuses.clear()
+        started = time.perf_counter()
+        for _ in range(n):
+            response = app(_environ(path, token), start_response)
+            for _chunk in response:
+                pass
+            response.close()
+        elapsed = time.perf_counter() - started
+        return n / elapsed, elapsed, statuses
+
+    def handle(self, *args, **options):
+        qs = User.objects.filter(is_active=True)
+        user = qs.filter(email=options["email"]).first() if options["email"] else qs.first()
+        if user is None:
+            raise CommandError("No active user found. Create one first (or pass --email).")
+
+        token = create_access_token(user)
+        n = options["requests"]
+        django_app = WSGIHandler()
+        gateway_app = GatewayVerifyApp(django_app)
+
+        principal_cache.clear()
+        results = [
+            ("full stack  /api/auth/verify/", self._run(django_app, "/api/auth/verify/", token, n)),
+            (f"gateway     {GATEWAY_VERIFY_PATH}", self._run(gateway_app, GATEWAY_VERIFY_PATH, token, n)),
+        ]
+
+        for label, (rps, elapsed, statuses) in results:
+            self.stdout.write(f"{label}: {rps:8.0f} req/s  ({n} requests in {elapsed:.2f}s, {statuses})")
+        self.stdout.write(self.style.SUCCESS(
+            f"Speed-up: {results[1][1][0] / results[0][1][0]:.1f}x   principal cache: {principal_cache.stats()}"
+        ))
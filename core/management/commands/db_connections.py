@@ -0,0 +1,84 @@
+"""
+Synthetic benchmark: how many real DB connections each alias opens per request.
+
+Simulates request cycles (request_started -> one query per alias ->
+request_finished) from several threads, as Django's handler would, and
+prints connection-open counts per alias. Run it with different
+DB_CONN_MAX_AGE / <ALIAS>_CONN_MAX_AGE values to see the effect of
+persistent connections. It does not observe real traffic; under an external
+load test the same per-alias counts are reported by /api/health/.
+
+Usage:
+    python manage.py db_connections                          # all aliases
+    python manage.py db_connections --aliases default team1 --threads 8 --requests 500
+    python manage.py db_connections --conn-max-age 0         # compare with no reuse
+"""
+import threading
+import time
+
+from django.core import signals
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db_connections import connection_open_counts, reset_connection_open_counts
+
+
+class Command(BaseCommand):
+    help = "Synthetic benchmark: simulated requests and the connections each DB alias opens"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--aliases", nargs="*", help="DB aliases to touch on every request (default: all)")
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--requests", type=int, default=200, help="Requests per thread")
+        parser.add_argument("--conn-max-age", type=int, default=None,
+                            help="Override CONN_MAX_AGE for this run")
+
+    def handle(self, *args, **options):
+        aliases = options["aliases"] or list(connections.settings.keys())
+        unknown = [a for a in aliases if a not in connections.settings]
+        if unknown:
+            raise CommandError(f"Unknown DB alias(es): {', '.join(unknown)}")
+
+        if options["conn_max_age"] is not None:
+            for alias in aliases:
+                connections.settings[alias]["CONN_MAX_AGE"] = options["conn_max_age"]
+
+        connections.close_all()
+        reset_connection_open_counts()
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(options["requests"]):
+                    signals.request_started.send(sender=self.__class__)
+                    for alias in aliases:
+                        with connections[alias].cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                    signals.request_finished.send(sender=self.__class__)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            raise CommandError(f"{len(errors)} worker(s) failed, first error: {errors[0]}")
+
+        total_requests = options["threads"] * options["requests"]
+        counts = connection_open_counts()
+        self.stdout.write(f"{total_requests} simulated requests in {elapsed:.2f}s across {len(aliases)} alias(es)")
+        self.stdout.write(f"{'alias':<10} {'vendor':<12} {'max_age':>8} {'health':>7} {'opened':>8} {'per req':>8}")
+        for alias in aliases:
+            conn_settings = connections.settings[alias]
+            opened = counts.get(alias, 0)
+            self.stdout.write(
+                f"{alias:<10} {connections[alias].vendor:<12} {str(conn_settings.get('CONN_MAX_AGE')):>8} "
+                f"{str(conn_settings.get('CONN_HEALTH_CHECKS')):>7} {opened:>8} {opened / total_requests:>8.3f}"
+            )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.llm_cache import get_llm_response_cache
+
+
+class Command(BaseCommand):
+    help = "Inspect or maintain the shared LLM response cache (stats | prune | clear)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", nargs="?", default="stats", choices=["stats", "prune", "clear"])
+
+    def handle(self, *args, **options):
+        cache = get_llm_response_cache()
+        if cache is None:
+            raise CommandError("LLM_CACHE_ENABLED is off.")
+
+        action = options["action"]
+        if action == "prune":
+            self.stdout.write(f"removed {cache.prune()} expired/overflow entries")
+        elif action == "clear":
+            cache.clear()
+            self.stdout.write("cache cleared")
+
+        # Hit/miss counters are per process; the entry count is shared.
+        for key, value in cache.stats().items():
+            self.stdout.write(f"{key:<24} {value}")
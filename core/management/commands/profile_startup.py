@@ -0,0 +1,109 @@
+"""
+Per-team startup cost: how long importing each team's URLconf (and the views,
+services and SDKs it pulls in) takes, and how much resident memory it adds.
+
+Each team is measured in a fresh interpreter after django.setup(), so numbers
+do not depend on what an earlier team already imported. Use the output to
+pick SERVED_TEAM_APPS for slim workers.
+
+Usage:
+    python manage.py profile_startup
+    python manage.py profile_startup --apps team7 team11
+"""
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+CHILD_SCRIPT = r"""
+import json, os, sys, time
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+rss0 = rss_kb()
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+rss1 = rss_kb()
+
+app = sys.argv[1]
+if app != "-":
+    from importlib import import_module
+    before = set(sys.modules)
+    import_module(f"{app}.urls")
+    modules = len(set(sys.modules) - before)
+else:
+    modules = 0
+t2 = time.perf_counter()
+rss2 = rss_kb()
+
+print(json.dumps({
+    "setup_s": t1 - t0, "setup_rss_kb": rss1 - rss0,
+    "import_s": t2 - t1, "import_rss_kb": rss2 - rss1, "modules": modules,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Report per-team URLconf import time and resident memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--apps", nargs="*", help="Team apps to profile (default: TEAM_APPS)")
+
+    def _measure(self, app):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "app404.settings"))
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, app],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            last = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+            return None, last
+        return json.loads(proc.stdout.strip().splitlines()[-1]), None
+
+    def handle(self, *args, **options):
+        apps = options["apps"] or settings.TEAM_APPS
+
+        base, error = self._measure("-")
+        if base is None:
+            self.stdout.write(self.style.ERROR(f"django.setup() failed: {error}"))
+            return
+        self.stdout.write(
+            f"django.setup() (all INSTALLED_APPS, models, admin): "
+            f"{base['setup_s'] * 1000:.0f} ms, +{base['setup_rss_kb'] / 1024:.1f} MB RSS"
+        )
+
+        rows = []
+        for app in apps:
+            result, error = self._measure(app)
+            if result is None:
+                self.stdout.write(self.style.WARNING(f"{app}: import failed: {error}"))
+                continue
+            rows.append((app, result))
+
+        rows.sort(key=lambda r: r[1]["import_s"], reverse=True)
+        self.stdout.write(f"\n{'app':<8} {'urls import':>12} {'RSS added':>10} {'modules':>8}")
+        total_s = total_kb = 0
+        for app, r in rows:
+            total_s += r["import_s"]
+            total_kb += r["import_rss_kb"]
+            self.stdout.write(
+                f"{app:<8} {r['import_s'] * 1000:>9.0f} ms {r['import_rss_kb'] / 1024:>7.1f} MB {r['modules']:>8}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"\nSum over teams: {total_s * 1000:.0f} ms, {total_kb / 1024:.1f} MB "
+            f"(upper bound; shared dependencies are counted once per team)"
+        ))
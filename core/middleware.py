@@ -1,15 +1,14 @@
-from django.contrib.auth import get_user_model
 from django.utils.deprecation import MiddlewareMixin
 from jwt import ExpiredSignatureError, InvalidTokenError
 
 from core.jwt_utils import decode_token
-
-User = get_user_model()
+from core.principal_cache import resolve_principal
 
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     """
     If a valid access_token cookie (or Authorization header) exists, set request.user accordingly.
+    Verified users come from the process-local principal cache when possible.
     """
 
     def process_request(self, request):
@@ -27,18 +26,10 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
 
         try:
             payload = decode_token(token)
-            if payload.get("type") != "access":
-                return
-
-            user_id = payload.get("sub")
-            tv = payload.get("tv")
-            user = User.objects.filter(id=user_id, is_active=True).first()
+            user = resolve_principal(payload)
             if not user:
                 return
 
-            if user.token_version != tv:
-                return
-
             request.user = user
             request.jwt_payload = payload
         except (ExpiredSignatureError, InvalidTokenError):
@@ -0,0 +1,119 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class PrincipalCache:
+    """
+    Process-local LRU of verified users keyed by (user id, token_version).
+
+    An entry lives until the access token that produced it expires, capped at
+    PRINCIPAL_CACHE_TTL_SECONDS so other workers notice logout/deactivation
+    (which this process only learns about through post_save) within that window.
+    """
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id, tv):
+        key = (str(user_id), tv)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Hand out a copy so a view mutating request.user never touches the cached instance.
+        return copy.copy(user)
+
+    def set(self, user, tv, token_exp=None):
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        if expires_at <= now:
+            return
+
+        key = (str(user.pk), tv)
+        with self._lock:
+            self._entries[key] = (copy.copy(user), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+principal_cache = PrincipalCache(
+    max_entries=getattr(settings, "PRINCIPAL_CACHE_MAX_ENTRIES", 10000),
+    ttl_seconds=getattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 60),
+)
+
+
+def resolve_principal(payload):
+    """
+    Return the active user an access-token payload refers to, or None.
+    Only cache misses hit the default DB.
+    """
+    if payload.get("type") != "access":
+        return None
+
+    user_id = payload.get("sub")
+    tv = payload.get("tv")
+    if not user_id:
+        return None
+
+    user = principal_cache.get(user_id, tv)
+    if user is not None:
+        return user
+
+    user = User.objects.filter(id=user_id, is_active=True).first()
+    if not user or user.token_version != tv:
+        return None
+
+    principal_cache.set(user, tv, token_exp=payload.get("exp"))
+    return user
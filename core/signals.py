@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.principal_cache import principal_cache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def drop_cached_principal(sender, instance, **kwargs):
+    # logout bumps token_version, admin may flip is_active: either way the cached entry is stale.
+    principal_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def drop_deleted_principal(sender, instance, **kwargs):
+    principal_cache.invalidate_user(instance.pk)
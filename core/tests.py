@@ -22,3 +22,208 @@ class AuthFlowTests(TestCase):
         # logout
         res3 = self.client.post("/api/auth/logout/", data="{}", content_type="application/json")
         self.assertEqual(res3.status_code, 200)
+
+
+class PrincipalCacheTests(TestCase):
+    def setUp(self):
+        from django.db.models.signals import post_save
+        from core.principal_cache import principal_cache
+
+        # team2 mirrors user updates into its own DB, which this test does not set up.
+        try:
+            from team2.signals import update_user_details
+        except ImportError:
+            pass
+        else:
+            post_save.disconnect(update_user_details, sender=User)
+            self.addCleanup(post_save.connect, update_user_details, sender=User)
+
+        self.cache = principal_cache
+        self.cache.clear()
+        self.user = User.objects.create_user(email="p@test.com", password="pass1234")
+
+    def _payload(self):
+        from core.jwt_utils import create_access_token, decode_token
+
+        return decode_token(create_access_token(self.user))
+
+    def test_second_lookup_skips_db(self):
+        from core.principal_cache import resolve_principal
+
+        payload = self._payload()
+        self.assertEqual(resolve_principal(payload).pk, self.user.pk)
+        with self.assertNumQueries(0, using="default"):
+            self.assertEqual(resolve_principal(payload).pk, self.user.pk)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_token_version_bump_and_deactivation_drop_entry(self):
+        from core.principal_cache import resolve_principal
+
+        payload = self._payload()
+        resolve_principal(payload)
+
+        self.user.token_version += 1
+        self.user.save(update_fields=["token_version"])
+        self.assertIsNone(resolve_principal(payload))
+
+        payload = self._payload()
+        resolve_principal(payload)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertIsNone(resolve_principal(payload))
+
+    def test_entry_expires_with_token(self):
+        import time
+
+        self.cache.set(self.user, self.user.token_version, token_exp=time.time() - 1)
+        self.assertIsNone(self.cache.get(self.user.pk, self.user.token_version))
+
+
+class GatewayVerifyTests(TestCase):
+    def setUp(self):
+        from core.principal_cache import principal_cache
+
+        principal_cache.clear()
+        self.user = User.objects.create_user(email="g@test.com", password="pass1234", first_name="گلناز")
+
+    def test_gateway_verify_sets_signed_headers_and_cache_hints(self):
+        from core.gateway import PRINCIPAL_HEADERS, verify_principal
+        from core.jwt_utils import create_access_token
+
+        self.client.cookies["access_token"] = create_access_token(self.user)
+        res = self.client.get("/api/auth/gateway-verify/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["X-User-Id"], str(self.user.id))
+        # Only the gateway's own cache (X-Accel-Expires, per-token key) may keep it.
+        self.assertTrue(res["Cache-Control"].startswith("private, max-age="))
+        self.assertIn("X-Accel-Expires", res)
+        self.assertIn("Cookie, Authorization", res["Vary"])
+        # The Persian name goes out MIME-encoded; the signature covers that form.
+        self.assertTrue(res["X-User-First-Name"].startswith("=?utf-8?"))
+        values = [res[h] for h in PRINCIPAL_HEADERS]
+        self.assertTrue(verify_principal(values, res["X-User-Signature"]))
+        self.assertFalse(verify_principal(values[:2] + ["x"] + values[3:], res["X-User-Signature"]))
+
+    def test_gateway_app_bypasses_middleware(self):
+        import io
+        from core.gateway import GatewayVerifyApp
+
+        def downstream(environ, start_response):
+            raise AssertionError("request should not reach the Django handler")
+
+        statuses = []
+        app = GatewayVerifyApp(downstream)
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": "/api/auth/gateway-verify/", "QUERY_STRING": "",
+            "SERVER_NAME": "localhost", "SERVER_PORT": "80", "wsgi.input": io.BytesIO(b""),
+            "wsgi.url_scheme": "http",
+        }
+        app(environ, lambda status, headers: statuses.append(status)).close()
+        self.assertEqual(statuses, ["401 Unauthorized"])
+
+
+class LazyIncludeTests(TestCase):
+    def test_urlconf_imported_on_first_matching_request(self):
+        from django.urls import Resolver404
+        from core.lazy_urls import lazy_include
+
+        resolver = lazy_include("lazy/", "core.urls")
+        self.assertFalse(resolver.is_loaded)
+        with self.assertRaises(Resolver404):
+            resolver.resolve("other/health/")
+        self.assertFalse(resolver.is_loaded)
+
+        match = resolver.resolve("lazy/health/")
+        self.assertTrue(resolver.is_loaded)
+        self.assertEqual(match.func.__name__, "health")
+
+    def test_reversing_core_names_does_not_import_teams(self):
+        # Needs a fresh interpreter: the test run has already imported every team.
+        import os
+        import subprocess
+        import sys
+        from django.conf import settings
+
+        script = """
+import sys
+import django
+django.setup()
+from django.urls import resolve, reverse
+
+def team_modules():
+    return sorted(m for m in sys.modules if m.startswith("team") and m.rsplit(".", 1)[-1] in ("urls", "views"))
+
+for name in ("home", "auth", "signup", "logout", "microservices"):
+    reverse(name)
+print(team_modules())
+resolve("/team11/")
+print(reverse("team11_ping"), team_modules())
+"""
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "app404.settings", "LAZY_TEAM_URLS": "true"}
+        out = subprocess.run(
+            [sys.executable, "-c", script], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout.splitlines()
+        self.assertEqual(out[0], "[]")
+        self.assertEqual(out[1], "/team11/ping/ ['team11.urls', 'team11.views']")
+
+
+class LLMResponseCacheTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from core.llm_cache import LLMResponseCache
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = f"{tmp.name}/llm.sqlite3"
+        self.cache = LLMResponseCache(self.path, max_entries=2)
+
+    def test_identical_requests_hit_and_survive_restart(self):
+        from core.llm_cache import LLMResponseCache
+
+        calls = []
+
+        def produce():
+            calls.append(1)
+            return '{"overall_score": 4}'
+
+        kwargs = dict(model="m", system_prompt="s", user_prompt="essay", temperature=0.3, rubric_version="v1")
+        self.cache.cached_call(produce, **kwargs)
+        self.cache.cached_call(produce, **kwargs)
+        self.cache.cached_call(produce, **dict(kwargs, rubric_version="v2"))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+        reopened = LLMResponseCache(self.path)
+        self.assertEqual(reopened.cached_call(produce, **kwargs), '{"overall_score": 4}')
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_answers_are_not_cached_and_lru_is_bounded(self):
+        from core.llm_cache import looks_like_json
+
+        kwargs = dict(model="m", system_prompt="s", temperature=0.3, validate=looks_like_json)
+        self.cache.cached_call(lambda: "not json", user_prompt="a", **kwargs)
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+        for prompt in ("a", "b", "c"):
+            self.cache.cached_call(lambda: "{}", user_prompt=prompt, **kwargs)
+        self.cache.prune()
+        self.assertEqual(self.cache.stats()["size"], 2)
+
+    def test_chat_client_accepts_content_parts_and_none(self):
+        from types import SimpleNamespace
+        from unittest import mock
+        from core.llm_cache import CachedChatClient
+
+        answer = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+        upstream = SimpleNamespace(chat=SimpleNamespace(completions=mock.Mock(create=mock.Mock(return_value=answer))))
+        client = CachedChatClient(upstream, self.cache)
+        messages = [
+            {"role": "system", "content": [{"type": "text", "text": "Grade"}, {"type": "text", "text": " this."}]},
+            {"role": "system", "content": None},
+            {"role": "user", "content": "essay"},
+        ]
+        for _ in range(2):
+            self.assertEqual(client.chat.completions.create(model="m", messages=messages).choices[0].message.content, "{}")
+        upstream.chat.completions.create.assert_called_once()
@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from .gateway import gateway_verify
 
 urlpatterns = [
     path("auth/signup/", views.signup_api),
@@ -8,5 +9,6 @@ urlpatterns = [
     path("auth/logout/", views.logout_api),
     path("auth/me/", views.me),
     path("auth/verify/", views.verify),
+    path("auth/gateway-verify/", gateway_verify),
     path("health/", views.health),
 ]
\ No newline at end of file
@@ -9,6 +9,8 @@ from django.contrib.auth.password_validation import validate_password
 
 from core.jwt_utils import create_access_token, create_refresh_token, decode_token
 from core.auth import api_login_required
+from core.principal_cache import principal_cache
+from core.db_connections import connection_open_counts
 
 User = get_user_model()
 
@@ -40,7 +42,11 @@ def _clear_auth_cookies(resp: JsonResponse, settings):
 
 
 def health(request):
-    return JsonResponse({"status": "ok"})
+    return JsonResponse({
+        "status": "ok",
+        "principal_cache": principal_cache.stats(),
+        "db_connections_opened": connection_open_counts(),
+    })
 
 
 @csrf_exempt
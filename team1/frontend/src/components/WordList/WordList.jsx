@@ -8,25 +8,41 @@ const WordList = () => {
     const [search, setSearch] = useState('');  // State to manage search query
     const [page, setPage] = useState(1);  // State for pagination
     const [totalPages, setTotalPages] = useState(1);  // To manage total pages from pagination
+    // Search results come in cursor pages: the URLs of the pages walked so far and the next one.
+    const [cursorPages, setCursorPages] = useState([]);
+    const [nextUrl, setNextUrl] = useState(null);
 
     useEffect(() => {
-        // Fetch words based on search query and page
-        wordService.getAllWords(search, page)
+        // Fetch words based on search query and page (or the current search cursor page)
+        const pageUrl = cursorPages[cursorPages.length - 1];
+        const request = pageUrl ? wordService.getWordsPage(pageUrl) : wordService.getAllWords(search, page);
+        request
             .then(data => {
                 setWords(data.results);
-                setTotalPages(data.total_pages);  // Assuming the response includes total pages
+                setTotalPages(data.total_pages || 1);
+                setNextUrl(data.next || null);
                 setLoading(false);
             })
             .catch(err => console.error(err));
-    }, [search, page]);  // Re-fetch when search or page changes
+    }, [search, page, cursorPages]);  // Re-fetch when search or page changes
 
     const handleSearchChange = (event) => {
         setSearch(event.target.value);
         setPage(1);  // Reset to first page when search term changes
+        setCursorPages([]);
     };
 
     const handlePageChange = (newPage) => {
-        if (newPage >= 1 && newPage <= totalPages) {
+        if (search) {
+            if (newPage > page && nextUrl) {
+                setCursorPages([...cursorPages, nextUrl]);
+            } else if (newPage < page) {
+                setCursorPages(cursorPages.slice(0, -1));
+            } else {
+                return;
+            }
+            setPage(newPage);
+        } else if (newPage >= 1 && newPage <= totalPages) {
             setPage(newPage);
         }
     };
@@ -58,8 +74,8 @@ const WordList = () => {
             {/* Pagination Controls */}
             <div className="pagination">
                 <button onClick={() => handlePageChange(page - 1)} disabled={page <= 1}>Previous</button>
-                <span>Page {page} of {totalPages}</span>
-                <button onClick={() => handlePageChange(page + 1)} disabled={page >= totalPages}>Next</button>
+                <span>{search ? `Page ${page}` : `Page ${page} of ${totalPages}`}</span>
+                <button onClick={() => handlePageChange(page + 1)} disabled={search ? !nextUrl : page >= totalPages}>Next</button>
             </div>
         </div>
     );
@@ -1,19 +1,30 @@
 import {BASE_URL} from "../config";
 
+const fetchWords = async (url) => {
+  const response = await fetch(url, {
+    method: "GET",
+    headers: {
+      "Content-Type": "application/json",
+      "Accept": "application/json",
+    },
+    credentials: "include",
+  });
+  if (!response.ok) throw new Error("Network response was not ok");
+  return await response.json();
+};
+
 export const wordService = {
+  // A (non-exact) search asks for cursor pages, answered best match first:
+  // follow `next` with getWordsPage. The full list uses numbered pages.
   getAllWords: async (search = "", page = 1, exact = false) => {
-    const response = await fetch(
-      `${BASE_URL}/words/?search=${encodeURIComponent(search)}&page=${page}&exact=${exact}`,
-      {
-        method: "GET",
-        headers: {
-          "Content-Type": "application/json",
-          "Accept": "application/json",
-        },
-        credentials: "include",
-      }
-    );
-    if (!response.ok) throw new Error("Network response was not ok");
-    return await response.json();
+    const params = new URLSearchParams({search, exact});
+    if (search && !exact) {
+      params.set("pagination", "cursor");
+    } else {
+      params.set("page", page);
+    }
+    return fetchWords(`${BASE_URL}/words/?${params}`);
   },
+
+  getWordsPage: async (url) => fetchWords(url),
 };
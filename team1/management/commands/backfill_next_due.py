@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from team1.models import UserWord
+from team1.services.user_words_service import compute_next_due
+
+
+class Command(BaseCommand):
+    help = "Fill UserWord.next_due for existing rows, in primary-key batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--all", action="store_true", help="Recompute every row, not only empty ones")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        qs = UserWord.objects.all() if options["all"] else UserWord.objects.filter(next_due__isnull=True)
+        qs = qs.only("user_word_id", "leitner_type", "last_check_date", "created_at").order_by("user_word_id")
+
+        last_id = 0
+        updated = 0
+        while True:
+            batch = list(qs.filter(user_word_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            for uw in batch:
+                created_on = timezone.localdate(uw.created_at) if uw.created_at else None
+                uw.next_due = compute_next_due(uw.leitner_type, uw.last_check_date, created_on)
+            UserWord.objects.bulk_update(batch, ["next_due"])
+
+            last_id = batch[-1].user_word_id
+            updated += len(batch)
+            self.stdout.write(f"  ... {updated} rows")
+
+        self.stdout.write(self.style.SUCCESS(f"next_due backfilled for {updated} user words."))
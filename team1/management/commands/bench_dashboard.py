@@ -0,0 +1,111 @@
+"""
+Query count and p95 latency of the team1 dashboard stats for users with
+10 / 1k / 10k user words: the old per-number queries, the combined conditional
+aggregates (uncached) and the cached snapshot.
+
+Synthetic users are created in the team1 database and removed afterwards.
+
+Usage:
+    python manage.py bench_dashboard
+    python manage.py bench_dashboard --sizes 10 1000 --runs 50
+"""
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Avg, Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from team1.models import Quiz, SurvivalGame, UserWord, Word
+from team1.services.dashboard_service import compute_user_dashboard_stats, get_user_dashboard_stats
+
+
+def _legacy_dashboard_stats(*, user_id):
+    # The pre-snapshot implementation: one query per number.
+    UserWord.objects.filter(is_deleted=False, user_id=user_id).count()
+    list(
+        UserWord.objects.filter(is_deleted=False, user_id=user_id)
+        .values("leitner_type").annotate(count=Count("user_word_id"))
+    )
+    list(
+        Quiz.objects.filter(is_deleted=False, user_id=user_id)
+        .values("type").annotate(count=Count("quiz_id"), avg_score=Avg("score"))
+    )
+    list(
+        Quiz.objects.filter(is_deleted=False, user_id=user_id)
+        .order_by("-date", "-created_at")[:15].values("quiz_id", "type", "score", "date", "created_at")
+    )
+    SurvivalGame.objects.filter(is_deleted=False, user_id=user_id).count()
+    SurvivalGame.objects.filter(is_deleted=False, user_id=user_id).aggregate(avg=Avg("score"))
+    list(
+        SurvivalGame.objects.filter(is_deleted=False, user_id=user_id)
+        .order_by("-date", "-created_at")[:4].values("survival_game_id", "score", "lives", "date", "created_at")
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark team1 dashboard stats (query count and p95 latency)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="*", default=[10, 1000, 10000])
+        parser.add_argument("--runs", type=int, default=30)
+
+    def _seed(self, user_id, size, word_ids):
+        today = timezone.now().date()
+        boxes = ["new", "1day", "3days", "7days", "mastered"]
+        UserWord.objects.bulk_create(
+            [UserWord(user_id=user_id, word_id=random.choice(word_ids), description="bench",
+                      leitner_type=random.choice(boxes)) for _ in range(size)],
+            batch_size=1000,
+        )
+        Quiz.objects.bulk_create(
+            [Quiz(user_id=user_id, type=random.randint(1, 3), score=random.randint(0, 100), date=today)
+             for _ in range(max(10, size // 20))],
+            batch_size=1000,
+        )
+        SurvivalGame.objects.bulk_create(
+            [SurvivalGame(user_id=user_id, score=random.randint(0, 30), lives=0, date=today)
+             for _ in range(max(5, size // 50))],
+            batch_size=1000,
+        )
+
+    def _measure(self, fn, user_id, runs):
+        connection = connections["team1"]
+        timings, queries = [], []
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                fn(user_id=user_id)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(ctx.captured_queries))
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        return statistics.mean(queries), statistics.mean(timings), p95
+
+    def handle(self, *args, **options):
+        word_ids = list(Word.objects.values_list("id", flat=True)[:1000])
+        if not word_ids:
+            raise CommandError("team1 has no words; load the dictionary first.")
+
+        user_ids = []
+        try:
+            self.stdout.write(f"{'words':>6}  {'mode':<10} {'queries':>8} {'mean ms':>8} {'p95 ms':>8}")
+            for size in options["sizes"]:
+                user_id = uuid.uuid4()
+                user_ids.append(user_id)
+                self._seed(user_id, size, word_ids)
+
+                for label, fn in (
+                    ("legacy", _legacy_dashboard_stats),
+                    ("aggregate", compute_user_dashboard_stats),
+                    ("cached", get_user_dashboard_stats),
+                ):
+                    q, mean, p95 = self._measure(fn, user_id, options["runs"])
+                    self.stdout.write(f"{size:>6}  {label:<10} {q:>8.1f} {mean:>8.2f} {p95:>8.2f}")
+        finally:
+            for model in (UserWord, Quiz, SurvivalGame):
+                model.objects.filter(user_id__in=user_ids).delete()
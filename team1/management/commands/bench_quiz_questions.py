@@ -0,0 +1,89 @@
+"""
+Query count and latency of team1 quiz question generation, per-word vs batched.
+
+  per-word : build_mcq_for_word() for each of the user's sampled words
+  batched  : build_mcqs_for_words() on the same words -> one round trip for
+             all distractors
+
+Both arms run the generator in team1.services.question_generator. For the
+pre-pool numbers, run the per-word arm on a checkout from before the word pool.
+
+Usage:
+    python manage.py bench_quiz_questions                 # user with the most user words
+    python manage.py bench_quiz_questions --user-id UUID --runs 50
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from team1.models import UserWord, Word
+from team1.services.question_generator import build_mcq_for_word, build_mcqs_for_words
+from team1.services.word_pool import get_word_pool
+
+
+def _per_word(words):
+    return [build_mcq_for_word(word=w) for w in words]
+
+
+def _batched(words):
+    return build_mcqs_for_words(words)
+
+
+class Command(BaseCommand):
+    help = "Benchmark team1 quiz question generation (5/10/15 questions)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", type=str)
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument("--sizes", type=int, nargs="*", default=[5, 10, 15])
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"]
+        if not user_id:
+            top = (
+                UserWord.objects.filter(is_deleted=False)
+                .values("user_id").annotate(n=Count("word_id")).order_by("-n").first()
+            )
+            if not top:
+                raise CommandError("No user words found; pass --user-id of a user with user words.")
+            user_id = top["user_id"]
+
+        connection = connections["team1"]
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            pool = get_word_pool()
+        self.stdout.write(
+            f"word pool: {len(pool)} words, built in {(time.perf_counter() - started) * 1000:.1f} ms "
+            f"({len(ctx.captured_queries)} queries)\n"
+        )
+
+        word_ids = list(
+            UserWord.objects.filter(is_deleted=False, user_id=user_id).values_list("word_id", flat=True).distinct()
+        )
+        words = [
+            w for w in Word.objects.filter(is_deleted=False, id__in=word_ids)
+            if (w.persian or "").strip()
+        ]
+
+        self.stdout.write(f"{'size':>4}  {'mode':<9} {'queries':>8} {'mean ms':>8} {'p95 ms':>8}")
+        for size in options["sizes"]:
+            for label, fn in (("per-word", _per_word), ("batched", _batched)):
+                timings, queries = [], []
+                for _ in range(options["runs"]):
+                    sample = random.sample(words, k=min(size, len(words)))
+                    with CaptureQueriesContext(connection) as ctx:
+                        started = time.perf_counter()
+                        fn(sample)
+                        timings.append((time.perf_counter() - started) * 1000)
+                    queries.append(len(ctx.captured_queries))
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f"{size:>4}  {label:<9} {statistics.mean(queries):>8.1f} "
+                    f"{statistics.mean(timings):>8.2f} {p95:>8.2f}"
+                )
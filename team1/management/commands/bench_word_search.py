@@ -0,0 +1,118 @@
+"""
+Latency of team1 word search on a synthetic dictionary (default 200k words),
+through the code the word list API runs:
+
+- scan:   DatabaseLikeBackend.filter_queryset (the old icontains scan), newest
+          first, plus the page COUNT
+- filter: SQLiteFTS5Backend.filter_queryset (FTS5 trigram subquery), newest
+          first, plus the page COUNT (the ?page=N path)
+- ranked: SQLiteFTS5Backend.search (bm25, keyset) and get_words_by_ids (the
+          default search path)
+
+The team1 alias is pointed at a temporary SQLite file for the run, so the
+team1 database is not touched.
+
+Usage:
+    python manage.py bench_word_search
+    python manage.py bench_word_search --words 50000 --runs 50
+"""
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from team1.models import Category, Word
+from team1.services.word_search import DatabaseLikeBackend, SQLiteFTS5Backend
+from team1.services.word_service import get_words_by_ids
+
+PERSIAN_LETTERS = "ابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی"
+PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = "Benchmark team1 word search: icontains scan vs FTS5 trigram index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--words", type=int, default=200_000)
+        parser.add_argument("--runs", type=int, default=20)
+
+    def _use_temp_database(self, path):
+        # team1 ships no migrations, so the tables are created from the models.
+        connection = connections["team1"]
+        connection.close()
+        connection.settings_dict["NAME"] = path
+        with connection.schema_editor() as editor:
+            editor.create_model(Category)
+            editor.create_model(Word)
+
+    def _build(self, size, backend):
+        rnd = random.Random(1404)
+        words = [
+            Word(
+                english="".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 12))),
+                persian="".join(rnd.choice(PERSIAN_LETTERS) for _ in range(rnd.randint(3, 9))),
+            )
+            for _ in range(size)
+        ]
+        Word.objects.using("team1").bulk_create(words, batch_size=5000)
+
+        started = time.perf_counter()
+        backend.rebuild()
+        self.stdout.write(f"indexed {size} words in {(time.perf_counter() - started):.2f} s")
+        return words
+
+    @staticmethod
+    def _p95(timings):
+        timings = sorted(timings)
+        return timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+    def _time(self, fn, runs):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.mean(timings), self._p95(timings)
+
+    def handle(self, *args, **options):
+        fd, db_path = tempfile.mkstemp(suffix=".sqlite3", prefix="team1-bench-")
+        os.close(fd)
+        try:
+            self._use_temp_database(db_path)
+            self._bench(options)
+        finally:
+            connections["team1"].close()
+            os.remove(db_path)
+
+    def _bench(self, options):
+        fts = SQLiteFTS5Backend()
+        like = DatabaseLikeBackend()
+        words = self._build(options["words"], fts)
+        sample = random.Random(7).choice(words)
+        queries = {
+            "common (3 chars)": sample.english[:3],
+            "rare (full word)": sample.english,
+            "persian": sample.persian[:4],
+        }
+        live = Word.objects.filter(is_deleted=False)
+
+        self.stdout.write(f"\n{'query':<18} {'mode':<8} {'hits':>7} {'mean ms':>9} {'p95 ms':>9}")
+        for label, q in queries.items():
+            def numbered(backend):
+                matches = backend.filter_queryset(live, q).order_by("-created_at", "-id")
+                matches.count()
+                return list(matches[:PAGE_SIZE])
+
+            def ranked():
+                hits = fts.search(q, PAGE_SIZE + 1)
+                return get_words_by_ids([word_id for _, word_id in hits[:PAGE_SIZE]])
+
+            hits = like.filter_queryset(live, q).count()
+            for mode, fn in (("scan", lambda: numbered(like)), ("filter", lambda: numbered(fts)), ("ranked", ranked)):
+                mean, p95 = self._time(fn, options["runs"])
+                self.stdout.write(f"{label:<18} {mode:<8} {hits:>7} {mean:>9.2f} {p95:>9.2f}")
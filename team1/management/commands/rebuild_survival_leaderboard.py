@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from team1.services.game_service import rebuild_survival_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Recompute the team1 survival leaderboard (best score per user) from SurvivalGame"
+
+    def handle(self, *args, **options):
+        count = rebuild_survival_leaderboard()
+        self.stdout.write(self.style.SUCCESS(f"Leaderboard rebuilt: {count} users."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from team1.services.word_search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the team1 word search index from the words table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        total = backend.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{type(backend).__name__}: indexed {total} words."))
@@ -69,11 +69,16 @@ class UserWord(TimeStampedSoftDeleteModel):
     )
     user_id = models.UUIDField(db_index=True)
 
+    # First day the word shows up in the review queue; kept in sync with
+    # leitner_type/last_check_date by user_words_service.
+    next_due = models.DateField(null=True, blank=True)
+
     class Meta:
         db_table = "user_words"
         indexes = [
             models.Index(fields=["word"]),
             models.Index(fields=["user_id"]),
+            models.Index(fields=["user_id", "next_due"], name="user_words_due_idx"),
         ]
 
 
@@ -107,3 +112,16 @@ class SurvivalGame(TimeStampedSoftDeleteModel):
             models.Index(fields=["user_id"]),
             models.Index(fields=["user_id", "date"]),
         ]
+
+
+class SurvivalLeaderboardEntry(models.Model):
+    # Best survival score per user, maintained incrementally by game_service.
+    user_id = models.UUIDField(primary_key=True)
+    best_score = models.IntegerField(default=0)
+    achieved_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "survival_leaderboard"
+        indexes = [
+            models.Index(fields=["-best_score", "achieved_at"], name="survival_lb_rank_idx"),
+        ]
@@ -1,7 +1,113 @@
-from rest_framework.pagination import PageNumberPagination
+import binascii
+from base64 import b64decode, b64encode
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 10  # Default page size
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class DueReviewPagination:
+    """
+    Keyset pages over due words ordered by (next_due, user_word_id). The
+    cursor is the pair of the last row served, so a page is a range scan on
+    the (user_id, next_due) index with no COUNT and no OFFSET, also inside a
+    day with many due words. Forward only, like the review queue itself.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        after = self.decode_cursor(request.GET.get(self.cursor_query_param))
+        if after is not None:
+            due, user_word_id = after
+            queryset = queryset.filter(
+                Q(next_due__gt=due) | Q(next_due=due, user_word_id__gt=user_word_id)
+            )
+        rows = list(queryset.order_by('next_due', 'user_word_id')[:size + 1])
+        self.next_row = rows[size - 1] if len(rows) > size else None
+        return rows[:size]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': None, 'results': data})
+
+    def get_next_link(self):
+        if self.next_row is None:
+            return None
+        token = self.encode_cursor(self.next_row.next_due, self.next_row.user_word_id)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    @staticmethod
+    def encode_cursor(due, user_word_id):
+        return b64encode(f'{due.isoformat()}:{user_word_id}'.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(token):
+        if not token:
+            return None
+        try:
+            due, user_word_id = b64decode(token.encode(), validate=True).decode().split(':')
+            return date.fromisoformat(due), int(user_word_id)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound('Invalid cursor')
+
+
+class WordCursorPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class RankedSearchPagination:
+    """
+    Keyset pages over ranked search hits: the cursor is the (rank, id) of the
+    last hit served, so deep pages cost the same as the first one.
+    """
+    page_size = 100
+    cursor_query_param = 'cursor'
+
+    def paginate_hits(self, search, request):
+        self.request = request
+        after = self._decode(request.GET.get(self.cursor_query_param))
+        hits = search(limit=self.page_size + 1, after=after)
+        self.next_hit = hits[self.page_size - 1] if len(hits) > self.page_size else None
+        return hits[:self.page_size]
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': None, 'results': data})
+
+    def get_next_link(self):
+        if self.next_hit is None:
+            return None
+        token = b64encode('{!r}:{}'.format(*self.next_hit).encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    @staticmethod
+    def _decode(token):
+        if not token:
+            return None
+        try:
+            rank, word_id = b64decode(token.encode(), validate=True).decode().split(':')
+            return float(rank), int(word_id)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound('Invalid cursor')
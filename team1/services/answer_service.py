@@ -2,6 +2,7 @@ from django.utils import timezone
 from django.core.cache import cache
 
 from team1.models import Word, Quiz, SurvivalGame
+from team1.services.game_service import record_survival_score
 
 
 def _quiz_cache_key(user_id, quiz_id):
@@ -107,8 +108,10 @@ def grade_game_answers(*, game: SurvivalGame, user_id, answers):
         if selected_word_id == w.id:
             correct_count += 1
 
+    previous_score = game.score
     game.score = correct_count  # Set the final score
     game.save(update_fields=["score", "updated_at"])  # Save the score
+    record_survival_score(game, previous_score=previous_score)
 
     return correct_count
 
@@ -139,6 +142,7 @@ def validate_and_grade_single_answer(game, user_id, selected_word_id):
         game.lives -= 1
 
     game.save(update_fields=["score", "lives", "updated_at"])
+    record_survival_score(game)
 
     # Clear active question so they can't answer the same one twice
     cache.delete(f"active_q:{user_id}:{game.survival_game_id}")
@@ -1,35 +1,100 @@
-from django.db.models import Count, Avg
+import time
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, FloatField, Q, Value
+from django.db.models.functions import Cast
 from team1.models import UserWord, Quiz, SurvivalGame
 
 QUIZ_TYPE_DAILY = 1
 QUIZ_TYPE_WEEKLY = 2
 QUIZ_TYPE_MONTHLY = 3
 
+LEITNER_BOXES = {
+    "new": "new",
+    "1_day": "1day",
+    "3_days": "3days",
+    "7_days": "7days",
+    "mastered": "mastered",
+}
+QUIZ_TYPES = {
+    "daily": QUIZ_TYPE_DAILY,
+    "weekly": QUIZ_TYPE_WEEKLY,
+    "monthly": QUIZ_TYPE_MONTHLY,
+}
 
-def get_user_dashboard_stats(*, user_id):
-    total_user_words = UserWord.objects.filter(is_deleted=False, user_id=user_id).count()
+# Snapshots are also invalidated explicitly (see team1.signals); the TTL only bounds
+# staleness for writes that bypass model signals.
+DASHBOARD_CACHE_TTL_SECONDS = 10 * 60
 
-    box_counts_qs = (
-        UserWord.objects
-        .filter(is_deleted=False, user_id=user_id)
-        .values("leitner_type")  # استفاده از leitner_type جدید
-        .annotate(count=Count("user_word_id"))
-    )
-    box_counts = {row["leitner_type"]: row["count"] for row in box_counts_qs}
 
-    quiz_aggs = (
-        Quiz.objects
-        .filter(is_deleted=False, user_id=user_id)
-        .values("type")
-        .annotate(count=Count("quiz_id"), avg_score=Avg("score"))
+def _version_key(user_id):
+    return f"team1:dashboard:version:{user_id}"
+
+
+def _snapshot_key(user_id, version):
+    return f"team1:dashboard:{user_id}:{version}"
+
+
+def invalidate_user_dashboard(user_id):
+    # A fresh version makes every older snapshot key unreachable; they expire on their own.
+    cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+def _current_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _aggregate_rows(user_id):
+    """
+    All dashboard numbers in one round trip: a conditional aggregate per table,
+    combined with UNION ALL into rows of (section, v0..v5).
+    """
+    def pad(values):
+        # UNION takes column types from its first member, so every column is a float.
+        values = list(values) + [Value(0)] * (6 - len(values))
+        return {f"v{i}": Cast(v, FloatField()) for i, v in enumerate(values)}
+
+    words = (
+        UserWord.objects.filter(is_deleted=False, user_id=user_id)
+        .annotate(section=Value("words")).values("section")
+        .annotate(**pad(
+            [Count("user_word_id")]
+            + [Count("user_word_id", filter=Q(leitner_type=t)) for t in LEITNER_BOXES.values()]
+        ))
+        .order_by()
+    )
+    quizzes = (
+        Quiz.objects.filter(is_deleted=False, user_id=user_id)
+        .annotate(section=Value("quizzes")).values("section")
+        .annotate(**pad(
+            [Count("quiz_id", filter=Q(type=t)) for t in QUIZ_TYPES.values()]
+            + [Avg("score", filter=Q(type=t)) for t in QUIZ_TYPES.values()]
+        ))
+        .order_by()
     )
-    quiz_stats = {}
-    for row in quiz_aggs:
-        t = row["type"]
-        quiz_stats[int(t) if t is not None else 0] = {
-            "count": row["count"],
-            "avg_score": float(row["avg_score"]) if row["avg_score"] is not None else 0.0,
-        }
+    games = (
+        SurvivalGame.objects.filter(is_deleted=False, user_id=user_id)
+        .annotate(section=Value("games")).values("section")
+        .annotate(**pad([Count("survival_game_id"), Avg("score")]))
+        .order_by()
+    )
+    return {
+        row[0]: row[1:]
+        for row in words.union(quizzes, games, all=True).values_list("section", *[f"v{i}" for i in range(6)])
+    }
+
+
+def compute_user_dashboard_stats(*, user_id):
+    # One query for every count and average, plus the two short "recent" lists.
+    rows = _aggregate_rows(user_id)
+    word_counts = rows.get("words") or (0,) * 6
+    quiz_values = rows.get("quizzes") or (0,) * 6
+    game_values = rows.get("games") or (0,) * 6
 
     recent_quizzes = list(
         Quiz.objects
@@ -37,9 +102,6 @@ def get_user_dashboard_stats(*, user_id):
         .order_by("-date", "-created_at")[:15]
         .values("quiz_id", "type", "score", "date", "created_at")
     )
-
-    game_count = SurvivalGame.objects.filter(is_deleted=False, user_id=user_id).count()
-    game_avg = SurvivalGame.objects.filter(is_deleted=False, user_id=user_id).aggregate(avg=Avg("score"))["avg"]
     recent_games = list(
         SurvivalGame.objects
         .filter(is_deleted=False, user_id=user_id)
@@ -47,26 +109,34 @@ def get_user_dashboard_stats(*, user_id):
         .values("survival_game_id", "score", "lives", "date", "created_at")
     )
 
+    def _avg(value):
+        return float(value) if value is not None else 0.0
+
+    quiz_count = len(QUIZ_TYPES)
     return {
         "words": {
-            "total": total_user_words,
-            "by_leitner": {
-                "new": box_counts.get('new', 0),
-                "1_day": box_counts.get('1day', 0),
-                "3_days": box_counts.get('3days', 0),
-                "7_days": box_counts.get('7days', 0),
-                "mastered": box_counts.get('mastered', 0),
-            },
+            "total": int(word_counts[0] or 0),
+            "by_leitner": {box: int(word_counts[i + 1] or 0) for i, box in enumerate(LEITNER_BOXES)},
         },
         "quizzes": {
-            "daily": quiz_stats.get(QUIZ_TYPE_DAILY, {"count": 0, "avg_score": 0.0}),
-            "weekly": quiz_stats.get(QUIZ_TYPE_WEEKLY, {"count": 0, "avg_score": 0.0}),
-            "monthly": quiz_stats.get(QUIZ_TYPE_MONTHLY, {"count": 0, "avg_score": 0.0}),
+            **{
+                name: {"count": int(quiz_values[i] or 0), "avg_score": _avg(quiz_values[quiz_count + i])}
+                for i, name in enumerate(QUIZ_TYPES)
+            },
             "recent": recent_quizzes,
         },
         "games": {
-            "count": game_count,
-            "avg_score": float(game_avg) if game_avg is not None else 0.0,
+            "count": int(game_values[0] or 0),
+            "avg_score": _avg(game_values[1]),
             "recent": recent_games,
         },
     }
+
+
+def get_user_dashboard_stats(*, user_id):
+    key = _snapshot_key(user_id, _current_version(user_id))
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_user_dashboard_stats(user_id=user_id)
+        cache.set(key, stats, DASHBOARD_CACHE_TTL_SECONDS)
+    return stats
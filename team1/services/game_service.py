@@ -1,8 +1,16 @@
-from django.db.models import Max
+import threading
+import time
+
+from django.db.models import Q
 from django.utils import timezone
 
 from core.models import User
-from team1.models import SurvivalGame
+from team1.models import SurvivalGame, SurvivalLeaderboardEntry
+
+# Process-local cache of leaderboard display names: {user_id: (expires_at, info)}
+USER_INFO_TTL_SECONDS = 5 * 60
+_user_info_cache = {}
+_user_info_lock = threading.Lock()
 
 
 def create_survival_game(user_id, score, lives):
@@ -13,6 +21,7 @@ def create_survival_game(user_id, score, lives):
         lives=lives,
         date=timezone.now().date()
     )
+    record_survival_score(game)
     return game
 
 def get_user_survival_games(user_id):
@@ -31,11 +40,13 @@ def update_survival_game(game_id, user_id, score=None, lives=None):
     # Update a specific survival game
     game = get_survival_game_by_id(game_id, user_id)
     if game:
+        previous_score = game.score
         if score is not None:
             game.score = score
         if lives is not None:
             game.lives = lives
         game.save()
+        record_survival_score(game, previous_score=previous_score)
         return game
     return None
 
@@ -46,58 +57,137 @@ def delete_survival_game(game_id, user_id):
         game.delete()
     except SurvivalGame.DoesNotExist:
         raise ValueError("Survival game not found or you are not authorized to delete this game.")
+    refresh_user_best_score(user_id)
+
 
+# =======================      Leaderboard     =======================
 
-def get_top_survival_game_rankings():
+# An entry holds the user's best game score and that game's created_at
+# (achieved_at), the earliest game winning a tie. Ties on the board are broken
+# on achieved_at, so every path below uses the same rule as the full rebuild.
+
+def record_survival_score(game, previous_score=None):
     """
-    Returns a list of dictionaries containing user details and their max score.
+    Fold a saved game's score into its user's leaderboard entry.
+
+    Scores going up only raise the entry; pass `previous_score` when the score
+    may have gone down, so the entry is recomputed if this game held the best.
     """
-    # 1. Get top 5 user_ids and their max scores
-    top_games = (
-        SurvivalGame.objects
-        .values("user_id")
-        .annotate(max_score=Max("score"))
-        .order_by("-max_score")[:5]
+    if previous_score is not None and (game.score is None or game.score < previous_score):
+        refresh_user_best_score(game.user_id)
+        return
+    if game.score is None:
+        return
+
+    achieved_at = game.created_at
+    updated = (
+        SurvivalLeaderboardEntry.objects
+        .filter(user_id=game.user_id)
+        .filter(Q(best_score__lt=game.score) | Q(best_score=game.score, achieved_at__gt=achieved_at))
+        .update(best_score=game.score, achieved_at=achieved_at)
     )
+    if not updated:
+        SurvivalLeaderboardEntry.objects.get_or_create(
+            user_id=game.user_id, defaults={"best_score": game.score, "achieved_at": achieved_at}
+        )
 
-    # 2. Extract the list of UUIDs
-    user_ids = [game['user_id'] for game in top_games]
 
-    # 3. Fetch User details for these IDs in one query
-    users = User.objects.filter(id__in=user_ids).values(
-        'id', 'first_name', 'last_name', 'email'
+def refresh_user_best_score(user_id):
+    # Only needed when a game is deleted, since the best score can then go down.
+    best = (
+        SurvivalGame.objects
+        .filter(user_id=user_id, score__isnull=False)
+        .order_by("-score", "created_at")
+        .values("score", "created_at")
+        .first()
     )
+    if best is None:
+        SurvivalLeaderboardEntry.objects.filter(user_id=user_id).delete()
+        return
 
-    # 4. Create a lookup dictionary for fast access: {uuid: user_data}
-    user_map = {u['id']: u for u in users}
+    SurvivalLeaderboardEntry.objects.update_or_create(
+        user_id=user_id,
+        defaults={"best_score": best["score"], "achieved_at": best["created_at"]},
+    )
 
-    # 5. Merge the data
-    results = []
-    for game in top_games:
-        uid = game['user_id']
-        user_info = user_map.get(uid, {})
 
-        results.append({
-            "user_id": uid,
-            "max_score": game['max_score'],
-            "first_name": user_info.get('first_name', ''),
-            "last_name": user_info.get('last_name', ''),
-            "email": user_info.get('email', '')
-        })
+def rebuild_survival_leaderboard():
+    """Recompute every entry from SurvivalGame (backfill / repair)."""
+    best = {}
+    rows = (
+        SurvivalGame.objects
+        .filter(score__isnull=False)
+        .order_by("user_id", "-score", "created_at")
+        .values_list("user_id", "score", "created_at")
+    )
+    for user_id, score, created_at in rows.iterator(chunk_size=5000):
+        best.setdefault(user_id, (score, created_at))
 
-    return results
+    SurvivalLeaderboardEntry.objects.all().delete()
+    SurvivalLeaderboardEntry.objects.bulk_create(
+        [SurvivalLeaderboardEntry(user_id=u, best_score=s, achieved_at=t) for u, (s, t) in best.items()],
+        batch_size=1000,
+    )
+    return len(best)
+
+
+def _user_display_info(user_ids):
+    now = time.monotonic()
+    result, missing = {}, []
+    with _user_info_lock:
+        for uid in user_ids:
+            entry = _user_info_cache.get(uid)
+            if entry and entry[0] > now:
+                result[uid] = entry[1]
+            else:
+                missing.append(uid)
+
+    if missing:
+        users = User.objects.filter(id__in=missing).values('id', 'first_name', 'last_name', 'email')
+        fetched = {u['id']: u for u in users}
+        with _user_info_lock:
+            for uid in missing:
+                info = fetched.get(uid, {})
+                _user_info_cache[uid] = (now + USER_INFO_TTL_SECONDS, info)
+                result[uid] = info
+    return result
+
+
+def _leaderboard_row(entry, user_info, rank):
+    return {
+        "rank": rank,
+        "user_id": entry.user_id,
+        "max_score": entry.best_score,
+        "first_name": user_info.get('first_name', ''),
+        "last_name": user_info.get('last_name', ''),
+        "email": user_info.get('email', '')
+    }
+
+
+def get_top_survival_game_rankings(limit=5):
+    """
+    Returns a list of dictionaries containing user details and their max score.
+    """
+    top = list(SurvivalLeaderboardEntry.objects.order_by("-best_score", "achieved_at")[:limit])
+    user_map = _user_display_info([e.user_id for e in top])
+    return [_leaderboard_row(e, user_map.get(e.user_id, {}), i + 1) for i, e in enumerate(top)]
 
 
 def get_user_survival_game_rank(user_id):
     """
     Returns a tuple: (rank_integer, full_user_data_dict)
-    or (None, None) if not in top 5.
+    or (None, None) if the user has no scored game yet.
     """
-    all_top_users = get_top_survival_game_rankings()
-
-    for index, data in enumerate(all_top_users):
-        # Compare UUIDs (convert to str to be safe)
-        if str(data["user_id"]) == str(user_id):
-            return index + 1, data
-
-    return None, None
\ No newline at end of file
+    entry = SurvivalLeaderboardEntry.objects.filter(user_id=user_id).first()
+    if entry is None:
+        return None, None
+
+    # Same ordering as the top list: higher score first, earlier achiever wins a tie.
+    ahead = SurvivalLeaderboardEntry.objects.filter(
+        Q(best_score__gt=entry.best_score) |
+        Q(best_score=entry.best_score, achieved_at__lt=entry.achieved_at)
+    ).count()
+    rank = ahead + 1
+
+    user_info = _user_display_info([entry.user_id]).get(entry.user_id, {})
+    return rank, _leaderboard_row(entry, user_info, rank)
@@ -1,215 +1,224 @@
 import random
-import re
-from typing import Iterable, List, Dict, Set, Optional
+from typing import Iterable, List, Dict, Set, Optional, Tuple
 
-from django.db.models import Min, Max
 from team1.models import Word, UserWord
+from team1.services.word_pool import get_word_pool, is_valid_word
 
 
-def _word_bounds():
-    agg = Word.objects.filter(is_deleted=False).aggregate(min_id=Min("id"), max_id=Max("id"))
-    return (agg["min_id"] or 1), (agg["max_id"] or 1)
+# How many candidate ids to sample per missing distractor. Candidates whose Persian
+# text collides are skipped locally, so oversampling keeps us at one DB round trip.
+DISTRACTOR_OVERSAMPLE = 4
 
 
-def _pick_random_word_excluding(exclude_ids: Set[int]) -> Optional[Word]:
-    min_id, max_id = _word_bounds()
-    if min_id > max_id:
-        return None
+def _fetch_words(ids: Iterable[int]) -> Dict[int, Word]:
+    ids = set(ids)
+    if not ids:
+        return {}
+    qs = Word.objects.filter(is_deleted=False, id__in=ids).only("id", "english", "persian", "category_id")
+    # The pool may be slightly stale, so re-check validity on the fetched rows.
+    return {w.id: w for w in qs if is_valid_word(w.english, w.persian)}
 
-    for _ in range(40):
-        rid = random.randint(min_id, max_id)
 
-        w = (
-            Word.objects
-            .filter(is_deleted=False, id__gte=rid)
-            .exclude(id__in=exclude_ids)
-            .order_by("id")
-            .first()
-        )
-
-        if not w:
-            w = (
-                Word.objects
-                .filter(is_deleted=False, id__lt=rid)
-                .exclude(id__in=exclude_ids)
-                .order_by("-id")
-                .first()
-            )
-
-        if w and w.english and w.persian:
-            if re.search(r'[\u0600-\u06FF]', w.english):
-                continue
-
-            return w
+def _distractor_candidate_ids(pool, *, correct_id: int, category_id: Optional[int],
+                              exclude_ids: Set[int], k: int = 3) -> List[int]:
+    # Same-category words first, then random words from the whole pool.
+    exclude = set(exclude_ids)
+    exclude.add(correct_id)
 
-    return None
+    candidate_ids: List[int] = []
+    if category_id:
+        candidate_ids = pool.random_ids(k * DISTRACTOR_OVERSAMPLE, exclude=exclude, category_id=category_id)
+        exclude.update(candidate_ids)
+    candidate_ids += pool.random_ids(k * DISTRACTOR_OVERSAMPLE, exclude=exclude)
+    return candidate_ids
 
 
-def _pick_distractors(*, correct_word: Word, exclude_ids: Set[int], k: int = 3) -> List[Word]:
+def _choose_distractors(*, correct_word: Word, candidates: List[Word], k: int = 3,
+                        exclude_texts: Optional[Set[str]] = None) -> List[Word]:
     distractors: List[Word] = []
-    local_exclude_ids = set(exclude_ids)
-    local_exclude_ids.add(correct_word.id)
 
-    seen_texts = set()
+    seen_texts = set(exclude_texts or ())
     if correct_word.persian:
         seen_texts.add(correct_word.persian.strip())
 
-    def take_from_queryset(qs, need: int):
-        nonlocal distractors, local_exclude_ids, seen_texts
-        if need <= 0:
-            return 0
-
-        candidates_ids = list(qs.exclude(id__in=local_exclude_ids).values_list("id", flat=True)[: need * 50])
-
-        if not candidates_ids:
-            return 0
-
-        random.shuffle(candidates_ids)
-        picked_count = 0
-
-        candidate_objs = list(Word.objects.filter(id__in=candidates_ids[:need * 5]))
-        random.shuffle(candidate_objs)
-
-        for w in candidate_objs:
-            if w.id in local_exclude_ids:
-                continue
-
-            if not w.english or not w.persian:
-                continue
-            if re.search(r'[\u0600-\u06FF]', w.english):
-                continue
-
-            text = w.persian.strip()
-            if text in seen_texts:
-                local_exclude_ids.add(w.id)
-                continue
+    for w in candidates:
+        if w.id == correct_word.id:
+            continue
+        text = w.persian.strip()
+        if text in seen_texts:
+            continue
 
-            distractors.append(w)
-            local_exclude_ids.add(w.id)
-            seen_texts.add(text)
-            picked_count += 1
+        distractors.append(w)
+        seen_texts.add(text)
+        if len(distractors) >= k:
+            break
 
-            if picked_count >= need:
-                break
+    return distractors
 
-        return picked_count
 
-    if correct_word.category_id:
-        needed = k - len(distractors)
-        take_from_queryset(
-            Word.objects.filter(is_deleted=False, category_id=correct_word.category_id),
-            needed
-        )
+def _top_up_distractors(*, correct_word: Word, distractors: List[Word], k: int = 3,
+                        exclude_texts: Optional[Set[str]] = None, rounds: int = 3) -> List[Word]:
+    """
+    اگر به هر دلیلی (متن فارسی تکراری، استخر کوچک) کمتر از k گزینه‌ی غلط داریم،
+    از کل استخر کلمه‌ی تصادفی می‌گیریم تا پر شود؛ در استخر خیلی کوچک ممکن است کمتر بماند.
+    """
+    pool = get_word_pool()
+    used_ids = {correct_word.id} | {w.id for w in distractors}
+    texts = set(exclude_texts or ()) | {w.persian.strip() for w in distractors}
 
-    attempts = 0
-    while len(distractors) < k and attempts < 100:
-        attempts += 1
-        w = _pick_random_word_excluding(local_exclude_ids)
-        if not w:
+    for _ in range(rounds):
+        need = k - len(distractors)
+        if need <= 0:
             break
+        candidate_ids = pool.random_ids(need * DISTRACTOR_OVERSAMPLE, exclude=used_ids)
+        if not candidate_ids:
+            break
+        used_ids.update(candidate_ids)
+        by_id = _fetch_words(candidate_ids)
+        extra = _choose_distractors(
+            correct_word=correct_word,
+            candidates=[by_id[i] for i in candidate_ids if i in by_id],
+            k=need,
+            exclude_texts=texts,
+        )
+        distractors += extra
+        texts.update(w.persian.strip() for w in extra)
+    return distractors
+
+
+def _pick_distractors(*, correct_word: Word, exclude_ids: Set[int], k: int = 3,
+                      exclude_texts: Optional[Set[str]] = None) -> List[Word]:
+    candidate_ids = _distractor_candidate_ids(
+        get_word_pool(),
+        correct_id=correct_word.id,
+        category_id=correct_word.category_id,
+        exclude_ids=exclude_ids,
+        k=k,
+    )
+    by_id = _fetch_words(candidate_ids)
+    candidates = [by_id[i] for i in candidate_ids if i in by_id]
+    distractors = _choose_distractors(correct_word=correct_word, candidates=candidates, k=k,
+                                      exclude_texts=exclude_texts)
+    if len(distractors) < k:
+        distractors = _top_up_distractors(correct_word=correct_word, distractors=distractors, k=k,
+                                          exclude_texts=exclude_texts)
+    return distractors
 
-        text = (w.persian or "").strip()
 
-        if text in seen_texts:
-            local_exclude_ids.add(w.id)
-            continue
+def _mcq(word: Word, distractors: List[Word]) -> Dict:
+    options = [{"word_id": word.id, "text": (word.persian or "").strip()}]
+    options += [{"word_id": w.id, "text": (w.persian or "").strip()} for w in distractors]
 
-        distractors.append(w)
-        local_exclude_ids.add(w.id)
-        seen_texts.add(text)
+    # شافل کردن نهایی گزینه‌ها
+    random.shuffle(options)
 
-    return distractors[:k]
+    return {
+        "prompt": (word.english or "").strip(),
+        "word_id": word.id,
+        "options": options[:4],  # مطمئن شویم دقیقاً ۴ تاست
+        "answer_word_id": word.id,
+    }
 
 
 def build_mcq_for_word(*, word: Word, exclude_option_texts: Optional[Set[str]] = None) -> Dict:
-    if exclude_option_texts is None:
-        exclude_option_texts = set()
-
     correct_text = (word.persian or "").strip()
-    correct = {"word_id": word.id, "text": correct_text}
-
-    if not correct["text"]:
+    if not correct_text:
         raise ValueError("Word has empty persian")
 
     # اینجا ۳ گزینه غلط را می‌گیریم. خود تابع _pick_distractors تضمین می‌کند
     # که متن فارسی آن‌ها با `word` و با یکدیگر تکراری نباشد.
-    distractors = _pick_distractors(correct_word=word, exclude_ids=set(), k=3)
+    distractors = _pick_distractors(
+        correct_word=word, exclude_ids=set(), k=3, exclude_texts=exclude_option_texts,
+    )
+    return _mcq(word, distractors)
 
-    options = [correct] + [{"word_id": w.id, "text": (w.persian or "").strip()} for w in distractors]
 
-    # شافل کردن نهایی گزینه‌ها
-    random.shuffle(options)
+def _build_mcqs(targets: List[Tuple[int, Optional[int]]], *, known: Optional[Dict[int, Word]] = None,
+                k: int = 3, skip_invalid: bool = False) -> List[Dict]:
+    """
+    MCQs for many (word_id, category_id) targets. Distractor candidates for every
+    target are sampled from the in-memory pool and fetched together with the
+    targets in a single query.
+    """
+    if not targets:
+        return []
 
-    # اگر به هر دلیلی (که الان بعید است) کمتر از ۴ گزینه شد، اینجا پر می‌کنیم
-    # (این بخش به عنوان مکانیزم دفاعی نهایی باقی می‌ماند)
-    uniq_texts = {o["text"] for o in options}
-    excluded_ids_final = {word.id} | {o["word_id"] for o in options if "word_id" in o}
+    known = dict(known or {})
+    pool = get_word_pool()
+    candidate_ids = {
+        word_id: _distractor_candidate_ids(pool, correct_id=word_id, category_id=category_id,
+                                           exclude_ids=set(), k=k)
+        for word_id, category_id in targets
+    }
 
-    while len(options) < 4:
-        extra = _pick_random_word_excluding(excluded_ids_final)
-        if not extra:
-            break
-        t = (extra.persian or "").strip()
+    # یک رفت‌وبرگشت به دیتابیس برای همه‌ی سوال‌ها و گزینه‌ها
+    missing = {word_id for word_id, _ in targets if word_id not in known}
+    for ids in candidate_ids.values():
+        missing.update(ids)
+    missing.difference_update(known)
+    if missing:
+        known.update(
+            (w.id, w) for w in
+            Word.objects.filter(is_deleted=False, id__in=missing).only("id", "english", "persian", "category_id")
+        )
 
-        if t and t not in uniq_texts and t not in exclude_option_texts:
-            options.append({"word_id": extra.id, "text": t})
-            uniq_texts.add(t)
-            excluded_ids_final.add(extra.id)
+    questions: List[Dict] = []
+    for word_id, _category_id in targets:
+        w = known.get(word_id)
+        if not w:
+            continue
+        if not (w.persian or "").strip():
+            if skip_invalid:
+                continue
+            raise ValueError("Word has empty persian")
+
+        candidates = [
+            known[i] for i in candidate_ids[word_id]
+            if i in known and is_valid_word(known[i].english, known[i].persian)
+        ]
+        distractors = _choose_distractors(correct_word=w, candidates=candidates, k=k)
+        if len(distractors) < k:
+            # Rare (colliding Persian texts or a small pool): fall back to a per-question top-up.
+            distractors = _top_up_distractors(correct_word=w, distractors=distractors, k=k)
+        questions.append(_mcq(w, distractors))
 
-    return {
-        "prompt": (word.english or "").strip(),
-        "word_id": word.id,
-        "options": options[:4],  # مطمئن شویم دقیقاً ۴ تاست
-        "answer_word_id": word.id,
-    }
+    return questions
+
+
+def build_mcqs_for_words(words: List[Word], *, k: int = 3) -> List[Dict]:
+    """Batch version of build_mcq_for_word: one DB round trip for all distractors."""
+    return _build_mcqs(
+        [(w.id, w.category_id) for w in words],
+        known={w.id: w for w in words},
+        k=k,
+    )
 
 
 def build_quiz_questions_for_user(*, user_id, count: int) -> List[Dict]:
-    word_ids = list(
+    targets = list(
         UserWord.objects
-        .filter(is_deleted=False, user_id=user_id)
-        .values_list("word_id", flat=True)
+        .filter(is_deleted=False, user_id=user_id, word__is_deleted=False)
+        .values_list("word_id", "word__category_id")
         .distinct()
     )
 
-    if len(word_ids) == 0:
+    if len(targets) == 0:
         return []
 
-    if count > len(word_ids):
-        count = len(word_ids)
-
-    chosen_ids = random.sample(word_ids, k=count)
-    words = list(Word.objects.filter(is_deleted=False, id__in=chosen_ids))
+    if count > len(targets):
+        count = len(targets)
 
-    by_id = {w.id: w for w in words}
-    ordered_words = [by_id[i] for i in chosen_ids if i in by_id]
-
-    questions: List[Dict] = []
-    for w in ordered_words:
-        q = build_mcq_for_word(word=w)
-        questions.append(q)
-
-    return questions
+    return _build_mcqs(random.sample(targets, k=count))
 
 
 def build_game_questions(*, count: int, used_word_ids: Optional[Set[int]] = None) -> List[Dict]:
     if used_word_ids is None:
         used_word_ids = set()
 
-    questions: List[Dict] = []
-    attempts = 0
-    while len(questions) < count and attempts < count * 60:
-        attempts += 1
-        w = _pick_random_word_excluding(used_word_ids)
-        if not w:
-            break
-        try:
-            q = build_mcq_for_word(word=w)
-        except ValueError:
-            used_word_ids.add(w.id)
-            continue
-
-        used_word_ids.add(w.id)
-        questions.append(q)
+    # A couple of spare targets in case some pooled ids went stale since the pool was built.
+    targets = get_word_pool().random_entries(count + 2, exclude=used_word_ids)
+    questions = _build_mcqs(targets, skip_invalid=True)[:count]
 
+    for q in questions:
+        used_word_ids.add(q["word_id"])
     return questions
@@ -1,10 +1,15 @@
 from django.utils import timezone
 from team1.models import Word, UserWord
+from team1.services.word_search import get_search_backend
 from datetime import timedelta
 
 
 def search_user_words(user_id, search_term):
-    return UserWord.objects.filter(user_id=user_id, word__english__icontains=search_term, word__persian__icontains=search_term)
+    user_words = UserWord.objects.filter(user_id=user_id)
+    if not search_term:
+        return user_words
+    # English OR Persian match, served by the dictionary search index.
+    return get_search_backend().filter_queryset(user_words, search_term, prefix="word__")
 
 
 def get_user_words_by_leitner(user_id, leitner_type):
@@ -25,7 +30,8 @@ def create_user_word(user_id, word_id, description, image=None):
         user_id=user_id,
         description=description,
         image=image,  # Pass the file object here
-        leitner_type='new'
+        leitner_type='new',
+        next_due=compute_next_due('new', None),
     )
     return user_word
 
@@ -50,6 +56,9 @@ def edit_user_word(user_word_id, description, image=None, move_to_next_box=False
     elif reset_to_day_1:
         user_word.leitner_type = '1day'
 
+    user_word.next_due = compute_next_due(
+        user_word.leitner_type, user_word.last_check_date, timezone.localdate(user_word.created_at)
+    )
     user_word.save()
     user_word.refresh_from_db()
 
@@ -62,6 +71,16 @@ def get_next_leitner_box(current_box):
     return 'mastered'  # If it's 'mastered', it stays 'mastered'
 
 
+def get_due_user_words(user_id, today=None):
+    """Words due for review, oldest first: one range scan on (user_id, next_due)."""
+    today = today or timezone.now().date()
+    return (
+        UserWord.objects
+        .filter(user_id=user_id, next_due__lte=today, is_deleted=False)
+        .select_related("word", "word__category")
+    )
+
+
 def get_user_word_by_id(user_word_id, user_id):
     try:
         user_word = UserWord.objects.get(id=user_word_id, user_id=user_id)
@@ -88,6 +107,18 @@ INTERVAL_DAYS = {
 }
 
 
+def compute_next_due(leitner_type, last_check_date, created_on=None):
+    """
+    The date from which is_due() is true for a word. Words that are always due
+    (mastered, or never checked) get the date they became due so they sort first.
+    """
+    if leitner_type == 'mastered' or not last_check_date:
+        return last_check_date or created_on or timezone.now().date()
+
+    days = INTERVAL_DAYS.get(leitner_type) or 0
+    return last_check_date + timedelta(days=days)
+
+
 def is_due(user_word):
     """Check if the word is due based on its leitner_type and last_check_date."""
     if user_word.leitner_type == 'mastered':
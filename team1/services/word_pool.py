@@ -0,0 +1,128 @@
+import random
+import re
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.core.cache import cache
+
+from team1.models import Word
+
+PERSIAN_SCRIPT_RE = re.compile(r'[\u0600-\u06FF]')
+
+# Rebuild at least this often, so writes that bypass signals (bulk_create, update())
+# and writes made by other worker processes are eventually picked up.
+WORD_POOL_TTL_SECONDS = 10 * 60
+_VERSION_CACHE_KEY = "team1:word_pool:version"
+
+
+def is_valid_word(english, persian) -> bool:
+    # Same rule the question generator has always used: both texts present and
+    # no Persian script in the English field.
+    if not english or not persian or not persian.strip():
+        return False
+    return not PERSIAN_SCRIPT_RE.search(english)
+
+
+class WordPool:
+    """
+    Immutable snapshot of valid word ids.
+
+    `ids[i]` / `categories[i]` are parallel compact arrays (category 0 = none), and
+    `by_category` holds one id array per category, so sampling never touches the DB.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, Optional[int]]], version=None):
+        self.ids = array("q")
+        self.categories = array("q")
+        by_category: Dict[int, array] = {}
+
+        for word_id, category_id in rows:
+            self.ids.append(word_id)
+            self.categories.append(category_id or 0)
+            if category_id:
+                by_category.setdefault(category_id, array("q")).append(word_id)
+
+        self.by_category = by_category
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _sample_positions(self, size: int, k: int, accept) -> List[int]:
+        # Rejection sampling: O(1) per draw while the exclusion set is small
+        # compared to the pool, with a linear fallback when it is not.
+        picked: List[int] = []
+        seen: Set[int] = set()
+        tries = 0
+        max_tries = k * 8 + 32
+        while len(picked) < k and tries < max_tries:
+            tries += 1
+            pos = random.randrange(size)
+            if pos in seen:
+                continue
+            seen.add(pos)
+            if accept(pos):
+                picked.append(pos)
+
+        if len(picked) < k:
+            rest = [p for p in range(size) if p not in seen and accept(p)]
+            picked.extend(random.sample(rest, min(k - len(picked), len(rest))))
+        return picked
+
+    def random_ids(self, k: int, exclude: Set[int] = frozenset(), category_id: Optional[int] = None) -> List[int]:
+        source = self.by_category.get(category_id) if category_id else self.ids
+        if not source or k <= 0:
+            return []
+        positions = self._sample_positions(len(source), k, lambda p: source[p] not in exclude)
+        return [source[p] for p in positions]
+
+    def random_entries(self, k: int, exclude: Set[int] = frozenset()) -> List[Tuple[int, Optional[int]]]:
+        """Random (word_id, category_id) pairs not in `exclude`."""
+        if not self.ids or k <= 0:
+            return []
+        ids, cats = self.ids, self.categories
+        positions = self._sample_positions(len(ids), k, lambda p: ids[p] not in exclude)
+        return [(ids[p], cats[p] or None) for p in positions]
+
+
+_pool: Optional[WordPool] = None
+_lock = threading.Lock()
+
+
+def _build_pool(version) -> WordPool:
+    rows = (
+        Word.objects
+        .filter(is_deleted=False)
+        .values_list("id", "english", "persian", "category_id")
+        .order_by("id")
+    )
+    return WordPool(
+        ((word_id, category_id) for word_id, english, persian, category_id in rows.iterator(chunk_size=5000)
+         if is_valid_word(english, persian)),
+        version=version,
+    )
+
+
+def get_word_pool() -> WordPool:
+    global _pool
+    version = cache.get(_VERSION_CACHE_KEY)
+    pool = _pool
+    if pool is not None and pool.version == version and time.monotonic() - pool.built_at < WORD_POOL_TTL_SECONDS:
+        return pool
+
+    with _lock:
+        pool = _pool
+        if pool is None or pool.version != version or time.monotonic() - pool.built_at >= WORD_POOL_TTL_SECONDS:
+            pool = _build_pool(version)
+            _pool = pool
+    return pool
+
+
+def invalidate_word_pool():
+    global _pool
+    _pool = None
+    # A shared cache backend lets other processes notice too.
+    cache.set(_VERSION_CACHE_KEY, time.time_ns(), None)
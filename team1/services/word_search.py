@@ -0,0 +1,215 @@
+"""
+Word search for the team1 dictionary.
+
+`get_search_backend()` returns the configured backend
+(settings.TEAM1_WORD_SEARCH_BACKEND, a dotted path). By default a SQLite team1
+database gets an FTS5 trigram index (substring matches served from the index,
+ranked with bm25); any other database falls back to the old icontains scan with
+a simple exact > prefix > substring ranking.
+
+English text is lower-cased and Persian text is normalized (Arabic yeh/kaf,
+diacritics, tatweel, ZWNJ) both when indexing and when querying.
+"""
+import re
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from team1.models import Word
+
+_PERSIAN_TRANSLATION = str.maketrans({
+    "ي": "ی",  # Arabic yeh
+    "ى": "ی",  # alef maksura
+    "ك": "ک",  # Arabic kaf
+    "ة": "ه",
+    "ۀ": "ه",
+    "أ": "ا",
+    "إ": "ا",
+    "ٱ": "ا",
+    "ؤ": "و",
+    "\u200c": " ",  # ZWNJ
+    "\u0640": None,  # tatweel
+})
+_DIACRITICS_RE = re.compile(r'[\u064B-\u065F\u0670]')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    text = _DIACRITICS_RE.sub("", text.translate(_PERSIAN_TRANSLATION))
+    return _SPACES_RE.sub(" ", text).strip().lower()
+
+
+# Ranked search results are (rank, word_id); lower rank is better.
+SearchHit = Tuple[float, int]
+
+
+class WordSearchBackend:
+    def filter_queryset(self, queryset, query: str, prefix: str = ""):
+        """Restrict a queryset to rows whose word (`<prefix>english`/`persian`) matches."""
+        raise NotImplementedError
+
+    def search(self, query: str, limit: int, after: Optional[SearchHit] = None) -> List[SearchHit]:
+        """Best matches first; `after` is the last hit of the previous page (keyset)."""
+        raise NotImplementedError
+
+    def index_words(self, words: Iterable[Word]):
+        pass
+
+    def remove_words(self, word_ids: Iterable[int]):
+        pass
+
+    def rebuild(self, batch_size=5000) -> int:
+        """Re-index every live word; returns how many were indexed."""
+        return 0
+
+
+class DatabaseLikeBackend(WordSearchBackend):
+    """Portable fallback: icontains scan (what the API always did) plus a coarse rank."""
+
+    def _match(self, query, prefix=""):
+        return Q(**{f"{prefix}english__icontains": query}) | Q(**{f"{prefix}persian__icontains": query})
+
+    def filter_queryset(self, queryset, query, prefix=""):
+        return queryset.filter(self._match(query, prefix))
+
+    def search(self, query, limit, after=None):
+        qs = (
+            Word.objects.filter(is_deleted=False)
+            .filter(self._match(query))
+            .annotate(rank=Case(
+                When(Q(english__iexact=query) | Q(persian__iexact=query), then=Value(0)),
+                When(Q(english__istartswith=query) | Q(persian__istartswith=query), then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField(),
+            ))
+        )
+        if after is not None:
+            rank, word_id = after
+            qs = qs.filter(Q(rank__gt=rank) | Q(rank=rank, id__gt=word_id))
+        return [(float(r), i) for r, i in qs.order_by("rank", "id").values_list("rank", "id")[:limit]]
+
+
+class SQLiteFTS5Backend(WordSearchBackend):
+    TABLE = "words_fts"
+    CREATE_SQL = f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(english, persian, tokenize='trigram')"
+    # English hits weigh more than Persian ones.
+    SEARCH_SQL = (
+        f"SELECT rank, rowid FROM ("
+        f"  SELECT bm25({TABLE}, 2.0, 1.0) AS rank, rowid FROM {TABLE} WHERE {TABLE} MATCH %s"
+        f") WHERE rank > %s OR (rank = %s AND rowid > %s) ORDER BY rank, rowid LIMIT %s"
+    )
+    MATCH_IDS_SQL = f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s"
+    # The trigram tokenizer cannot match anything shorter than this.
+    MIN_QUERY_LENGTH = 3
+
+    def __init__(self, using="team1"):
+        self.using = using
+        self._ready = False
+        self._lock = threading.Lock()
+        self._fallback = DatabaseLikeBackend()
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        # One quoted phrase = substring match on the trigram index.
+        return '"' + normalize_text(query).replace('"', '""') + '"'
+
+    def _ensure_index(self):
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            with connections[self.using].cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [self.TABLE])
+                exists = cursor.fetchone() is not None
+                cursor.execute(self.CREATE_SQL)
+            # Concurrent first searches wait here rather than read a half-filled index.
+            if not exists:
+                self._fill()
+            self._ready = True
+
+    def _usable(self, query):
+        return len(normalize_text(query)) >= self.MIN_QUERY_LENGTH
+
+    def filter_queryset(self, queryset, query, prefix=""):
+        if not self._usable(query):
+            return self._fallback.filter_queryset(queryset, query, prefix)
+        self._ensure_index()
+        # A subquery, so the database joins against the index instead of us binding every id.
+        match_ids = RawSQL(self.MATCH_IDS_SQL, [self.match_expression(query)])
+        return queryset.filter(**{f"{prefix}id__in": match_ids})
+
+    def search(self, query, limit, after=None):
+        if not self._usable(query):
+            return self._fallback.search(query, limit, after)
+        self._ensure_index()
+        rank, word_id = after if after is not None else (float("-inf"), 0)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(self.SEARCH_SQL, [self.match_expression(query), rank, rank, word_id, limit])
+            return [(float(r), int(i)) for r, i in cursor.fetchall()]
+
+    @staticmethod
+    def _rows(words):
+        return [(w.id, normalize_text(w.english), normalize_text(w.persian)) for w in words]
+
+    def index_words(self, words):
+        self._ensure_index()
+        rows = self._rows(words)
+        if not rows:
+            return
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.TABLE} WHERE rowid = %s", [(r[0],) for r in rows])
+            cursor.executemany(f"INSERT INTO {self.TABLE}(rowid, english, persian) VALUES (%s, %s, %s)", rows)
+
+    def remove_words(self, word_ids):
+        self._ensure_index()
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.TABLE} WHERE rowid = %s", [(i,) for i in word_ids])
+
+    def rebuild(self, batch_size=5000):
+        self._ensure_index()
+        return self._fill(batch_size)
+
+    def _fill(self, batch_size=5000):
+        total = 0
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.TABLE}")
+            batch = []
+            words = Word.objects.using(self.using).filter(is_deleted=False).only("id", "english", "persian")
+            for w in words.iterator(chunk_size=batch_size):
+                batch.append(w)
+                if len(batch) >= batch_size:
+                    cursor.executemany(
+                        f"INSERT INTO {self.TABLE}(rowid, english, persian) VALUES (%s, %s, %s)", self._rows(batch)
+                    )
+                    total += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(
+                    f"INSERT INTO {self.TABLE}(rowid, english, persian) VALUES (%s, %s, %s)", self._rows(batch)
+                )
+                total += len(batch)
+        return total
+
+
+_backend = None
+
+
+def get_search_backend() -> WordSearchBackend:
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "TEAM1_WORD_SEARCH_BACKEND", None)
+        if path:
+            _backend = import_string(path)()
+        elif connections["team1"].vendor == "sqlite":
+            _backend = SQLiteFTS5Backend()
+        else:
+            _backend = DatabaseLikeBackend()
+    return _backend
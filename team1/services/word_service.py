@@ -1,6 +1,7 @@
 from django.db.models import Q
 
 from team1.models import Word
+from team1.services.word_search import get_search_backend
 
 
 def get_all_words_queryset(search_query=None, exact=False):
@@ -12,9 +13,12 @@ def get_all_words_queryset(search_query=None, exact=False):
                 Q(english__iexact=search_query) | Q(persian__iexact=search_query)
             )
         else:
-            # Partial match - Slower
-            words = words.filter(
-                Q(english__icontains=search_query) | Q(persian__icontains=search_query)
-            )
+            words = get_search_backend().filter_queryset(words, search_query)
+
+    return words.order_by('-created_at', '-id')
+
 
-    return words.order_by('-created_at')
\ No newline at end of file
+def get_words_by_ids(word_ids):
+    """Words for `word_ids`, in that order (used for ranked search pages)."""
+    words = Word.objects.filter(is_deleted=False).in_bulk(word_ids)
+    return [words[i] for i in word_ids if i in words]
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Quiz, SurvivalGame, UserWord, Word
+from .services.dashboard_service import invalidate_user_dashboard
+from .services.word_pool import invalidate_word_pool
+from .services.word_search import get_search_backend
+
+
+@receiver(post_save, sender=UserWord)
+@receiver(post_delete, sender=UserWord)
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_save, sender=SurvivalGame)
+@receiver(post_delete, sender=SurvivalGame)
+def invalidate_dashboard_snapshot(sender, instance, **kwargs):
+    invalidate_user_dashboard(instance.user_id)
+
+
+@receiver(post_save, sender=Word)
+def index_word(sender, instance, **kwargs):
+    if instance.is_deleted:
+        get_search_backend().remove_words([instance.id])
+    else:
+        get_search_backend().index_words([instance])
+
+
+@receiver(post_delete, sender=Word)
+def unindex_word(sender, instance, **kwargs):
+    get_search_backend().remove_words([instance.id])
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_delete, sender=Word)
+def invalidate_word_pool_on_change(sender, **kwargs):
+    invalidate_word_pool()
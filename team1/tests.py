@@ -1,6 +1,283 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+
+from team1.models import Category, Quiz, SurvivalGame, SurvivalLeaderboardEntry, UserWord, Word
+from team1.services.word_pool import WordPool, is_valid_word
+from team1.services.word_search import SQLiteFTS5Backend, normalize_text
+
 
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team1/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+class WordPoolTests(SimpleTestCase):
+    def test_sampling_respects_exclusions_and_categories(self):
+        pool = WordPool([(i, 1 if i % 2 else None) for i in range(1, 101)])
+
+        ids = pool.random_ids(10, exclude=set(range(1, 95)))
+        self.assertEqual(len(ids), 6)
+        self.assertTrue(all(i >= 95 for i in ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+        self.assertTrue(all(i % 2 for i in pool.random_ids(20, category_id=1)))
+        self.assertEqual(pool.random_ids(5, category_id=99), [])
+        for word_id, category_id in pool.random_entries(10):
+            self.assertEqual(category_id, 1 if word_id % 2 else None)
+
+    def test_valid_word_rule(self):
+        self.assertTrue(is_valid_word("book", "کتاب"))
+        self.assertFalse(is_valid_word("کتاب", "کتاب"))
+        self.assertFalse(is_valid_word("book", "  "))
+
+
+class WordSearchTests(SimpleTestCase):
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  Hello   World "), "hello world")
+        # Arabic yeh/kaf, diacritics and tatweel collapse to the Persian forms.
+        self.assertEqual(normalize_text("كتابي"), normalize_text("کتابی"))
+        self.assertEqual(normalize_text("کِتـاب"), "کتاب")
+        self.assertEqual(normalize_text(None), "")
+
+    def test_match_expression_is_a_quoted_phrase(self):
+        self.assertEqual(SQLiteFTS5Backend.match_expression('say "hi"'), '"say ""hi"""')
+
+
+class QuestionGeneratorTests(SimpleTestCase):
+    def test_options_are_topped_up_when_category_texts_collide(self):
+        from unittest import mock
+        from team1.services import question_generator
+
+        words = {1: Word(id=1, english="cat", persian="گربه", category_id=7)}
+        # Every other word of the category shares one Persian text.
+        for i in range(2, 6):
+            words[i] = Word(id=i, english=f"kitty{i}", persian="گربه‌ی کوچک", category_id=7)
+        for i, persian in ((6, "سگ"), (7, "پرنده"), (8, "ماهی")):
+            words[i] = Word(id=i, english=f"w{i}", persian=persian)
+        pool = WordPool((w.id, w.category_id) for w in words.values())
+
+        # The first sample only finds the colliding words; the top-up has to find the rest.
+        with mock.patch.object(question_generator, "get_word_pool", return_value=pool), \
+                mock.patch.object(question_generator, "_distractor_candidate_ids", return_value=[2, 3, 4, 5]), \
+                mock.patch.object(question_generator, "_fetch_words",
+                                  side_effect=lambda ids: {i: words[i] for i in ids if i in words}):
+            question = question_generator.build_mcq_for_word(word=words[1])
+
+        texts = [o["text"] for o in question["options"]]
+        self.assertEqual(len(texts), 4)
+        self.assertEqual(len(set(texts)), 4)
+        self.assertIn("گربه", texts)
+
+
+class Team1TablesMixin:
+    # team1 ships no migrations (its schema lives outside this repo), so the
+    # tests create the tables they need in the test database themselves.
+    databases = {"default", "team1"}
+    table_models = ()
+
+    @classmethod
+    def setUpClass(cls):
+        from django.db import connections
+
+        with connections["team1"].schema_editor() as editor:
+            for model in cls.table_models:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        from django.db import connections
+
+        super().tearDownClass()
+        with connections["team1"].schema_editor() as editor:
+            for model in reversed(cls.table_models):
+                editor.delete_model(model)
+
+
+class DueReviewPaginationTests(Team1TablesMixin, TestCase):
+    table_models = (Category, Word, UserWord)
+
+    def test_pages_walk_ties_on_next_due_without_offset(self):
+        import uuid
+        from datetime import date, timedelta
+        from django.db import connections
+        from django.test import RequestFactory
+        from django.test.utils import CaptureQueriesContext
+        from team1.pagination import DueReviewPagination
+        from team1.services.user_words_service import get_due_user_words
+
+        user_id = uuid.uuid4()
+        word = Word.objects.create(english="cat", persian="گربه")
+        today = date(2026, 1, 10)
+        # 30 words due on the same day, 15 on earlier days, 5 not due yet.
+        dues = [today] * 30 + [today - timedelta(days=i % 3 + 1) for i in range(15)] + [today + timedelta(days=1)] * 5
+        for due in dues:
+            UserWord.objects.create(user_id=user_id, word=word, description="", next_due=due)
+        expected = list(
+            UserWord.objects.filter(next_due__lte=today).order_by("next_due", "user_word_id")
+            .values_list("user_word_id", flat=True)
+        )
+
+        factory = RequestFactory()
+        seen, url, pages = [], "/team1/api/user-words/due/?page_size=20", 0
+        while url:
+            paginator = DueReviewPagination()
+            with CaptureQueriesContext(connections["team1"]) as ctx:
+                page = paginator.paginate_queryset(get_due_user_words(user_id, today), factory.get(url))
+            self.assertNotIn("OFFSET", ctx.captured_queries[-1]["sql"].upper())
+            seen += [uw.user_word_id for uw in page]
+            url = paginator.get_paginated_response([]).data["next"]
+            pages += 1
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+
+    def test_invalid_cursor_is_not_found(self):
+        from rest_framework.exceptions import NotFound
+        from team1.pagination import DueReviewPagination
+
+        with self.assertRaises(NotFound):
+            DueReviewPagination.decode_cursor("not-a-cursor")
+
+
+class FTS5FilterTests(Team1TablesMixin, TestCase):
+    table_models = (Category, Word)
+
+    def test_matches_are_filtered_in_one_query(self):
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+
+        Word.objects.bulk_create(
+            Word(english=english, persian=persian)
+            for english, persian in (("book", "کتاب"), ("bookshelf", "قفسه"), ("cat", "گربه"))
+        )
+        backend = SQLiteFTS5Backend()
+        backend.rebuild()
+
+        with CaptureQueriesContext(connections["team1"]) as ctx:
+            words = list(backend.filter_queryset(Word.objects.all(), "BOOK").order_by("id"))
+
+        self.assertEqual([w.english for w in words], ["book", "bookshelf"])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn("MATCH", ctx.captured_queries[0]["sql"])
+
+
+class WordListPaginationTests(Team1TablesMixin, TestCase):
+    table_models = (Category, Word)
+
+    def test_numbered_pages_by_default_and_keyset_on_request(self):
+        from unittest import mock
+        from core.jwt_utils import create_access_token
+        from core.models import User
+        from team1.services import word_search
+
+        Word.objects.bulk_create(Word(english=f"book{i}", persian=f"کتاب{i}") for i in range(3))
+        user = User.objects.create_user(email="w1@test.com", password="pass1234", first_name="W")
+        self.client.cookies["access_token"] = create_access_token(user)
+
+        # A fresh backend builds its index inside this test's transaction.
+        with mock.patch.object(word_search, "_backend", SQLiteFTS5Backend()):
+            data = self.client.get("/team1/words/").json()
+            self.assertEqual((data["count"], len(data["results"])), (3, 3))
+            data = self.client.get("/team1/words/?search=book").json()
+            self.assertEqual(data["count"], 3)
+
+            data = self.client.get("/team1/words/?search=book&pagination=cursor").json()
+            self.assertNotIn("count", data)
+            self.assertEqual(len(data["results"]), 3)
+
+class ComputeNextDueTests(SimpleTestCase):
+    def test_intervals_and_always_due_words(self):
+        from datetime import date
+        from team1.services.user_words_service import compute_next_due
+
+        checked = date(2026, 3, 1)
+        self.assertEqual(compute_next_due("new", checked), date(2026, 3, 2))
+        self.assertEqual(compute_next_due("1day", checked), date(2026, 3, 2))
+        self.assertEqual(compute_next_due("3days", checked), date(2026, 3, 4))
+        self.assertEqual(compute_next_due("7days", checked), date(2026, 3, 8))
+        # Always due: the date they became due, so they sort first.
+        self.assertEqual(compute_next_due("mastered", checked), checked)
+        self.assertEqual(compute_next_due("3days", None, created_on=date(2026, 2, 1)), date(2026, 2, 1))
+
+
+class DashboardStatsTests(Team1TablesMixin, TestCase):
+    table_models = (Category, Word, UserWord, Quiz, SurvivalGame)
+
+    def test_counts_and_averages_match_per_table_queries(self):
+        import uuid
+        from team1.services.dashboard_service import compute_user_dashboard_stats
+
+        user_id, other_id = uuid.uuid4(), uuid.uuid4()
+        word = Word.objects.bulk_create([Word(english="cat", persian="گربه")])[0]
+        for box in ("new", "new", "1day", "mastered"):
+            UserWord.objects.create(user_id=user_id, word=word, description="", leitner_type=box)
+        UserWord.objects.create(user_id=user_id, word=word, description="", leitner_type="7days", is_deleted=True)
+        UserWord.objects.create(user_id=other_id, word=word, description="", leitner_type="3days")
+        for quiz_type, score in ((1, 60), (1, 75), (3, 90)):
+            Quiz.objects.create(user_id=user_id, type=quiz_type, score=score)
+        Quiz.objects.create(user_id=other_id, type=2, score=10)
+        for score in (3, 8):
+            SurvivalGame.objects.create(user_id=user_id, score=score, lives=0)
+
+        stats = compute_user_dashboard_stats(user_id=user_id)
+
+        self.assertEqual(stats["words"]["total"], 4)
+        self.assertEqual(
+            stats["words"]["by_leitner"], {"new": 2, "1_day": 1, "3_days": 0, "7_days": 0, "mastered": 1}
+        )
+        self.assertEqual(stats["quizzes"]["daily"], {"count": 2, "avg_score": 67.5})
+        self.assertEqual(stats["quizzes"]["weekly"], {"count": 0, "avg_score": 0.0})
+        self.assertEqual(stats["quizzes"]["monthly"], {"count": 1, "avg_score": 90.0})
+        self.assertEqual(len(stats["quizzes"]["recent"]), 3)
+        self.assertEqual((stats["games"]["count"], stats["games"]["avg_score"]), (2, 5.5))
+
+    def test_empty_user_and_user_without_reviews(self):
+        import uuid
+        from team1.services.dashboard_service import LEITNER_BOXES, compute_user_dashboard_stats
+
+        empty = compute_user_dashboard_stats(user_id=uuid.uuid4())
+        self.assertEqual(empty["words"], {"total": 0, "by_leitner": dict.fromkeys(LEITNER_BOXES, 0)})
+        self.assertEqual(empty["games"], {"count": 0, "avg_score": 0.0, "recent": []})
+
+        # Words but no quizzes or games yet: the missing UNION rows read as zero.
+        user_id = uuid.uuid4()
+        word = Word.objects.bulk_create([Word(english="cat", persian="گربه")])[0]
+        UserWord.objects.create(user_id=user_id, word=word, description="")
+        stats = compute_user_dashboard_stats(user_id=user_id)
+        self.assertEqual(stats["words"]["total"], 1)
+        self.assertEqual(stats["quizzes"]["daily"], {"count": 0, "avg_score": 0.0})
+        self.assertEqual(stats["games"]["count"], 0)
+
+
+class SurvivalLeaderboardTests(Team1TablesMixin, TestCase):
+    table_models = (SurvivalGame, SurvivalLeaderboardEntry)
+
+    def _board(self):
+        return list(
+            SurvivalLeaderboardEntry.objects.order_by("-best_score", "achieved_at")
+            .values_list("user_id", "best_score", "achieved_at")
+        )
+
+    def test_incremental_updates_match_a_rebuild(self):
+        import uuid
+        from team1.services import game_service
+
+        first, second = uuid.uuid4(), uuid.uuid4()
+        game = game_service.create_survival_game(first, 10, 0)
+        tie = game_service.create_survival_game(second, 10, 0)
+        game_service.create_survival_game(second, 4, 0)
+
+        # Equal scores: the earlier game ranks first.
+        self.assertEqual(game_service.get_user_survival_game_rank(first)[0], 1)
+        self.assertEqual(game_service.get_user_survival_game_rank(second)[0], 2)
+
+        # Lowering or deleting the best game lowers the entry.
+        game_service.update_survival_game(game.survival_game_id, first, score=2)
+        self.assertEqual(SurvivalLeaderboardEntry.objects.get(user_id=first).best_score, 2)
+        game_service.delete_survival_game(tie.survival_game_id, second)
+        self.assertEqual(SurvivalLeaderboardEntry.objects.get(user_id=second).best_score, 4)
+
+        incremental = self._board()
+        game_service.rebuild_survival_leaderboard()
+        self.assertEqual(self._board(), incremental)
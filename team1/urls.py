@@ -8,7 +8,7 @@ from .views.games_view import SurvivalGameCreateAPIView, SurvivalGameListAPIView
 from .views.quiz_view import QuizCreateAPIView, QuizListAPIView, QuizUpdateAPIView, QuizQuestionsAPIView, \
     QuizAnswerAPIView, QuizDeleteAPIView
 from .views.user_words_view import UserWordCreateAPIView, UserWordSearchAPIView, UserWordListByLeitnerAPIView, \
-    UserWordDeleteAPIView, UserWordEditAPIView, UserWordGetByIdAPIView
+    UserWordDeleteAPIView, UserWordEditAPIView, UserWordGetByIdAPIView, UserWordDueAPIView
 from .views.word_views import WordListAPIView
 from .views.redirect_views import team_redirect
 from django.conf import settings
@@ -22,6 +22,7 @@ urlpatterns = [
     # =======================      UserWords     =======================
     path('userwords/', UserWordCreateAPIView.as_view(), name='userword-create'),
     path('userwords/search/', UserWordSearchAPIView.as_view(), name='userword-search'),
+    path('userwords/due/', UserWordDueAPIView.as_view(), name='userword-due'),
     path('userwords/leitner/<str:leitner_type>/', UserWordListByLeitnerAPIView.as_view(), name='userword-list-by-leitner'),
     path('userwords/<int:user_word_id>/delete/', UserWordDeleteAPIView.as_view(), name='userword-delete'),
     path('userwords/<int:user_word_id>/edit/', UserWordEditAPIView.as_view(), name='userword-edit'),
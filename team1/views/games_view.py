@@ -11,7 +11,8 @@ from team1.serializers import SurvivalGameSerializer
 from team1.services.answer_service import cache_game_questions, grade_game_answers, set_active_question, \
     validate_and_grade_single_answer
 from team1.services.game_service import create_survival_game, get_user_survival_games, get_survival_game_by_id, \
-    update_survival_game, delete_survival_game, get_user_survival_game_rank, get_top_survival_game_rankings
+    update_survival_game, delete_survival_game, get_user_survival_game_rank, get_top_survival_game_rankings, \
+    record_survival_score
 from team1.services.question_generator import build_game_questions
 
 
@@ -86,7 +87,11 @@ class SurvivalGameDeleteAPIView(APIView):
 class TopSurvivalGameRankingAPIView(APIView):
     @method_decorator(api_login_required)
     def get(self, request):
-        top_users = get_top_survival_game_rankings()
+        try:
+            limit = min(max(int(request.GET.get("limit", 5)), 1), 100)
+        except ValueError:
+            limit = 5
+        top_users = get_top_survival_game_rankings(limit=limit)
         return Response(top_users, status=status.HTTP_200_OK)
 
 
@@ -99,7 +104,7 @@ class UserSurvivalGameRankingAPIView(APIView):
 
         if rank is None:
             return Response(
-                {"detail": "You are not in the top 5 ranking."},
+                {"detail": "You do not have a survival game score yet."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
@@ -169,6 +174,7 @@ class SurvivalGameAnswerAPIView(APIView):
             game.lives -= 1
 
         game.save(update_fields=["score", "lives", "updated_at"])
+        record_survival_score(game)
         cache.delete(f"active_q:{user.id}:{game_id}")
 
         return Response({
@@ -4,9 +4,10 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from core.auth import api_login_required
+from ..pagination import DueReviewPagination
 from ..serializers import UserWordSerializer
 from ..services.user_words_service import create_user_word, search_user_words, get_user_words_by_leitner, \
-    delete_user_word, edit_user_word, get_user_word_by_id
+    delete_user_word, edit_user_word, get_user_word_by_id, get_due_user_words
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 
@@ -31,6 +32,15 @@ class UserWordListByLeitnerAPIView(APIView):
         return Response(serializer.data)
 
 
+class UserWordDueAPIView(APIView):
+    @method_decorator(api_login_required)
+    def get(self, request):
+        paginator = DueReviewPagination()
+        page = paginator.paginate_queryset(get_due_user_words(request.user.id), request, view=self)
+        serializer = UserWordSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class UserWordCreateAPIView(APIView):
 
     # Allow parsing of file uploads
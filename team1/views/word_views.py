@@ -1,11 +1,13 @@
+from functools import partial
+
 from django.utils.decorators import method_decorator
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
 
 from core.auth import api_login_required
-from ..services.word_service import get_all_words_queryset
+from ..services.word_search import get_search_backend
+from ..services.word_service import get_all_words_queryset, get_words_by_ids
 from ..serializers import WordSerializer
-from ..pagination import CustomPagination
+from ..pagination import CustomPagination, RankedSearchPagination, WordCursorPagination
 
 
 class WordListAPIView(APIView):
@@ -14,12 +16,25 @@ class WordListAPIView(APIView):
         search_query = request.GET.get('search', '')
         exact = request.GET.get('exact', 'false').lower() == 'true'
 
+        # Numbered pages with `count` stay the default; ?pagination=cursor asks for
+        # keyset pages (best matches first when searching, newest first otherwise).
+        keyset = request.GET.get('pagination') == 'cursor'
+        if keyset and search_query and not exact:
+            paginator = RankedSearchPagination()
+            hits = paginator.paginate_hits(partial(get_search_backend().search, search_query), request)
+            words = get_words_by_ids([word_id for _, word_id in hits])
+            serializer = WordSerializer(words, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         words = get_all_words_queryset(search_query, exact=exact)
 
-        paginator = CustomPagination()
-        paginator.page_size = 100  # Set page size to 100
+        if keyset:
+            paginator = WordCursorPagination()
+        else:
+            paginator = CustomPagination()
+            paginator.page_size = 100  # Set page size to 100
 
         paginated_queryset = paginator.paginate_queryset(words, request)
         serializer = WordSerializer(paginated_queryset, many=True)
 
-        return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
+        return paginator.get_paginated_response(serializer.data)
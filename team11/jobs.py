@@ -0,0 +1,409 @@
+"""Background assessment jobs for writing and speaking submissions.
+
+submit_writing/submit_speaking store an AssessmentJob next to the submission
+and answer 202; a bounded pool of worker threads claims due jobs from the
+table and runs the assessment. Because the state is in the database,
+nothing is lost on restart: claiming and lease renewal come from
+core.job_queue, so a running job keeps its lease while its process lives and
+the job of a dead worker is claimed again once TEAM11_ASSESSMENT_LEASE_SECONDS
+pass without a heartbeat. Submissions left in progress by the old per-request
+threads get a job when the workers start.
+
+The backlog is bounded by TEAM11_ASSESSMENT_MAX_QUEUE (submissions get a
+"busy" answer beyond it). Upstream calls are limited per provider in
+team11.services.limits. Queue depth, wait and run times are reported by
+assessment_metrics().
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Min
+from django.utils import timezone
+
+from core.job_queue import LeasedWorkerPool, claim_next
+
+from .models import (
+    AnalysisStatus, AssessmentJob, AssessmentResult, SpeakingSubmission,
+    Submission, SubmissionType, WritingSubmission,
+)
+from .services import assess_speaking, assess_writing
+from .services.limits import provider_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def media_path(relative_path):
+    media_root = getattr(settings, 'MEDIA_ROOT', None)
+    if not media_root:
+        media_root = os.path.join(settings.BASE_DIR, 'media')
+    return os.path.join(media_root, relative_path)
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+class AssessmentMetrics:
+    """In-process counters plus recent wait/run times of this process's workers."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self.counters = {"enqueued": 0, "rejected": 0, "started": 0, "completed": 0, "failed": 0, "recovered": 0}
+        self.wait_seconds = deque(maxlen=window)
+        self.run_seconds = deque(maxlen=window)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_start(self, wait):
+        with self._lock:
+            self.counters["started"] += 1
+            self.wait_seconds.append(wait)
+
+    def record_finish(self, succeeded, run):
+        with self._lock:
+            self.counters["completed" if succeeded else "failed"] += 1
+            self.run_seconds.append(run)
+
+    @staticmethod
+    def _summary(values):
+        values = sorted(values)
+        if not values:
+            return {"count": 0, "avg": None, "p50": None, "p95": None, "max": None}
+        return {
+            "count": len(values),
+            "avg": round(sum(values) / len(values), 2),
+            "p50": round(values[len(values) // 2], 2),
+            "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+            "max": round(values[-1], 2),
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "wait_seconds": self._summary(self.wait_seconds),
+                "run_seconds": self._summary(self.run_seconds),
+            }
+
+
+metrics = AssessmentMetrics()
+
+
+def queue_depth():
+    return AssessmentJob.objects.using('team11').filter(status=AnalysisStatus.PENDING).count()
+
+
+def assessment_metrics():
+    jobs = AssessmentJob.objects.using('team11')
+    oldest = jobs.filter(status=AnalysisStatus.PENDING).aggregate(v=Min('enqueued_at'))['v']
+    return {
+        "queue_depth": queue_depth(),
+        "running": jobs.filter(status=AnalysisStatus.IN_PROGRESS).count(),
+        "oldest_pending_seconds": round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0,
+        "max_queue": _setting('TEAM11_ASSESSMENT_MAX_QUEUE', 500),
+        "workers": _pool.size if _pool is not None else 0,
+        "providers": provider_stats(),
+        **metrics.snapshot(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Enqueueing
+# ---------------------------------------------------------------------------
+
+def queue_full():
+    return queue_depth() >= _setting('TEAM11_ASSESSMENT_MAX_QUEUE', 500)
+
+
+def enqueue_assessment(submission):
+    """Queue a submission whose details are saved; workers pick it up right away."""
+    job, _ = AssessmentJob.objects.using('team11').get_or_create(
+        submission=submission,
+        defaults={'max_attempts': _setting('TEAM11_ASSESSMENT_MAX_ATTEMPTS', 3)},
+    )
+    metrics.incr("enqueued")
+    ensure_workers_started()
+    return job
+
+
+# ---------------------------------------------------------------------------
+# Assessment
+# ---------------------------------------------------------------------------
+
+def _process_writing_assessment(submission_id, topic, text_body, word_count):
+    try:
+        close_old_connections()
+        logger.info(f"Writing background task started: {submission_id}")
+        assessment_result = assess_writing(topic, text_body, word_count)
+        if not assessment_result.get('success') and assessment_result.get('error_type') in {'connection', 'rate_limit', 'api'}:
+            time.sleep(2)
+            assessment_result = assess_writing(topic, text_body, word_count)
+        submission = Submission.objects.using('team11').get(submission_id=submission_id)
+
+        if assessment_result.get('success'):
+            submission.overall_score = assessment_result['overall_score']
+            submission.status = AnalysisStatus.COMPLETED
+            submission.save()
+
+            AssessmentResult.objects.using('team11').update_or_create(
+                submission=submission,
+                defaults={
+                    'grammar_score': assessment_result['grammar_score'],
+                    'vocabulary_score': assessment_result['vocabulary_score'],
+                    'coherence_score': assessment_result['coherence_score'],
+                    'fluency_score': assessment_result['fluency_score'],
+                    'feedback_summary': assessment_result['feedback_summary'],
+                    'suggestions': assessment_result['suggestions'],
+                }
+            )
+            logger.info(f"Writing assessment completed: {submission.submission_id}, score: {submission.overall_score}")
+            return
+
+        error_type = assessment_result.get('error_type')
+        error_msg = 'ارزیابی ناموفق بود. لطفاً دوباره تلاش کنید.'
+        if error_type == 'connection':
+            error_msg = 'ارتباط با سرویس ارزیابی برقرار نشد. لطفاً دوباره تلاش کنید.'
+        elif error_type == 'rate_limit':
+            error_msg = 'سرویس ارزیابی شلوغ است. لطفاً چند لحظه دیگر دوباره تلاش کنید.'
+        elif error_type == 'api':
+            error_msg = 'خطای سرویس ارزیابی. لطفاً بعداً دوباره تلاش کنید.'
+        elif error_type == 'parse':
+            error_msg = 'پاسخ سرویس ارزیابی قابل پردازش نبود. لطفاً دوباره تلاش کنید.'
+        submission.status = AnalysisStatus.FAILED
+        submission.save()
+        AssessmentResult.objects.using('team11').update_or_create(
+            submission=submission,
+            defaults={
+                'feedback_summary': error_msg,
+                'suggestions': [],
+            }
+        )
+        logger.error(f"Writing assessment failed: {submission.submission_id}, error: {assessment_result.get('error')}")
+    except Exception as e:
+        logger.error(f"Background writing assessment error: {e}", exc_info=True)
+        try:
+            close_old_connections()
+            submission = Submission.objects.using('team11').get(submission_id=submission_id)
+            submission.status = AnalysisStatus.FAILED
+            submission.save()
+        except Exception:
+            pass
+
+
+def _process_speaking_assessment(submission_id, speaking_detail_pk, audio_file_path, topic, duration):
+    try:
+        close_old_connections()
+        logger.info(f"Speaking background task started: {submission_id}")
+        assessment_result = assess_speaking(topic, audio_file_path, duration)
+        submission = Submission.objects.using('team11').get(submission_id=submission_id)
+        speaking_detail = SpeakingSubmission.objects.using('team11').get(pk=speaking_detail_pk)
+
+        if assessment_result.get('success'):
+            speaking_detail.transcription = assessment_result.get('transcription', '')
+            speaking_detail.save()
+
+            submission.overall_score = assessment_result['overall_score']
+            submission.status = AnalysisStatus.COMPLETED
+            submission.save()
+
+            AssessmentResult.objects.using('team11').update_or_create(
+                submission=submission,
+                defaults={
+                    'pronunciation_score': assessment_result['pronunciation_score'],
+                    'fluency_score': assessment_result['fluency_score'],
+                    'vocabulary_score': assessment_result['vocabulary_score'],
+                    'grammar_score': assessment_result['grammar_score'],
+                    'coherence_score': assessment_result['coherence_score'],
+                    'feedback_summary': assessment_result['feedback_summary'],
+                    'suggestions': assessment_result['suggestions'],
+                }
+            )
+            logger.info(f"Speaking assessment completed: {submission.submission_id}, score: {submission.overall_score}")
+            return
+
+        raw_error = assessment_result.get('error', '')
+        error_msg = 'ارزیابی ناموفق بود. لطفاً دوباره تلاش کنید.'
+        if 'no speech' in str(raw_error).lower():
+            error_msg = 'صدایی تشخیص داده نشد. لطفاً واضح‌تر صحبت کنید.'
+
+        submission.status = AnalysisStatus.FAILED
+        submission.save()
+        AssessmentResult.objects.using('team11').update_or_create(
+            submission=submission,
+            defaults={
+                'feedback_summary': error_msg,
+                'suggestions': [],
+            }
+        )
+        logger.error(f"Speaking assessment failed: {submission.submission_id}, error: {raw_error}")
+    except Exception as e:
+        logger.error(f"Background speaking assessment error: {e}", exc_info=True)
+        try:
+            close_old_connections()
+            submission = Submission.objects.using('team11').get(submission_id=submission_id)
+            submission.status = AnalysisStatus.FAILED
+            submission.save()
+        except Exception:
+            pass
+
+
+def _mark_failed(submission_id, message):
+    Submission.objects.using('team11').filter(submission_id=submission_id).update(status=AnalysisStatus.FAILED)
+    submission = Submission.objects.using('team11').get(submission_id=submission_id)
+    AssessmentResult.objects.using('team11').update_or_create(
+        submission=submission,
+        defaults={'feedback_summary': message, 'suggestions': []}
+    )
+
+
+def _assess(submission):
+    if submission.submission_type == SubmissionType.WRITING:
+        details = WritingSubmission.objects.using('team11').get(submission=submission)
+        _process_writing_assessment(submission.submission_id, details.topic, details.text_body, details.word_count)
+        return
+
+    details = SpeakingSubmission.objects.using('team11').get(submission=submission)
+    audio_file_path = media_path(details.audio_file_url)
+    if not os.path.exists(audio_file_path):
+        logger.warning(f"Audio file missing for {submission.submission_id}: {audio_file_path}")
+        _mark_failed(submission.submission_id, 'فایل صوتی یافت نشد. لطفاً دوباره ضبط کنید.')
+        return
+    _process_speaking_assessment(
+        submission.submission_id, details.pk, audio_file_path, details.topic, details.duration_seconds
+    )
+
+
+# ---------------------------------------------------------------------------
+# Claiming and running
+# ---------------------------------------------------------------------------
+
+def _lease_seconds():
+    return _setting('TEAM11_ASSESSMENT_LEASE_SECONDS', 120)
+
+
+def claim_next_job(worker_id):
+    """Atomically take the oldest due job (or one whose worker's lease ran out), or return None."""
+    return claim_next(
+        AssessmentJob.objects.using('team11').select_related('submission'), worker_id,
+        queued=AnalysisStatus.PENDING, running=AnalysisStatus.IN_PROGRESS, lease_seconds=_lease_seconds(),
+        stamp=('started_at',),
+    )
+
+
+def run_job(job):
+    """Run one claimed job and record its outcome."""
+    started = time.monotonic()
+    metrics.record_start((job.started_at - job.enqueued_at).total_seconds())
+    if job.attempts > job.max_attempts:
+        # Claimed again after every worker that took it died: give up.
+        _mark_failed(job.submission_id, 'ارزیابی ناموفق بود. لطفاً دوباره تلاش کنید.')
+        error = "Assessment did not finish."
+    else:
+        error = ''
+        try:
+            _assess(job.submission)
+        except Exception as e:
+            logger.exception(f"Assessment job {job.job_id} crashed: {e}")
+            _mark_failed(job.submission_id, 'ارزیابی ناموفق بود. لطفاً دوباره تلاش کنید.')
+            error = str(e)
+
+    final_status = Submission.objects.using('team11').filter(
+        submission_id=job.submission_id
+    ).values_list('status', flat=True).first()
+    succeeded = final_status == AnalysisStatus.COMPLETED
+    AssessmentJob.objects.using('team11').filter(job_id=job.job_id, locked_by=job.locked_by).update(
+        status=AnalysisStatus.COMPLETED if succeeded else AnalysisStatus.FAILED,
+        finished_at=timezone.now(),
+        locked_at=None,
+        error=error,
+    )
+    metrics.record_finish(succeeded, time.monotonic() - started)
+    logger.info(f"Assessment job {job.job_id} finished: {final_status}")
+
+
+def recover_jobs():
+    """Queue submissions left in progress without a job; returns how many.
+
+    Jobs of dead workers need nothing here: their lease stops being renewed
+    and they are claimed again once it runs out.
+    """
+    jobs = AssessmentJob.objects.using('team11')
+
+    # Submissions whose assessment thread was lost before jobs existed (recent
+    # ones may still be getting their job from the view).
+    orphans = list(
+        Submission.objects.using('team11')
+        .filter(
+            status=AnalysisStatus.IN_PROGRESS,
+            assessment_job__isnull=True,
+            created_at__lt=timezone.now() - timedelta(minutes=1),
+        )
+        .values_list('submission_id', flat=True)
+    )
+    jobs.bulk_create(
+        [AssessmentJob(submission_id=submission_id,
+                       max_attempts=_setting('TEAM11_ASSESSMENT_MAX_ATTEMPTS', 3)) for submission_id in orphans],
+        ignore_conflicts=True,
+    )
+    if orphans:
+        metrics.incr("recovered", len(orphans))
+        logger.info(f"Recovered {len(orphans)} orphaned assessment(s)")
+    return len(orphans)
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+class AssessmentWorkerPool(LeasedWorkerPool):
+    name = 'team11-assess'
+
+    def start(self):
+        try:
+            recover_jobs()
+        except Exception as e:
+            logger.exception(f"Assessment job recovery failed: {e}")
+        finally:
+            close_old_connections()
+        super().start()
+
+    def claim(self, worker_id):
+        return claim_next_job(worker_id)
+
+    def run(self, job, context):
+        run_job(job)
+
+    def running_jobs(self):
+        return AssessmentJob.objects.using('team11').filter(status=AnalysisStatus.IN_PROGRESS)
+
+    def lease_seconds(self):
+        return _lease_seconds()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def ensure_workers_started():
+    """Start the in-process workers once (no-op when TEAM11_ASSESSMENT_INPROCESS_WORKERS=0)."""
+    global _pool
+    size = _setting('TEAM11_ASSESSMENT_INPROCESS_WORKERS', 2)
+    if size <= 0:
+        return
+    with _pool_lock:
+        if _pool is None:
+            _pool = AssessmentWorkerPool(size)
+            _pool.start()
+    _pool.wake()
@@ -0,0 +1,120 @@
+"""
+Memory and wall time of concurrent speaking submissions: the JSON/base64
+endpoint (submit_speaking) against the streaming multipart endpoint
+(submit_speaking_upload).
+
+Request bodies are built before measuring, so the peak is what the views
+allocate while handling them (tracemalloc). The team11 alias is pointed at a
+temporary SQLite file and MEDIA_ROOT at a temporary directory, and no
+assessment workers are started.
+
+Usage:
+    python manage.py bench_audio_upload
+    python manage.py bench_audio_upload --concurrency 10 --size-mb 5
+"""
+import base64
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import RequestFactory, override_settings
+
+from team11 import views
+
+
+def _wav(size):
+    """A silent 16 kHz mono 16-bit WAV file of about `size` bytes."""
+    data_size = max(0, size - 44)
+    header = b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+    header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16)
+    header += b"data" + struct.pack("<I", data_size)
+    return header + bytes(data_size)
+
+
+class Command(BaseCommand):
+    help = "Benchmark memory use of concurrent team11 speaking uploads (base64 JSON vs multipart)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--size-mb", type=float, default=5.0)
+
+    def _use_temp_database(self, path):
+        connection = connections["team11"]
+        connection.close()
+        connection.settings_dict["NAME"] = path
+        call_command("migrate", "team11", database="team11", verbosity=0)
+
+    def _requests(self, audio, count):
+        factory = RequestFactory()
+        user = SimpleNamespace(id=uuid.uuid4(), is_authenticated=True)
+        data_url = "data:audio/wav;base64," + base64.b64encode(audio).decode()
+        json_body = json.dumps({"topic": "Bench", "audio_data": data_url, "duration_seconds": 0})
+        json_requests, upload_requests = [], []
+        for _ in range(count):
+            request = factory.post("/team11/api/submit-speaking/", json_body, content_type="application/json")
+            request.user = user
+            json_requests.append(request)
+            request = factory.post("/team11/api/submit-speaking-upload/", {
+                "topic": "Bench",
+                "audio": SimpleUploadedFile("recording.wav", audio, content_type="audio/wav"),
+            })
+            request.user = user
+            upload_requests.append(request)
+        return (
+            ("json/base64", views.submit_speaking, json_requests),
+            ("multipart", views.submit_speaking_upload, upload_requests),
+        )
+
+    def _run(self, view, requests):
+        barrier = threading.Barrier(len(requests))
+
+        def handle(request):
+            barrier.wait()
+            try:
+                return view(request).status_code
+            finally:
+                connections.close_all()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+            statuses = list(pool.map(handle, requests))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return statuses, elapsed, peak
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        size = int(options["size_mb"] * 1024 * 1024)
+        fd, db_path = tempfile.mkstemp(suffix=".sqlite3", prefix="team11-bench-")
+        os.close(fd)
+        media_root = tempfile.mkdtemp(prefix="team11-media-")
+        try:
+            with override_settings(MEDIA_ROOT=media_root, TEAM11_ASSESSMENT_INPROCESS_WORKERS=0):
+                self._use_temp_database(db_path)
+                audio = _wav(size)
+                self.stdout.write(f"{concurrency} concurrent uploads of {size / 1024 / 1024:.1f} MB")
+                self.stdout.write(f"{'endpoint':<12} {'peak MB':>9} {'MB/req':>8} {'wall s':>8}  statuses")
+                for label, view, requests in self._requests(audio, concurrency):
+                    statuses, elapsed, peak = self._run(view, requests)
+                    self.stdout.write(
+                        f"{label:<12} {peak / 1024 / 1024:>9.1f} {peak / 1024 / 1024 / concurrency:>8.1f} "
+                        f"{elapsed:>8.2f}  {sorted(set(statuses))}"
+                    )
+        finally:
+            connections["team11"].close()
+            os.remove(db_path)
+            shutil.rmtree(media_root, ignore_errors=True)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team11', '0008_assessmentjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='speakingsubmission',
+            name='audio_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
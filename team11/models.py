@@ -119,6 +119,7 @@ class SpeakingSubmission(models.Model):
     topic = models.CharField(max_length=500)
     audio_file_url = models.CharField(max_length=500)
     duration_seconds = models.PositiveIntegerField()
+    audio_sha256 = models.CharField(max_length=64, blank=True, default='')
     transcription = models.TextField(blank=True, null=True)
 
     def __str__(self):
@@ -149,3 +150,40 @@ class AssessmentResult(models.Model):
 
     def __str__(self):
         return f"Assessment for {self.submission.submission_id}"
+
+
+class AssessmentJob(models.Model):
+    """Background assessment of a submission, run by the workers in team11.jobs.
+
+    The table is the queue: workers claim the oldest due job with a
+    conditional UPDATE, and jobs of a worker that died are claimed again.
+    """
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    submission = models.OneToOneField(
+        Submission,
+        on_delete=models.CASCADE,
+        related_name='assessment_job'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=AnalysisStatus.choices,
+        default=AnalysisStatus.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    error = models.TextField(blank=True, default='')
+
+    class Meta:
+        ordering = ['-enqueued_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='team11_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} - {self.status}"
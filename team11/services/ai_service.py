@@ -12,6 +12,10 @@ import re
 from typing import Dict, Any, Optional
 from openai import OpenAI, APIError, APIConnectionError, RateLimitError
 
+from core.llm_cache import cached_chat_client
+
+from .limits import LimitedChatClient, provider_slot
+
 from .prompts import (
     WRITING_SYSTEM_PROMPT,
     WRITING_USER_PROMPT_TEMPLATE,
@@ -26,8 +30,13 @@ API_BASE_URL = "https://api.gapgpt.app/v1"
 # Security: Load key from env, fallback for dev only
 API_KEY = os.getenv("TEAM11_AI_API_KEY", "sk-NQIf9DDM88vlR7to5iys8BFQYwlHTvbtKZeVlwMawdEMOk61")
 
-# Initialize OpenAI client with a timeout to avoid hanging requests
-client = OpenAI(base_url=API_BASE_URL, api_key=API_KEY, timeout=300.0)
+# Initialize OpenAI client with a timeout to avoid hanging requests.
+# Chat completions go through the shared response cache and take an "llm" provider
+# slot only on a miss; audio calls pass straight through.
+client = cached_chat_client(
+    LimitedChatClient(OpenAI(base_url=API_BASE_URL, api_key=API_KEY, timeout=300.0), "llm"),
+    rubric_version="team11_v1",
+)
 
 # Model names
 DEEPSEEK_MODEL = "deepseek-chat"
@@ -153,7 +162,7 @@ def transcribe_audio(audio_file_path: str) -> Dict[str, Any]:
         logger.info(f"Transcribing audio file: {audio_file_path}")
         
         # Open and transcribe the audio file
-        with open(audio_file_path, "rb") as audio_file:
+        with open(audio_file_path, "rb") as audio_file, provider_slot("transcription"):
             response = client.audio.transcriptions.create(
                 model=WHISPER_MODEL,
                 file=audio_file
@@ -0,0 +1,123 @@
+"""Per-provider concurrency and rate limits for upstream AI calls.
+
+Every call to the chat model ("llm") or the transcription model
+("transcription") goes through provider_slot(), which holds one of the
+provider's concurrency slots (TEAM11_PROVIDER_CONCURRENCY) and takes a token
+from its per-minute bucket (TEAM11_PROVIDER_RATE_PER_MINUTE). The limits
+are per process. Chat calls are limited by LimitedChatClient, which sits
+under the response cache so cache hits do not take a slot.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from django.conf import settings
+
+DEFAULT_CONCURRENCY = {"llm": 4, "transcription": 2}
+DEFAULT_RATE_PER_MINUTE = {"llm": 60, "transcription": 30}
+
+
+class TokenBucket:
+    """Blocking token bucket; rate_per_minute <= 0 disables it."""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, rate_per_minute // 6))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ProviderLimiter:
+    def __init__(self, name, concurrency, rate_per_minute):
+        self.name = name
+        self.concurrency = concurrency
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._bucket = TokenBucket(rate_per_minute)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.throttled_seconds = 0.0
+
+    @contextmanager
+    def slot(self):
+        with self._slots:
+            throttled = self._bucket.acquire()
+            with self._lock:
+                self.in_flight += 1
+                self.calls += 1
+                self.throttled_seconds += throttled
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "throttled_seconds": round(self.throttled_seconds, 2),
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider):
+    with _limiters_lock:
+        if provider not in _limiters:
+            concurrency = {**DEFAULT_CONCURRENCY, **getattr(settings, "TEAM11_PROVIDER_CONCURRENCY", {})}
+            rates = {**DEFAULT_RATE_PER_MINUTE, **getattr(settings, "TEAM11_PROVIDER_RATE_PER_MINUTE", {})}
+            _limiters[provider] = ProviderLimiter(provider, concurrency.get(provider, 1), rates.get(provider, 0))
+        return _limiters[provider]
+
+
+def provider_slot(provider):
+    return get_limiter(provider).slot()
+
+
+def provider_stats():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+class _LimitedCompletions:
+    def __init__(self, completions, provider):
+        self._completions = completions
+        self._provider = provider
+
+    def create(self, **kwargs):
+        with provider_slot(self._provider):
+            return self._completions.create(**kwargs)
+
+
+class LimitedChatClient:
+    """OpenAI client proxy: chat completions hold a provider slot, everything else passes through."""
+
+    def __init__(self, client, provider="llm"):
+        self._client = client
+        self.chat = SimpleNamespace(completions=_LimitedCompletions(client.chat.completions, provider))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -1,11 +1,26 @@
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+import uuid
+from datetime import timedelta
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 from openai import OpenAI, APIError, APIConnectionError, RateLimitError
 
+from . import jobs, views
+from .models import (
+    AnalysisStatus, AssessmentJob, SpeakingSubmission, Submission, SubmissionType, WritingSubmission,
+)
 from .services import assess_writing, assess_speaking
 from .services.ai_service import API_BASE_URL, API_KEY, DEEPSEEK_MODEL
+from .services.limits import LimitedChatClient, get_limiter
 
 
 class Team11AISmokeTests(TestCase):
@@ -94,3 +109,133 @@ class Team11AISmokeTests(TestCase):
         self.assertTrue(result.get("success"), msg=result.get("error"))
         self.assertIsNotNone(result.get("overall_score"))
 
+
+class LimitedChatClientTests(SimpleTestCase):
+    def test_cache_hits_do_not_take_a_provider_slot(self):
+        from core.llm_cache import CachedChatClient, LLMResponseCache
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        reply = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"score": 1}'))])
+        upstream = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: reply)))
+        client = CachedChatClient(LimitedChatClient(upstream, "test-llm"), LLMResponseCache(Path(tmp) / "c.sqlite3"))
+        limiter = get_limiter("test-llm")
+        calls = limiter.calls
+
+        for _ in range(3):
+            response = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+            self.assertEqual(response.choices[0].message.content, '{"score": 1}')
+        self.assertEqual(limiter.calls - calls, 1)
+
+
+@override_settings(TEAM11_ASSESSMENT_INPROCESS_WORKERS=0)
+class AssessmentJobTests(TestCase):
+    databases = {"default", "team11"}
+
+    def _writing_submission(self, **kwargs):
+        submission = Submission.objects.using("team11").create(
+            user_id=uuid.uuid4(), submission_type=SubmissionType.WRITING,
+            status=AnalysisStatus.IN_PROGRESS, **kwargs,
+        )
+        WritingSubmission.objects.using("team11").create(
+            submission=submission, topic="Topic", text_body="word " * 60, word_count=60,
+        )
+        return submission
+
+    @patch("team11.jobs.close_old_connections")
+    @patch("team11.jobs.assess_writing")
+    def test_enqueue_claim_and_run(self, assess, _close):
+        assess.return_value = {
+            "success": True, "overall_score": 80, "grammar_score": 80, "vocabulary_score": 80,
+            "coherence_score": 80, "fluency_score": 80, "feedback_summary": "ok", "suggestions": [],
+        }
+        submission = self._writing_submission()
+        jobs.enqueue_assessment(submission)
+        self.assertEqual(jobs.queue_depth(), 1)
+
+        job = jobs.claim_next_job("w1")
+        self.assertIsNone(jobs.claim_next_job("w2"))  # already taken
+        jobs.run_job(job)
+
+        submission.refresh_from_db()
+        self.assertEqual((submission.status, submission.overall_score), (AnalysisStatus.COMPLETED, 80))
+        self.assertEqual(AssessmentJob.objects.using("team11").get().status, AnalysisStatus.COMPLETED)
+        self.assertEqual(jobs.queue_depth(), 0)
+
+    def test_recover_queues_orphaned_submissions(self):
+        old = self._writing_submission()
+        Submission.objects.using("team11").filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        self._writing_submission()  # just created: its view is still enqueueing it
+
+        self.assertEqual(jobs.recover_jobs(), 1)
+        self.assertEqual(AssessmentJob.objects.using("team11").get().submission_id, old.pk)
+
+    def test_heartbeat_keeps_live_leases_and_dead_ones_expire(self):
+        pool = jobs.AssessmentWorkerPool(1)
+        live = jobs.enqueue_assessment(self._writing_submission())
+        dead = jobs.enqueue_assessment(self._writing_submission())
+        stale = timezone.now() - timedelta(seconds=jobs._lease_seconds() + 1)
+        AssessmentJob.objects.using("team11").filter(pk=live.pk).update(
+            status=AnalysisStatus.IN_PROGRESS, locked_at=stale, locked_by=pool.worker_ids[0]
+        )
+        AssessmentJob.objects.using("team11").filter(pk=dead.pk).update(
+            status=AnalysisStatus.IN_PROGRESS, locked_at=stale, locked_by="gone:1:0"
+        )
+
+        self.assertEqual(pool.renew_leases(), 1)
+        self.assertEqual(jobs.claim_next_job("w1").pk, dead.pk)
+        self.assertIsNone(jobs.claim_next_job("w2"))
+
+
+@override_settings(TEAM11_ASSESSMENT_INPROCESS_WORKERS=0)
+class AudioUploadTests(TestCase):
+    databases = {"default", "team11"}
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.factory = RequestFactory()
+        self.user = SimpleNamespace(id=uuid.uuid4(), is_authenticated=True)
+
+    def _upload(self, audio, content_type="audio/wav", **fields):
+        request = self.factory.post("/team11/api/submit-speaking-upload/", {
+            "topic": "Topic", **fields,
+            "audio": SimpleUploadedFile("recording", audio, content_type=content_type),
+        })
+        request.user = self.user
+        with self.settings(MEDIA_ROOT=self.media_root, TEAM11_AUDIO_UPLOAD_MAX_BYTES=512 * 1024):
+            return views.submit_speaking_upload(request)
+
+    def test_wav_is_streamed_to_media_root(self):
+        audio = _wav(seconds=3)
+        response = self._upload(audio, duration_seconds="99")
+        self.assertEqual(response.status_code, 202)
+
+        details = SpeakingSubmission.objects.using("team11").get()
+        with open(os.path.join(self.media_root, details.audio_file_url), "rb") as f:
+            self.assertEqual(f.read(), audio)
+        self.assertEqual(details.audio_sha256, hashlib.sha256(audio).hexdigest())
+        self.assertEqual(details.duration_seconds, 3)  # from the header, not the client
+        self.assertEqual(AssessmentJob.objects.using("team11").count(), 1)
+
+    def test_webm_uses_client_duration(self):
+        response = self._upload(b"\x1aE\xdf\xa3" + bytes(1000), content_type="audio/webm", duration_seconds="7")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(SpeakingSubmission.objects.using("team11").get().duration_seconds, 7)
+
+    def test_rejected_uploads_leave_nothing_behind(self):
+        self.assertEqual(self._upload(_wav(seconds=40)).status_code, 413)
+        self.assertEqual(self._upload(b"data", content_type="text/plain").status_code, 400)
+        self.assertFalse(Submission.objects.using("team11").exists())
+        self.assertEqual([files for _, _, files in os.walk(self.media_root) if files], [])
+
+
+def _wav(seconds, rate=8000):
+    data = bytes(rate * 2 * seconds)
+    return (
+        b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, rate, rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", len(data)) + data
+    )
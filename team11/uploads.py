@@ -0,0 +1,157 @@
+"""Streaming storage for multipart speaking uploads.
+
+AudioUploadHandler replaces Django's upload handlers for the multipart
+submit-speaking endpoint. Each chunk of the "audio" part is written straight
+to its final place under MEDIA_ROOT/team11/audio/ while its SHA-256 and size
+are updated, so a request holds one chunk of audio in memory at a time
+instead of the whole body, its JSON decoding and its base64 decoding.
+
+For WAV the duration is read from the header (byte rate) and the number of
+data bytes received; other containers (WebM/Ogg from MediaRecorder) carry no
+usable duration up front, so the client's duration_seconds is used for them.
+"""
+import hashlib
+import os
+import struct
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+
+from .jobs import media_path
+
+AUDIO_FIELD = 'audio'
+AUDIO_EXTENSIONS = {
+    'audio/webm': '.webm',
+    'audio/wav': '.wav',
+    'audio/x-wav': '.wav',
+    'audio/wave': '.wav',
+    'audio/ogg': '.ogg',
+    'audio/mpeg': '.mp3',
+    'audio/mp4': '.m4a',
+}
+_WAV_HEADER_LIMIT = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StoredAudio:
+    relative_path: str
+    full_path: str
+    size: int
+    sha256: str
+    duration_seconds: Optional[float]
+
+
+class WavDuration:
+    """Incremental WAV duration: parses the RIFF header, then counts data bytes."""
+
+    def __init__(self):
+        self._header = b''
+        self.byte_rate = None
+        self.data_offset = None
+        self.received = 0
+
+    def feed(self, chunk):
+        self.received += len(chunk)
+        if self.data_offset is not None or len(self._header) >= _WAV_HEADER_LIMIT:
+            return
+        self._header += chunk[:_WAV_HEADER_LIMIT - len(self._header)]
+        self._parse()
+
+    def _parse(self):
+        header = self._header
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return
+        pos = 12
+        while pos + 8 <= len(header):
+            chunk_id = header[pos:pos + 4]
+            (size,) = struct.unpack('<I', header[pos + 4:pos + 8])
+            if chunk_id == b'fmt ' and pos + 20 <= len(header):
+                (self.byte_rate,) = struct.unpack('<I', header[pos + 16:pos + 20])
+            elif chunk_id == b'data':
+                self.data_offset = pos + 8
+                return
+            pos += 8 + size + (size & 1)
+
+    @property
+    def seconds(self):
+        if not self.byte_rate or self.data_offset is None:
+            return None
+        return max(0, self.received - self.data_offset) / self.byte_rate
+
+
+def audio_extension(content_type, file_name):
+    ext = AUDIO_EXTENSIONS.get((content_type or '').split(';')[0].strip().lower())
+    if ext:
+        return ext
+    suffix = os.path.splitext(file_name or '')[1].lower()
+    return suffix if suffix in set(AUDIO_EXTENSIONS.values()) else None
+
+
+class AudioUploadHandler(FileUploadHandler):
+    """Writes the "audio" part to MEDIA_ROOT chunk by chunk; other file parts are skipped.
+
+    After parsing, request.FILES['audio'] is a StoredAudio, or handler.error
+    says why there is none ('unsupported_type' or 'too_large').
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None, user_id=None, max_bytes=None):
+        super().__init__(request)
+        self.user_id = user_id
+        self.max_bytes = max_bytes or getattr(settings, 'TEAM11_AUDIO_UPLOAD_MAX_BYTES', 50 * 1024 * 1024)
+        self.error = None
+        self.full_path = None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        if field_name != AUDIO_FIELD or self.full_path is not None:
+            raise SkipFile()
+        ext = audio_extension(content_type, file_name)
+        if ext is None:
+            self.error = 'unsupported_type'
+            raise SkipFile()
+        if content_length is not None and content_length > self.max_bytes:
+            self.error = 'too_large'
+            raise StopUpload(connection_reset=False)
+
+        self.relative_path = os.path.join('team11', 'audio', f"{self.user_id}_{uuid.uuid4().hex}{ext}")
+        self.full_path = media_path(self.relative_path)
+        os.makedirs(os.path.dirname(self.full_path), exist_ok=True)
+        self.file = open(self.full_path, 'wb')
+        self.digest = hashlib.sha256()
+        self.wav = WavDuration() if ext == '.wav' else None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_bytes:
+            self.error = 'too_large'
+            self.discard()
+            raise StopUpload(connection_reset=False)
+        self.file.write(raw_data)
+        self.digest.update(raw_data)
+        if self.wav is not None:
+            self.wav.feed(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        self.file.close()
+        return StoredAudio(
+            relative_path=self.relative_path,
+            full_path=self.full_path,
+            size=file_size,
+            sha256=self.digest.hexdigest(),
+            duration_seconds=self.wav.seconds if self.wav is not None else None,
+        )
+
+    def upload_interrupted(self):
+        self.discard()
+
+    def discard(self):
+        """Remove the partly or fully written file (e.g. when the submission is rejected)."""
+        if hasattr(self, 'file'):
+            self.file.close()
+        if self.full_path and os.path.exists(self.full_path):
+            os.remove(self.full_path)
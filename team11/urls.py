@@ -10,6 +10,8 @@ urlpatterns = [
     path("speaking-exam/", views.speaking_exam, name="team11_speaking_exam"),
     path("api/submit-writing/", views.submit_writing, name="team11_submit_writing"),
     path("api/submit-speaking/", views.submit_speaking, name="team11_submit_speaking"),
+    path("api/submit-speaking-upload/", views.submit_speaking_upload, name="team11_submit_speaking_upload"),
     path("api/submission-status/<uuid:submission_id>/", views.submission_status, name="team11_submission_status"),
+    path("api/assessment-metrics/", views.assessment_metrics_view, name="team11_assessment_metrics"),
     path("submission/<uuid:submission_id>/", views.submission_detail, name="team11_submission_detail"),
 ]
\ No newline at end of file
@@ -2,12 +2,9 @@ import json
 import os
 import logging
 import random
-import threading
 import base64
 import re
 import uuid
-import time
-from django.db import close_old_connections
 from django.db.models import Avg
 from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
@@ -22,129 +19,14 @@ from .models import (
     AssessmentResult, SubmissionType, AnalysisStatus,
     QuestionCategory, Question
 )
-from .services import assess_writing, assess_speaking
+from .jobs import assessment_metrics, enqueue_assessment, ensure_workers_started, metrics, queue_full
+from .uploads import AUDIO_FIELD, AudioUploadHandler
 
 logger = logging.getLogger(__name__)
 
 TEAM_NAME = "team11"
 PERSIAN_ARABIC_PATTERN = re.compile(r"[\u0600-\u06FF]")
-
-
-def _process_writing_assessment(submission_id, topic, text_body, word_count):
-    try:
-        close_old_connections()
-        logger.info(f"Writing background task started: {submission_id}")
-        assessment_result = assess_writing(topic, text_body, word_count)
-        if not assessment_result.get('success') and assessment_result.get('error_type') in {'connection', 'rate_limit', 'api'}:
-            time.sleep(2)
-            assessment_result = assess_writing(topic, text_body, word_count)
-        submission = Submission.objects.using('team11').get(submission_id=submission_id)
-
-        if assessment_result.get('success'):
-            submission.overall_score = assessment_result['overall_score']
-            submission.status = AnalysisStatus.COMPLETED
-            submission.save()
-
-            AssessmentResult.objects.using('team11').update_or_create(
-                submission=submission,
-                defaults={
-                    'grammar_score': assessment_result['grammar_score'],
-                    'vocabulary_score': assessment_result['vocabulary_score'],
-                    'coherence_score': assessment_result['coherence_score'],
-                    'fluency_score': assessment_result['fluency_score'],
-                    'feedback_summary': assessment_result['feedback_summary'],
-                    'suggestions': assessment_result['suggestions'],
-                }
-            )
-            logger.info(f"Writing assessment completed: {submission.submission_id}, score: {submission.overall_score}")
-            return
-
-        error_type = assessment_result.get('error_type')
-        error_msg = 'ارزیابی ناموفق بود. لطفاً دوباره تلاش کنید.'
-        if error_type == 'connection':
-            error_msg = 'ارتباط با سرویس ارزیابی برقرار نشد. لطفاً دوباره تلاش کنید.'
-        elif error_type == 'rate_limit':
-            error_msg = 'سرویس ارزیابی شلوغ است. لطفاً چند لحظه دیگر دوباره تلاش کنید.'
-        elif error_type == 'api':
-            error_msg = 'خطای سرویس ارزیابی. لطفاً بعداً دوباره تلاش کنید.'
-        elif error_type == 'parse':
-            error_msg = 'پاسخ سرویس ارزیابی قابل پردازش نبود. لطفاً دوباره تلاش کنید.'
-        submission.status = AnalysisStatus.FAILED
-        submission.save()
-        AssessmentResult.objects.using('team11').update_or_create(
-            submission=submission,
-            defaults={
-                'feedback_summary': error_msg,
-                'suggestions': [],
-            }
-        )
-        logger.error(f"Writing assessment failed: {submission.submission_id}, error: {assessment_result.get('error')}")
-    except Exception as e:
-        logger.error(f"Background writing assessment error: {e}", exc_info=True)
-        try:
-            close_old_connections()
-            submission = Submission.objects.using('team11').get(submission_id=submission_id)
-            submission.status = AnalysisStatus.FAILED
-            submission.save()
-        except Exception:
-            pass
-
-
-def _process_speaking_assessment(submission_id, speaking_detail_pk, audio_file_path, topic, duration, temp_file_path=None):
-    try:
-        close_old_connections()
-        logger.info(f"Speaking background task started: {submission_id}")
-        assessment_result = assess_speaking(topic, audio_file_path, duration)
-        submission = Submission.objects.using('team11').get(submission_id=submission_id)
-        speaking_detail = SpeakingSubmission.objects.using('team11').get(pk=speaking_detail_pk)
-
-        if assessment_result.get('success'):
-            speaking_detail.transcription = assessment_result.get('transcription', '')
-            speaking_detail.save()
-
-            submission.overall_score = assessment_result['overall_score']
-            submission.status = AnalysisStatus.COMPLETED
-            submission.save()
-
-            AssessmentResult.objects.using('team11').update_or_create(
-                submission=submission,
-                defaults={
-                    'pronunciation_score': assessment_result['pronunciation_score'],
-                    'fluency_score': assessment_result['fluency_score'],
-                    'vocabulary_score': assessment_result['vocabulary_score'],
-                    'grammar_score': assessment_result['grammar_score'],
-                    'coherence_score': assessment_result['coherence_score'],
-                    'feedback_summary': assessment_result['feedback_summary'],
-                    'suggestions': assessment_result['suggestions'],
-                }
-            )
-            logger.info(f"Speaking assessment completed: {submission.submission_id}, score: {submission.overall_score}")
-            return
-
-        raw_error = assessment_result.get('error', '')
-        error_msg = 'ارزیابی ناموفق بود. لطفاً دوباره تلاش کنید.'
-        if 'no speech' in str(raw_error).lower():
-            error_msg = 'صدایی تشخیص داده نشد. لطفاً واضح‌تر صحبت کنید.'
-
-        submission.status = AnalysisStatus.FAILED
-        submission.save()
-        AssessmentResult.objects.using('team11').update_or_create(
-            submission=submission,
-            defaults={
-                'feedback_summary': error_msg,
-                'suggestions': [],
-            }
-        )
-        logger.error(f"Speaking assessment failed: {submission.submission_id}, error: {raw_error}")
-    except Exception as e:
-        logger.error(f"Background speaking assessment error: {e}", exc_info=True)
-        try:
-            close_old_connections()
-            submission = Submission.objects.using('team11').get(submission_id=submission_id)
-            submission.status = AnalysisStatus.FAILED
-            submission.save()
-        except Exception:
-            pass
+BUSY_MESSAGE = 'سرویس ارزیابی شلوغ است. لطفاً چند لحظه دیگر دوباره تلاش کنید.'
 
 
 @api_login_required
@@ -319,6 +201,10 @@ def submit_writing(request):
             except Question.DoesNotExist:
                 pass
         
+        if queue_full():
+            metrics.incr("rejected")
+            return JsonResponse({'error': BUSY_MESSAGE}, status=503)
+
         # Create submission with pending status
         submission = Submission.objects.using('team11').create(
             user_id=request.user.id,
@@ -336,13 +222,7 @@ def submit_writing(request):
         )
         
         logger.info(f"Queueing writing submission {submission.submission_id} for user {request.user.id}")
-
-        thread = threading.Thread(
-            target=_process_writing_assessment,
-            args=(submission.submission_id, topic, text_body, word_count),
-            daemon=True
-        )
-        thread.start()
+        enqueue_assessment(submission)
 
         return JsonResponse({
             'success': True,
@@ -380,6 +260,10 @@ def submit_speaking(request):
         
         if not audio_url and not audio_data:
             return JsonResponse({'error': 'فایل صوتی ارسال نشده است.'}, status=400)
+
+        if queue_full():
+            metrics.incr("rejected")
+            return JsonResponse({'error': BUSY_MESSAGE}, status=503)
         
         user_id = request.user.id
         
@@ -465,16 +349,8 @@ def submit_speaking(request):
         
         logger.info(f"Processing speaking submission {submission.submission_id}")
 
-        # 3. Start Background Process
-        if audio_file_path and os.path.exists(audio_file_path):
-            thread = threading.Thread(
-                target=_process_speaking_assessment,
-                args=(submission.submission_id, speaking_detail.pk, audio_file_path, topic, duration, None),
-                daemon=True
-            )
-            thread.start()
-        else:
-             logger.warning(f"Audio file path invalid, skipping AI: {audio_file_path}")
+        # 3. Queue the assessment (a missing audio file fails the job instead of leaving it in progress)
+        enqueue_assessment(submission)
 
         return JsonResponse({
             'success': True,
@@ -488,6 +364,78 @@ def submit_speaking(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@csrf_exempt
+@require_POST
+@api_login_required
+def submit_speaking_upload(request):
+    """API endpoint to submit speaking audio as a multipart upload (streamed to disk)
+
+    Form fields: question_id, topic, duration_seconds and the file part "audio".
+    """
+    if not request.content_type.startswith('multipart/'):
+        return JsonResponse({'error': 'فایل صوتی باید به صورت multipart ارسال شود.'}, status=400)
+
+    if queue_full():
+        metrics.incr("rejected")
+        return JsonResponse({'error': BUSY_MESSAGE}, status=503)
+
+    handler = AudioUploadHandler(request, user_id=request.user.id)
+    request.upload_handlers = [handler]
+    submission = None
+    try:
+        audio = request.FILES.get(AUDIO_FIELD)
+        if audio is None:
+            if handler.error == 'too_large':
+                return JsonResponse({'error': 'حجم فایل صوتی بیش از حد مجاز است.'}, status=413)
+            if handler.error == 'unsupported_type':
+                return JsonResponse({'error': 'فرمت فایل صوتی پشتیبانی نمی‌شود.'}, status=400)
+            return JsonResponse({'error': 'فایل صوتی ارسال نشده است.'}, status=400)
+        if not audio.size:
+            handler.discard()
+            return JsonResponse({'error': 'فایل صوتی خالی است.'}, status=400)
+
+        question = None
+        question_id = request.POST.get('question_id', '')
+        if question_id:
+            question = Question.objects.using('team11').filter(question_id=question_id).first()
+
+        duration = audio.duration_seconds
+        if duration is None:
+            try:
+                duration = float(request.POST.get('duration_seconds') or 0)
+            except ValueError:
+                duration = 0
+
+        submission = Submission.objects.using('team11').create(
+            user_id=request.user.id,
+            submission_type=SubmissionType.SPEAKING,
+            status=AnalysisStatus.IN_PROGRESS
+        )
+        SpeakingSubmission.objects.using('team11').create(
+            submission=submission,
+            question=question,
+            topic=request.POST.get('topic', ''),
+            audio_file_url=audio.relative_path,
+            duration_seconds=max(0, int(round(duration))),
+            audio_sha256=audio.sha256,
+        )
+        logger.info(f"Stored {audio.size} bytes of audio for speaking submission {submission.submission_id}")
+        enqueue_assessment(submission)
+
+        return JsonResponse({
+            'success': True,
+            'submission_id': str(submission.submission_id),
+            'status': 'processing',
+            'message': 'در حال پردازش... لطفاً صبر کنید.'
+        }, status=202)
+
+    except Exception as e:
+        logger.error(f"Error in submit_speaking_upload: {e}", exc_info=True)
+        if submission is None:
+            handler.discard()
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 @api_login_required
 def submission_detail(request, submission_id):
     """View detailed results for a specific submission"""
@@ -537,6 +485,8 @@ def submission_status(request, submission_id):
     )
 
     if submission.status == AnalysisStatus.IN_PROGRESS:
+        # Polling keeps the workers of this process alive (e.g. after a restart).
+        ensure_workers_started()
         return JsonResponse({'status': 'in_progress'})
 
     if submission.status == AnalysisStatus.COMPLETED:
@@ -554,3 +504,12 @@ def submission_status(request, submission_id):
         'status': 'failed',
         'message': error_message or 'ارزیابی ناموفق بود. لطفاً دوباره تلاش کنید.'
     })
+
+
+@api_login_required
+@require_http_methods(["GET"])
+def assessment_metrics_view(request):
+    """Assessment queue depth, wait/run times and provider usage (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return JsonResponse(assessment_metrics())
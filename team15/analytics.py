@@ -0,0 +1,251 @@
+"""Aggregate-based progress analytics for the dashboard and progress pages.
+
+Everything is computed with grouped SQL aggregates instead of loading
+attempts and answers:
+
+- window_metrics: sessions, average score, accuracy, time per question and
+  accuracy per question type for the completed attempts in a time window
+  (two queries).
+- score_trend: average score percentage per trend bucket (one query).
+  Scores are whole numbers 0-30, so grouping by (bucket, score) keeps the
+  per-attempt rounding of the pages exact.
+- UserProgress: all-time totals per user, folded in when an attempt is
+  completed (record_attempt_completed) and rebuilt from history when
+  missing (rebuild_user_progress).
+"""
+import logging
+
+from django.db import router, transaction
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+
+from .models import Answer, TestAttempt, UserProgress
+
+logger = logging.getLogger(__name__)
+
+
+def score_to_30(score):
+    if score is None:
+        return 0
+    return max(0, min(30, int(round(score))))
+
+
+def pct_from_score_30(score):
+    return int(round((score_to_30(score) / 30) * 100))
+
+
+def _answer_groups(answers_qs):
+    """{question_type: {correct, total, time_sum, time_count}} for a queryset of answers."""
+    rows = (
+        answers_qs.order_by()
+        .values("question__question_type")
+        .annotate(
+            total=Count("id"),
+            correct=Count("id", filter=Q(is_correct=True)),
+            time_sum=Sum("time_spent", filter=Q(time_spent__gt=0)),
+            time_count=Count("id", filter=Q(time_spent__gt=0)),
+        )
+        .order_by("question__question_type")
+    )
+    return {
+        row["question__question_type"]: {
+            "correct": row["correct"],
+            "total": row["total"],
+            "time_sum": row["time_sum"] or 0,
+            "time_count": row["time_count"],
+        }
+        for row in rows
+    }
+
+
+def _metrics(sessions, score_total, scored, total_time, by_type, time_sum, time_count):
+    answer_count = sum(total for _, total in by_type.values())
+    correct_count = sum(correct for correct, _ in by_type.values())
+    avg_time_q = time_sum / time_count if time_count else 0
+    if not avg_time_q and answer_count > 0 and total_time > 0:
+        avg_time_q = total_time / answer_count
+    return {
+        "sessions_count": sessions,
+        "avg_score_raw": score_total / scored if scored else 0,
+        "answer_count": answer_count,
+        "accuracy_pct": int(round((correct_count / answer_count) * 100)) if answer_count else 0,
+        "avg_time_q": float(avg_time_q or 0),
+        "by_type": by_type,
+    }
+
+
+def completed_attempts(user_id, start=None, end=None):
+    qs = TestAttempt.objects.filter(user_id=user_id, status="completed")
+    if start is not None:
+        qs = qs.filter(started_at__gte=start, started_at__lt=end)
+    return qs
+
+
+def window_metrics(user_id, start=None, end=None):
+    """Metrics for the user's completed attempts started in [start, end); all of them when start is None."""
+    if start is None:
+        progress = get_user_progress(user_id)
+        return _metrics(
+            progress.completed_attempts, progress.score_sum, progress.scored_attempts, progress.total_time_sum,
+            {qtype: tuple(item) for qtype, item in progress.by_type.items()},
+            progress.time_spent_sum, progress.time_spent_count,
+        )
+    attempts = completed_attempts(user_id, start, end)
+    sessions = scored = score_total = total_time = 0
+    for row in attempts.order_by().values("score").annotate(n=Count("id"), time=Sum("total_time")):
+        sessions += row["n"]
+        total_time += row["time"] or 0
+        if row["score"] is not None:
+            scored += row["n"]
+            score_total += score_to_30(row["score"]) * row["n"]
+    groups = _answer_groups(Answer.objects.filter(attempt__in=attempts.values("id")))
+    return _metrics(
+        sessions, score_total, scored, total_time,
+        {qtype: (g["correct"], g["total"]) for qtype, g in groups.items()},
+        sum(g["time_sum"] for g in groups.values()), sum(g["time_count"] for g in groups.values()),
+    )
+
+
+def score_trend(user_id, edges, attempts=None):
+    """Average score percentage per bucket [edges[i], edges[i + 1]); 0 for empty buckets."""
+    if attempts is None:
+        attempts = completed_attempts(user_id)
+    bucket = Case(
+        *[When(started_at__lt=edge, then=Value(i)) for i, edge in enumerate(edges[1:])],
+        default=Value(None),
+        output_field=IntegerField(),
+    )
+    rows = (
+        attempts.filter(started_at__gte=edges[0], score__isnull=False)
+        .annotate(bucket=bucket)
+        .order_by()
+        .values("bucket", "score")
+        .annotate(n=Count("id"))
+    )
+    sums = [0] * (len(edges) - 1)
+    counts = [0] * (len(edges) - 1)
+    for row in rows:
+        if row["bucket"] is None:
+            continue
+        sums[row["bucket"]] += pct_from_score_30(row["score"]) * row["n"]
+        counts[row["bucket"]] += row["n"]
+    return [int(round(s / c)) if c else 0 for s, c in zip(sums, counts)]
+
+
+# ---------------------------------------------------------------------------
+# Per-user rollup
+# ---------------------------------------------------------------------------
+
+def _apply(progress, attempt, groups):
+    progress.completed_attempts += 1
+    if attempt.score is not None:
+        progress.scored_attempts += 1
+        progress.score_sum += attempt.score
+    progress.total_time_sum += attempt.total_time or 0
+    by_type = dict(progress.by_type)
+    for qtype, g in groups.items():
+        correct, total = by_type.get(qtype, (0, 0))
+        by_type[qtype] = [correct + g["correct"], total + g["total"]]
+        progress.answers_total += g["total"]
+        progress.answers_correct += g["correct"]
+        progress.time_spent_sum += g["time_sum"]
+        progress.time_spent_count += g["time_count"]
+    progress.by_type = by_type
+
+
+def record_attempt_completed(attempt):
+    """Fold a just-completed attempt (score and total_time set) into its user's UserProgress."""
+    using = router.db_for_write(UserProgress)
+    try:
+        with transaction.atomic(using=using):
+            progress = UserProgress.objects.using(using).select_for_update().filter(user_id=attempt.user_id).first()
+            if progress is None:
+                # First rollup for this user: the history already includes this attempt.
+                rebuild_user_progress([attempt.user_id])
+                return
+            _apply(progress, attempt, _answer_groups(Answer.objects.using(using).filter(attempt_id=attempt.id)))
+            progress.save(using=using)
+    except Exception as e:
+        # Never fail the submission; drop the row so the next read rebuilds it.
+        logger.exception(f"Failed to update progress rollup for user {attempt.user_id}: {str(e)}")
+        UserProgress.objects.using(using).filter(user_id=attempt.user_id).delete()
+
+
+def get_user_progress(user_id):
+    progress = UserProgress.objects.filter(user_id=user_id).first()
+    if progress is None:
+        rebuild_user_progress([user_id])
+        progress = UserProgress.objects.filter(user_id=user_id).first()
+    return progress
+
+
+def rebuild_user_progress(user_ids=None, batch_size=500):
+    """Rebuild UserProgress rows from history; all users with attempts when user_ids is None.
+
+    Returns the number of users processed.
+    """
+    using = router.db_for_write(UserProgress)
+    if user_ids is None:
+        user_ids = TestAttempt.objects.using(using).order_by().values_list("user_id", flat=True).distinct()
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+
+    for offset in range(0, len(user_ids), batch_size):
+        batch = user_ids[offset:offset + batch_size]
+        attempts = TestAttempt.objects.using(using).filter(user_id__in=batch, status="completed")
+        rows = {
+            user_id: UserProgress(user_id=user_id, by_type={}) for user_id in batch
+        }
+        for row in attempts.order_by().values("user_id").annotate(
+            n=Count("id"),
+            scored=Count("id", filter=Q(score__isnull=False)),
+            score_sum=Sum("score"),
+            total_time=Sum("total_time"),
+        ):
+            progress = rows[row["user_id"]]
+            progress.completed_attempts = row["n"]
+            progress.scored_attempts = row["scored"]
+            progress.score_sum = row["score_sum"] or 0
+            progress.total_time_sum = row["total_time"] or 0
+        for row in (
+            Answer.objects.using(using).filter(attempt__in=attempts.values("id"))
+            .order_by()
+            .values("attempt__user_id", "question__question_type")
+            .annotate(
+                total=Count("id"),
+                correct=Count("id", filter=Q(is_correct=True)),
+                time_sum=Sum("time_spent", filter=Q(time_spent__gt=0)),
+                time_count=Count("id", filter=Q(time_spent__gt=0)),
+            )
+        ):
+            progress = rows[row["attempt__user_id"]]
+            progress.by_type[row["question__question_type"]] = [row["correct"], row["total"]]
+            progress.answers_total += row["total"]
+            progress.answers_correct += row["correct"]
+            progress.time_spent_sum += row["time_sum"] or 0
+            progress.time_spent_count += row["time_count"]
+
+        with transaction.atomic(using=using):
+            UserProgress.objects.using(using).filter(user_id__in=batch).delete()
+            UserProgress.objects.using(using).bulk_create(rows.values())
+    return len(user_ids)
+
+
+def dashboard_metrics(user_id):
+    """All-time dashboard totals: the rollup plus the answers of attempts still in progress."""
+    progress = get_user_progress(user_id)
+    live = _answer_groups(Answer.objects.filter(attempt__user_id=user_id, attempt__status="in_progress"))
+    by_type = {qtype: tuple(item) for qtype, item in progress.by_type.items()}
+    for qtype, g in live.items():
+        correct, total = by_type.get(qtype, (0, 0))
+        by_type[qtype] = (correct + g["correct"], total + g["total"])
+    time_sum = progress.time_spent_sum + sum(g["time_sum"] for g in live.values())
+    time_count = progress.time_spent_count + sum(g["time_count"] for g in live.values())
+    answer_count = sum(total for _, total in by_type.values())
+    avg_time_q = time_sum / time_count if time_count else None
+    if not avg_time_q and answer_count > 0 and progress.total_time_sum > 0:
+        avg_time_q = progress.total_time_sum / answer_count
+    return {
+        "avg_score": progress.score_sum / progress.scored_attempts if progress.scored_attempts else None,
+        "avg_time_q": avg_time_q,
+        "answer_count": answer_count,
+        "by_type": by_type,
+    }
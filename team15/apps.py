@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class Team15Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'team15'
+
+    def ready(self):
+        import team15.signals
@@ -0,0 +1,95 @@
+"""Active test listing for the test_list API.
+
+tests_with_counts() annotates passage and question counts as correlated
+subqueries, so listing N tests is one query instead of 1 + P + Q. The
+serialized listing (all active tests, and per mode) is cached under a
+version key. Saving or deleting a Test, Passage or Question moves it to a
+new version (team15.signals). Bulk loaders wrap their writes in
+bulk_test_changes() so there is one invalidation at the end.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Passage, Question, Test
+from .serializers import TestListSerializer
+
+_VERSION_KEY = "team15:test_catalog:version"
+_local = threading.local()
+
+
+def _count(qs, group_field):
+    counts = qs.order_by().values(group_field).annotate(n=Count("id")).values("n")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def tests_with_counts(qs=None):
+    """Tests annotated with passage_count and question_count (soft-deleted rows excluded)."""
+    if qs is None:
+        qs = Test.objects.all()
+    return qs.annotate(
+        passage_count=_count(Passage.objects.filter(test=OuterRef("pk")), "test"),
+        question_count=_count(
+            Question.objects.filter(passage__test=OuterRef("pk"), passage__deleted_at__isnull=True),
+            "passage__test",
+        ),
+    )
+
+
+def in_bulk_changes():
+    return getattr(_local, "depth", 0) > 0
+
+
+def _new_version():
+    cache.set(_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_test_catalog():
+    # After commit, so a concurrent listing cannot cache pre-commit rows under the new version.
+    if in_bulk_changes():
+        return
+    transaction.on_commit(_new_version, using=router.db_for_write(Test))
+
+
+@contextmanager
+def bulk_test_changes():
+    """Create or delete whole tests without per-row signal work; invalidates once at the end.
+
+    Tests are not touched for their layouts inside the block, so it is only
+    meant for adding new tests or deleting them, not for editing content.
+    """
+    _local.depth = getattr(_local, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+        if not _local.depth:
+            invalidate_test_catalog()
+
+
+def _current_version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(_VERSION_KEY)
+    return version
+
+
+def get_test_catalog(mode=None):
+    """Serialized active tests, optionally for one mode ("exam" / "practice")."""
+    key = f"team15:test_catalog:{_current_version()}:{mode or 'all'}"
+    data = cache.get(key)
+    if data is None:
+        qs = Test.objects.filter(is_active=True)
+        if mode:
+            qs = qs.filter(mode=mode)
+        serializer = TestListSerializer(tests_with_counts(qs).order_by("id"), many=True)
+        data = [dict(item) for item in serializer.data]
+        cache.set(key, data, getattr(settings, "TEAM15_TEST_CATALOG_TTL", 600))
+    return data
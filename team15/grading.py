@@ -0,0 +1,116 @@
+"""Bulk grading of full exam submissions.
+
+The test's answer key comes from its compiled layout (team15.layout), the
+submission is graded in memory and all answers are written with a single bulk upsert, in the same
+transaction that completes the attempt.
+"""
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .analytics import record_attempt_completed
+from .layout import get_test_layout
+from .models import Answer, TestAttempt
+from .scoring import calculate_score
+
+ANSWER_UPDATE_FIELDS = ["selected_answer", "is_correct", "time_spent", "deleted_at"]
+
+
+def grade_answers(answer_key, answers_data):
+    """Grade submitted answers against the key.
+
+    Answers to questions outside the test are ignored; when a question is
+    answered twice the last answer counts. Returns {question_id: (selected,
+    is_correct, time_spent)}.
+    """
+    graded = {}
+    for ans in answers_data:
+        qid = ans["question_id"]
+        if qid not in answer_key:
+            continue
+        selected_answer = str(ans.get("selected_answer") or "").strip()
+        incoming_time = ans.get("time_spent")
+        normalized_time = max(1, int(incoming_time)) if incoming_time is not None else None
+        graded[qid] = (selected_answer, selected_answer == answer_key[qid], normalized_time)
+    return graded
+
+
+def _bulk_upsert_answers(answers, using):
+    features = connections[using].features
+    if not features.supports_update_conflicts:
+        Answer.all_objects.using(using).filter(
+            attempt_id=answers[0].attempt_id, question_id__in=[a.question_id for a in answers]
+        ).delete()
+        Answer.all_objects.using(using).bulk_create(answers)
+        return
+    kwargs = {"update_conflicts": True, "update_fields": ANSWER_UPDATE_FIELDS}
+    if features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["attempt", "question"]
+    Answer.all_objects.using(using).bulk_create(answers, **kwargs)
+
+
+def submit_exam_answers(attempt, answers_data):
+    """Grade and store an exam submission and complete the attempt, atomically.
+
+    Returns (correct_count, total_questions, score), or None when the attempt
+    was completed concurrently.
+    """
+    answer_key = get_test_layout(attempt.test).answer_key
+    graded = grade_answers(answer_key, answers_data)
+    correct_count = sum(1 for _, is_correct, _ in graded.values() if is_correct)
+    total_questions = len(answer_key)
+    score = calculate_score(correct_count, total_questions)
+
+    using = router.db_for_write(Answer)
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        # Only one submission can move the attempt out of in_progress.
+        completed = TestAttempt.objects.using(using).filter(id=attempt.id, status="in_progress").update(
+            status="completed",
+            score=score,
+            total_time=int((now - attempt.started_at).total_seconds()),
+            finished_at=now,
+        )
+        if not completed:
+            return None
+        attempt.status, attempt.score, attempt.finished_at = "completed", score, now
+        attempt.total_time = int((now - attempt.started_at).total_seconds())
+        if graded:
+            _bulk_upsert_answers([
+                Answer(
+                    attempt_id=attempt.id,
+                    question_id=qid,
+                    selected_answer=selected_answer,
+                    is_correct=is_correct,
+                    time_spent=time_spent,
+                    deleted_at=None,
+                )
+                for qid, (selected_answer, is_correct, time_spent) in graded.items()
+            ], using)
+        record_attempt_completed(attempt)
+
+    return correct_count, total_questions, score
+
+
+def finish_practice_attempt(attempt):
+    """Complete a practice attempt from its stored answers, atomically.
+
+    Returns (correct_count, total_questions, score), or None when the attempt
+    was completed concurrently (e.g. a double-clicked finish).
+    """
+    total_questions = get_test_layout(attempt.test).total_questions
+    using = router.db_for_write(TestAttempt)
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        correct_count = Answer.objects.using(using).filter(attempt_id=attempt.id, is_correct=True).count()
+        score = calculate_score(correct_count, total_questions)
+        total_time = int((now - attempt.started_at).total_seconds())
+        # Same guard as submit_exam_answers: the rollup is folded in once.
+        completed = TestAttempt.objects.using(using).filter(id=attempt.id, status="in_progress").update(
+            status="completed", score=score, total_time=total_time, finished_at=now,
+        )
+        if not completed:
+            return None
+        attempt.status, attempt.score, attempt.finished_at, attempt.total_time = "completed", score, now, total_time
+        record_attempt_completed(attempt)
+
+    return correct_count, total_questions, score
@@ -0,0 +1,128 @@
+"""Compiled, read-only layout of a reading test.
+
+A TestLayout holds everything the exam/practice pages, grading and the
+result endpoints need about a test's content: questions in display order,
+passages with their paragraphs already split, the answer key and counts.
+It is built with one query and cached in the process and in the shared
+cache under (test id, Test.updated_at). Saving or deleting a Passage or
+Question touches its test's updated_at (team15.signals), so an edit moves
+readers to a new layout.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Question, Test
+
+PROCESS_CACHE_SIZE = 256
+
+_memo = OrderedDict()  # test_id -> TestLayout
+_memo_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PassageLayout:
+    id: int
+    title: str
+    content: str
+    paragraphs: tuple
+
+
+@dataclass(frozen=True)
+class QuestionLayout:
+    id: int
+    number: int
+    passage: PassageLayout
+    question_text: str
+    question_type: str
+    choices: tuple
+    correct_answer: str
+
+
+@dataclass(frozen=True)
+class TestLayout:
+    test_id: int
+    updated_at: object
+    questions: tuple
+    numbers: dict  # question_id -> 1-based position
+    answer_key: dict  # question_id -> stripped correct answer
+
+    @property
+    def total_questions(self):
+        return len(self.questions)
+
+    def question_at(self, number):
+        """Question by 1-based position, clamped to the test; None for an empty test."""
+        if not self.questions:
+            return None
+        return self.questions[max(1, min(number, len(self.questions))) - 1]
+
+
+def _cache_key(test_id, updated_at):
+    return f"team15:layout:{test_id}:{updated_at.timestamp()}"
+
+
+def build_test_layout(test_id, updated_at):
+    questions = (
+        Question.objects.filter(passage__test_id=test_id)
+        .select_related("passage")
+        .order_by("passage__order", "order", "id")
+    )
+    passages = {}
+    entries = []
+    for number, question in enumerate(questions, start=1):
+        passage = passages.get(question.passage_id)
+        if passage is None:
+            passage = passages[question.passage_id] = PassageLayout(
+                id=question.passage.id,
+                title=question.passage.title,
+                content=question.passage.content,
+                paragraphs=tuple(p.strip() for p in question.passage.content.splitlines() if p.strip()),
+            )
+        entries.append(QuestionLayout(
+            id=question.id,
+            number=number,
+            passage=passage,
+            question_text=question.question_text,
+            question_type=question.question_type,
+            choices=tuple(question.choices or ()),
+            correct_answer=question.correct_answer,
+        ))
+    return TestLayout(
+        test_id=test_id,
+        updated_at=updated_at,
+        questions=tuple(entries),
+        numbers={q.id: q.number for q in entries},
+        answer_key={q.id: q.correct_answer.strip() for q in entries},
+    )
+
+
+def get_test_layout(test):
+    """Layout for a Test instance or test id."""
+    if isinstance(test, Test):
+        test_id, updated_at = test.id, test.updated_at
+    else:
+        test_id = int(test)
+        updated_at = Test.all_objects.filter(id=test_id).values_list("updated_at", flat=True).first()
+        if updated_at is None:
+            return None
+
+    layout = _memo.get(test_id)
+    if layout is not None and layout.updated_at == updated_at:
+        return layout
+
+    key = _cache_key(test_id, updated_at)
+    layout = cache.get(key)
+    if layout is None:
+        layout = build_test_layout(test_id, updated_at)
+        cache.set(key, layout, getattr(settings, "TEAM15_LAYOUT_CACHE_TTL", 3600))
+
+    with _memo_lock:
+        _memo[test_id] = layout
+        _memo.move_to_end(test_id)
+        while len(_memo) > PROCESS_CACHE_SIZE:
+            _memo.popitem(last=False)
+    return layout
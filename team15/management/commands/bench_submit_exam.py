@@ -0,0 +1,132 @@
+"""
+Submission latency of team15 submit_exam for 10/40/100-question tests: the
+old per-answer loop (Question.get + Answer.update_or_create per answer, in
+autocommit) against the bulk grading engine (team15.grading).
+
+The team15 alias is pointed at a temporary SQLite file and migrated, so the
+real team15 database is not touched.
+
+Usage:
+    python manage.py bench_submit_exam
+    python manage.py bench_submit_exam --sizes 40 --runs 50
+"""
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from team15.grading import submit_exam_answers
+from team15.models import Answer, Passage, Question, Test, TestAttempt
+from team15.scoring import calculate_score
+
+QUESTIONS_PER_PASSAGE = 10
+CHOICES = ["A", "B", "C", "D"]
+
+
+def legacy_submit(attempt, answers_data):
+    """The previous submit_exam body, kept for comparison."""
+    test_question_ids = set(
+        Question.objects.filter(passage__test=attempt.test).values_list("id", flat=True)
+    )
+    correct_count = 0
+    total_questions = len(test_question_ids)
+    for ans in answers_data:
+        qid = ans["question_id"]
+        if qid not in test_question_ids:
+            continue
+        try:
+            question = Question.objects.get(id=qid)
+        except Question.DoesNotExist:
+            continue
+        selected_answer = str(ans.get("selected_answer") or "").strip()
+        is_correct = selected_answer == question.correct_answer.strip()
+        if is_correct:
+            correct_count += 1
+        incoming_time = ans.get("time_spent")
+        normalized_time = max(1, int(incoming_time)) if incoming_time is not None else None
+        Answer.objects.update_or_create(
+            attempt=attempt,
+            question=question,
+            defaults={
+                "selected_answer": selected_answer,
+                "is_correct": is_correct,
+                "time_spent": normalized_time,
+            },
+        )
+    score = calculate_score(correct_count, total_questions)
+    now = timezone.now()
+    attempt.status = "completed"
+    attempt.score = score
+    attempt.total_time = int((now - attempt.started_at).total_seconds())
+    attempt.finished_at = now
+    attempt.save()
+    return correct_count, total_questions, score
+
+
+class Command(BaseCommand):
+    help = "Benchmark team15 exam submission: per-answer queries vs bulk grading"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,40,100", help="Comma-separated question counts")
+        parser.add_argument("--runs", type=int, default=20)
+
+    def _use_temp_database(self, path):
+        connection = connections["team15"]
+        connection.close()
+        connection.settings_dict["NAME"] = path
+        call_command("migrate", "team15", database="team15", verbosity=0)
+
+    def _make_test(self, size):
+        test = Test.objects.create(title=f"Bench {size}", mode="exam", time_limit=60)
+        questions = []
+        for p in range(0, size, QUESTIONS_PER_PASSAGE):
+            passage = Passage.objects.create(test=test, title=f"P{p}", content="...", order=p)
+            questions += Question.objects.bulk_create([
+                Question(passage=passage, question_text=f"Q{i}?", choices=CHOICES,
+                         correct_answer=CHOICES[i % 4], order=i)
+                for i in range(p, min(p + QUESTIONS_PER_PASSAGE, size))
+            ])
+        answers = [
+            {"question_id": q.id, "selected_answer": CHOICES[(q.order + (q.order % 3 == 0)) % 4], "time_spent": 30}
+            for q in Question.objects.filter(passage__test=test)
+        ]
+        return test, answers
+
+    def _time(self, submit, test, answers, runs):
+        timings, queries, result = [], 0, None
+        for _ in range(runs):
+            attempt = TestAttempt.objects.create(test=test, user_id="bench-user")
+            connections["team15"].queries_log.clear()
+            with CaptureQueriesContext(connections["team15"]) as ctx:
+                started = time.perf_counter()
+                result = submit(attempt, answers)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = len(ctx.captured_queries)
+        timings.sort()
+        return statistics.mean(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))], queries, result
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        runs = options["runs"]
+        fd, path = tempfile.mkstemp(suffix=".sqlite3", prefix="team15-bench-")
+        os.close(fd)
+        try:
+            self._use_temp_database(path)
+            self.stdout.write(f"{'questions':>9}  {'engine':<7} {'mean ms':>8} {'p95 ms':>8} {'queries':>8}")
+            for size in sizes:
+                test, answers = self._make_test(size)
+                legacy = self._time(legacy_submit, test, answers, runs)
+                bulk = self._time(submit_exam_answers, test, answers, runs)
+                if legacy[3] != bulk[3]:
+                    self.stderr.write(f"results differ for {size} questions: {legacy[3]} vs {bulk[3]}")
+                for name, (mean, p95, queries, _) in (("legacy", legacy), ("bulk", bulk)):
+                    self.stdout.write(f"{size:>9}  {name:<7} {mean:>8.2f} {p95:>8.2f} {queries:>8}")
+        finally:
+            connections["team15"].close()
+            os.remove(path)
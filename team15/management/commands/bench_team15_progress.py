@@ -0,0 +1,108 @@
+"""
+Dashboard and progress page cost for a heavy team15 user: wall time and
+query count of the page contexts (views._dashboard_context and
+views._progress_context for every range), plus a full rollup rebuild.
+
+The team15 alias is pointed at a temporary SQLite file and migrated, so the
+real team15 database is not touched.
+
+Usage:
+    python manage.py bench_team15_progress
+    python manage.py bench_team15_progress --attempts 2000 --answers 40
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from team15 import views
+from team15.analytics import rebuild_user_progress
+from team15.models import Answer, Passage, Question, Test, TestAttempt
+
+QUESTION_TYPES = ["multiple_choice", "insert_text", "vocabulary", "detail", "main_idea"]
+USER_ID = "bench-user"
+
+
+class Command(BaseCommand):
+    help = "Benchmark the team15 dashboard/progress contexts for a user with many attempts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--attempts", type=int, default=500)
+        parser.add_argument("--answers", type=int, default=20, help="Answers per attempt")
+        parser.add_argument("--runs", type=int, default=10)
+
+    def _use_temp_database(self, path):
+        connection = connections["team15"]
+        connection.close()
+        connection.settings_dict["NAME"] = path
+        call_command("migrate", "team15", database="team15", verbosity=0)
+
+    def _seed(self, attempt_count, answers_per_attempt):
+        rng = random.Random(15)
+        test = Test.objects.create(title="Bench", mode="exam", time_limit=60)
+        passage = Passage.objects.create(test=test, title="P", content="...")
+        questions = Question.objects.bulk_create([
+            Question(passage=passage, question_text=f"Q{i}?", question_type=QUESTION_TYPES[i % len(QUESTION_TYPES)],
+                     choices=["A", "B", "C", "D"], correct_answer="A", order=i)
+            for i in range(answers_per_attempt)
+        ])
+        attempts = TestAttempt.objects.bulk_create([
+            TestAttempt(test=test, user_id=USER_ID, status="completed", score=rng.randint(0, 30),
+                        total_time=rng.randint(600, 3600))
+            for _ in range(attempt_count)
+        ])
+        # started_at is auto_now_add; spread the history over a year afterwards.
+        now = timezone.now()
+        for attempt in attempts:
+            attempt.started_at = now - timedelta(days=rng.uniform(0, 365))
+        TestAttempt.objects.bulk_update(attempts, ["started_at"], batch_size=500)
+        Answer.objects.bulk_create([
+            Answer(attempt=attempt, question=question, selected_answer="A", is_correct=rng.random() < 0.6,
+                   time_spent=rng.randint(10, 120))
+            for attempt in attempts for question in questions
+        ], batch_size=1000)
+
+    def _measure(self, label, func, runs):
+        timings = []
+        for _ in range(runs):
+            connections["team15"].queries_log.clear()
+            with CaptureQueriesContext(connections["team15"]) as ctx:
+                started = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:<18} {statistics.mean(timings):>9.2f} {p95:>9.2f} {len(ctx.captured_queries):>8}"
+        )
+
+    def handle(self, *args, **options):
+        fd, path = tempfile.mkstemp(suffix=".sqlite3", prefix="team15-bench-")
+        os.close(fd)
+        try:
+            self._use_temp_database(path)
+            self._seed(options["attempts"], options["answers"])
+            self.stdout.write(f"{options['attempts']} attempts x {options['answers']} answers")
+            self.stdout.write(f"{'context':<18} {'mean ms':>9} {'p95 ms':>9} {'queries':>8}")
+
+            user = SimpleNamespace(id=USER_ID, first_name="Bench")
+            factory = RequestFactory()
+            runs = options["runs"]
+            self._measure("rebuild rollup", lambda: rebuild_user_progress([USER_ID]), runs)
+            self._measure("dashboard", lambda: views._dashboard_context(user), runs)
+            for selected_range in ("30d", "6m", "all"):
+                request = factory.get("/team15/progress/", {"range": selected_range})
+                self._measure(f"progress {selected_range}", lambda: views._progress_context(user, request), runs)
+        finally:
+            connections["team15"].close()
+            os.remove(path)
@@ -1,6 +1,10 @@
+import random
+
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from team15.models import Test, Passage, Question, TestAttempt, Answer
+from django.db import connections, router, transaction
+from team15.catalog import bulk_test_changes
+from team15.models import Test, Passage, Question, TestAttempt, Answer, UserProgress
 
 TEST_USER_EMAIL = "team15@test.local"
 TEST_USER_PASSWORD = "Team15@12345"
@@ -839,59 +843,126 @@ class Command(BaseCommand):
             action="store_true",
             help="Clear existing data before loading",
         )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Also generate this many synthetic tests (load testing)",
+        )
+        parser.add_argument("--passages", type=int, default=3, help="Passages per synthetic test")
+        parser.add_argument("--questions", type=int, default=10, help="Questions per synthetic passage")
+        parser.add_argument("--batch-size", type=int, default=200, help="Synthetic tests per transaction")
 
-    def handle(self, *args, **options):
-        if options["clear"]:
-            self.stdout.write("Clearing existing team15 data...")
-            Answer.objects.all().delete()
-            TestAttempt.objects.all().delete()
-            Question.objects.all().delete()
-            Passage.objects.all().delete()
-            Test.objects.all().delete()
-            self.stdout.write(self.style.WARNING("All team15 data cleared."))
+    @staticmethod
+    def _create_parents(model, objs):
+        """bulk_create rows that children will point at, so their primary keys must come back.
 
-        tests_created = 0
-        passages_created = 0
-        questions_created = 0
+        Backends that cannot return rows from a bulk insert (MySQL; MariaDB
+        before 10.5) leave the keys unset, so there the rows go in one by one.
+        """
+        using = router.db_for_write(model)
+        if connections[using].features.can_return_rows_from_bulk_insert:
+            return model.objects.using(using).bulk_create(objs)
+        for obj in objs:
+            obj.save(using=using, force_insert=True)
+        return objs
 
-        for test_data in MOCK_DATA["tests"]:
-            test, created = Test.objects.get_or_create(
-                title=test_data["title"],
-                defaults={
-                    "mode": test_data["mode"],
-                    "time_limit": test_data["time_limit"],
-                    "is_active": test_data["is_active"],
-                },
+    def _insert_tests(self, tests_data):
+        """Insert tests with their passages and questions: three bulk inserts per batch where the backend allows."""
+        tests = self._create_parents(Test, [
+            Test(title=t["title"], mode=t["mode"], time_limit=t["time_limit"], is_active=t["is_active"])
+            for t in tests_data
+        ])
+        passages_data = [(test, p) for test, t in zip(tests, tests_data) for p in t["passages"]]
+        passages = self._create_parents(Passage, [
+            Passage(test=test, title=p["title"], content=p["content"], order=p["order"])
+            for test, p in passages_data
+        ])
+        questions = Question.objects.bulk_create([
+            Question(
+                passage=passage,
+                question_text=q["question_text"],
+                question_type=q["question_type"],
+                choices=q["choices"],
+                correct_answer=q["correct_answer"],
+                order=q["order"],
             )
-            if created:
-                tests_created += 1
-            else:
-                self.stdout.write(f"  Test '{test.title}' already exists, skipping.")
-                continue
+            for passage, (_, p) in zip(passages, passages_data) for q in p["questions"]
+        ], batch_size=1000)
+        return len(tests), len(passages), len(questions)
 
-            for passage_data in test_data["passages"]:
-                passage = Passage.objects.create(
-                    test=test,
-                    title=passage_data["title"],
-                    content=passage_data["content"],
-                    order=passage_data["order"],
+    def _synthetic_test(self, rng, index, passage_count, question_count):
+        passages = []
+        for p in range(1, passage_count + 1):
+            questions = []
+            for q in range(1, question_count + 1):
+                choices = [f"{letter}) Option {letter} for item {q}" for letter in "ABCD"]
+                questions.append({
+                    "question_text": f"Synthetic question {q} about passage {p}?",
+                    "question_type": rng.choice(["multiple_choice", "insert_text"]),
+                    "choices": choices,
+                    "correct_answer": rng.choice(choices),
+                    "order": q,
+                })
+            passages.append({
+                "title": f"Synthetic Passage {p}",
+                "order": p,
+                "content": "\n\n".join(f"Paragraph {n} of synthetic passage {p}." for n in range(1, 4)),
+                "questions": questions,
+            })
+        return {
+            "title": f"Synthetic Reading Test {index}",
+            "mode": "exam" if index % 2 else "practice",
+            "time_limit": 60 if index % 2 else 0,
+            "is_active": True,
+            "passages": passages,
+        }
+
+    def handle(self, *args, **options):
+        using = router.db_for_write(Test)
+        with bulk_test_changes():
+            if options["clear"]:
+                self.stdout.write("Clearing existing team15 data...")
+                with transaction.atomic(using=using):
+                    Answer.objects.all().delete()
+                    TestAttempt.objects.all().delete()
+                    UserProgress.objects.all().delete()
+                    Question.objects.all().delete()
+                    Passage.objects.all().delete()
+                    Test.objects.all().delete()
+                self.stdout.write(self.style.WARNING("All team15 data cleared."))
+
+            existing = set(Test.objects.filter(
+                title__in=[t["title"] for t in MOCK_DATA["tests"]]
+            ).values_list("title", flat=True))
+            for title in sorted(existing):
+                self.stdout.write(f"  Test '{title}' already exists, skipping.")
+            with transaction.atomic(using=using):
+                tests_created, passages_created, questions_created = self._insert_tests(
+                    [t for t in MOCK_DATA["tests"] if t["title"] not in existing]
                 )
-                passages_created += 1
 
-                for q_data in passage_data["questions"]:
-                    Question.objects.create(
-                        passage=passage,
-                        question_text=q_data["question_text"],
-                        question_type=q_data["question_type"],
-                        choices=q_data["choices"],
-                        correct_answer=q_data["correct_answer"],
-                        order=q_data["order"],
-                    )
-                    questions_created += 1
+            self.stdout.write(self.style.SUCCESS(
+                f"Done! Created {tests_created} tests, {passages_created} passages, {questions_created} questions."
+            ))
 
-        self.stdout.write(self.style.SUCCESS(
-            f"Done! Created {tests_created} tests, {passages_created} passages, {questions_created} questions."
-        ))
+            if options["synthetic"]:
+                rng = random.Random(15)
+                offset = Test.all_objects.filter(title__startswith="Synthetic Reading Test").count()
+                created = [0, 0, 0]
+                batch_size = max(1, options["batch_size"])
+                for start in range(0, options["synthetic"], batch_size):
+                    batch = [
+                        self._synthetic_test(rng, offset + i + 1, options["passages"], options["questions"])
+                        for i in range(start, min(start + batch_size, options["synthetic"]))
+                    ]
+                    with transaction.atomic(using=using):
+                        counts = self._insert_tests(batch)
+                    created = [a + b for a, b in zip(created, counts)]
+                    self.stdout.write(f"  {created[0]}/{options['synthetic']} synthetic tests")
+                self.stdout.write(self.style.SUCCESS(
+                    f"Synthetic: created {created[0]} tests, {created[1]} passages, {created[2]} questions."
+                ))
 
         user_model = get_user_model()
         user, created = user_model.objects.get_or_create(
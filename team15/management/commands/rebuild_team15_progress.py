@@ -0,0 +1,28 @@
+"""
+Rebuild the per-user progress rollup (UserProgress) from stored attempts and answers.
+Use after imports or manual data fixes; submit_exam and finish_practice keep it up to date.
+
+Usage:
+    python manage.py rebuild_team15_progress                      # every user
+    python manage.py rebuild_team15_progress --user-id YOUR_UUID
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from team15.analytics import rebuild_user_progress
+
+
+class Command(BaseCommand):
+    help = "Rebuild the team15 per-user progress rollup"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", action="append", dest="user_ids", help="Only this user (repeatable)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Users per batch")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users = rebuild_user_progress(options["user_ids"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt progress for {users} user(s) in {time.perf_counter() - started:.2f}s"
+        ))
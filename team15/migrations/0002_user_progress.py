@@ -0,0 +1,33 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team15', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(max_length=36, unique=True)),
+                ('completed_attempts', models.IntegerField(default=0)),
+                ('scored_attempts', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('total_time_sum', models.BigIntegerField(default=0)),
+                ('answers_total', models.IntegerField(default=0)),
+                ('answers_correct', models.IntegerField(default=0)),
+                ('time_spent_sum', models.BigIntegerField(default=0)),
+                ('time_spent_count', models.IntegerField(default=0)),
+                ('by_type', models.JSONField(default=dict, help_text='{question_type: [correct, total]}')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_progress',
+            },
+        ),
+    ]
@@ -113,3 +113,25 @@ class Answer(SoftDeleteModel):
 
     def __str__(self):
         return f"Answer to Q{self.question.order} ({'correct' if self.is_correct else 'wrong'})"
+
+
+class UserProgress(models.Model):
+    """Per-user totals over completed attempts, kept up to date by team15.analytics."""
+
+    user_id = models.CharField(max_length=36, unique=True)
+    completed_attempts = models.IntegerField(default=0)
+    scored_attempts = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    total_time_sum = models.BigIntegerField(default=0)
+    answers_total = models.IntegerField(default=0)
+    answers_correct = models.IntegerField(default=0)
+    time_spent_sum = models.BigIntegerField(default=0)
+    time_spent_count = models.IntegerField(default=0)
+    by_type = models.JSONField(default=dict, help_text='{question_type: [correct, total]}')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "user_progress"
+
+    def __str__(self):
+        return f"Progress of {self.user_id} ({self.completed_attempts} attempts)"
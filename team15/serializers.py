@@ -39,14 +39,18 @@ class TestListSerializer(serializers.ModelSerializer):
         model = Test
         fields = ["id", "title", "mode", "time_limit", "is_active", "passage_count", "question_count", "created_at"]
 
+    # Querysets from team15.catalog.tests_with_counts carry both counts already.
     def get_passage_count(self, obj):
+        count = getattr(obj, "passage_count", None)
+        if count is not None:
+            return count
         return obj.passages.count()
 
     def get_question_count(self, obj):
-        total = 0
-        for p in obj.passages.all():
-            total += p.questions.count()
-        return total
+        count = getattr(obj, "question_count", None)
+        if count is not None:
+            return count
+        return Question.objects.filter(passage__test=obj, passage__deleted_at__isnull=True).count()
 
 
 class TestDetailSerializer(serializers.ModelSerializer):
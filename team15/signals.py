@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .catalog import in_bulk_changes, invalidate_test_catalog
+from .models import Passage, Question, Test
+
+
+# Test.updated_at versions the compiled layouts (team15.layout), so content
+# edits touch the test they belong to. Any change also invalidates the
+# cached test listing (team15.catalog). Inside catalog.bulk_test_changes()
+# only the single invalidation at the end is done.
+
+@receiver([post_save, post_delete], sender=Test)
+def invalidate_catalog_for_test(sender, instance, **kwargs):
+    invalidate_test_catalog()
+
+
+@receiver([post_save, post_delete], sender=Passage)
+def touch_test_for_passage(sender, instance, **kwargs):
+    if in_bulk_changes():
+        return
+    Test.all_objects.filter(id=instance.test_id).update(updated_at=timezone.now())
+    invalidate_test_catalog()
+
+
+@receiver([post_save, post_delete], sender=Question)
+def touch_test_for_question(sender, instance, **kwargs):
+    if in_bulk_changes():
+        return
+    Test.all_objects.filter(passages__id=instance.passage_id).update(updated_at=timezone.now())
+    invalidate_test_catalog()
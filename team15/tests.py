@@ -262,3 +262,223 @@ class APITests(TestCase):
         res = self.client.get("/team15/ping/")
         self.assertEqual(res.status_code, 200)
         self.assertEqual(res.json()["team"], "team15")
+
+
+@override_settings(DATABASES=TEST_DATABASES)
+class GradingTests(TestCase):
+    databases = {"default", "team15"}
+
+    def setUp(self):
+        from .grading import submit_exam_answers
+        self.submit = submit_exam_answers
+        self.test_obj = Test.objects.create(title="Graded", mode="exam", time_limit=60)
+        passage = Passage.objects.create(test=self.test_obj, title="P1", content="...", order=1)
+        self.q1 = Question.objects.create(
+            passage=passage, question_text="Q1?", choices=["A", "B"], correct_answer="A", order=1
+        )
+        self.q2 = Question.objects.create(
+            passage=passage, question_text="Q2?", choices=["A", "B"], correct_answer="B ", order=2
+        )
+        other = Test.objects.create(title="Other", mode="exam")
+        other_passage = Passage.objects.create(test=other, title="P", content="...")
+        self.foreign = Question.objects.create(
+            passage=other_passage, question_text="X?", choices=["A"], correct_answer="A"
+        )
+        self.attempt = TestAttempt.objects.create(test=self.test_obj, user_id="grader")
+
+    def test_submit_grades_in_bulk(self):
+        result = self.submit(self.attempt, [
+            {"question_id": self.q1.id, "selected_answer": "B", "time_spent": 0},
+            {"question_id": self.q1.id, "selected_answer": "A", "time_spent": 12},
+            {"question_id": self.q2.id, "selected_answer": " B"},
+            {"question_id": self.foreign.id, "selected_answer": "A"},
+        ])
+        self.assertEqual(result, (2, 2, calculate_score(2, 2)))
+        answers = {a.question_id: a for a in Answer.objects.filter(attempt=self.attempt)}
+        self.assertEqual(set(answers), {self.q1.id, self.q2.id})
+        self.assertEqual((answers[self.q1.id].selected_answer, answers[self.q1.id].time_spent), ("A", 12))
+        self.assertTrue(answers[self.q2.id].is_correct)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.status, "completed")
+        self.assertIsNotNone(self.attempt.finished_at)
+
+    def test_submit_overwrites_practice_answers(self):
+        Answer.objects.create(attempt=self.attempt, question=self.q1, selected_answer="B", is_correct=False)
+        self.submit(self.attempt, [{"question_id": self.q1.id, "selected_answer": "A"}])
+        answer = Answer.objects.get(attempt=self.attempt, question=self.q1)
+        self.assertTrue(answer.is_correct)
+
+    def test_second_submit_is_rejected(self):
+        self.assertIsNotNone(self.submit(self.attempt, [{"question_id": self.q1.id, "selected_answer": "A"}]))
+        self.assertIsNone(self.submit(self.attempt, [{"question_id": self.q1.id, "selected_answer": "B"}]))
+        self.assertEqual(Answer.objects.get(attempt=self.attempt, question=self.q1).selected_answer, "A")
+
+    def test_practice_attempt_finishes_once(self):
+        from .grading import finish_practice_attempt
+        from .models import UserProgress
+        Answer.objects.create(attempt=self.attempt, question=self.q1, selected_answer="A", is_correct=True)
+        self.assertEqual(finish_practice_attempt(self.attempt), (1, 2, calculate_score(1, 2)))
+        stale = TestAttempt.objects.get(id=self.attempt.id)
+        stale.status = "in_progress"
+        self.assertIsNone(finish_practice_attempt(stale))
+        progress = UserProgress.objects.get(user_id="grader")
+        self.assertEqual((progress.completed_attempts, progress.answers_correct), (1, 1))
+
+
+@override_settings(DATABASES=TEST_DATABASES)
+class LayoutTests(TestCase):
+    databases = {"default", "team15"}
+
+    def setUp(self):
+        self.test_obj = Test.objects.create(title="Layout", mode="exam", time_limit=60)
+        self.p2 = Passage.objects.create(test=self.test_obj, title="Second", content="x", order=2)
+        self.p1 = Passage.objects.create(test=self.test_obj, title="First", content="One\n\n Two \n", order=1)
+        self.q_late = Question.objects.create(
+            passage=self.p2, question_text="Late?", choices=["A", "B"], correct_answer="B", order=1
+        )
+        self.q_early = Question.objects.create(
+            passage=self.p1, question_text="Early?", choices=["A", "B"], correct_answer=" A ", order=5
+        )
+
+    def _layout(self):
+        from .layout import get_test_layout
+        return get_test_layout(Test.objects.get(id=self.test_obj.id))
+
+    def test_layout_order_and_key(self):
+        layout = self._layout()
+        self.assertEqual([q.id for q in layout.questions], [self.q_early.id, self.q_late.id])
+        self.assertEqual(layout.questions[0].passage.paragraphs, ("One", "Two"))
+        self.assertEqual(layout.answer_key, {self.q_early.id: "A", self.q_late.id: "B"})
+        self.assertEqual(layout.question_at(99).id, self.q_late.id)
+
+    def test_layout_is_cached_per_version(self):
+        from .layout import get_test_layout
+        test = Test.objects.get(id=self.test_obj.id)
+        first = get_test_layout(test)
+        with self.assertNumQueries(0, using="team15"):
+            self.assertIs(get_test_layout(test), first)
+
+        self.q_late.soft_delete()
+        self.assertEqual(self._layout().total_questions, 1)
+        Question.objects.create(passage=self.p2, question_text="New?", choices=["A"], correct_answer="A", order=2)
+        self.assertEqual(self._layout().total_questions, 2)
+
+
+@override_settings(DATABASES=TEST_DATABASES)
+class ProgressAnalyticsTests(TestCase):
+    databases = {"default", "team15"}
+
+    def setUp(self):
+        self.test_obj = Test.objects.create(title="Progress", mode="exam", time_limit=60)
+        passage = Passage.objects.create(test=self.test_obj, title="P1", content="...", order=1)
+        self.questions = [
+            Question.objects.create(
+                passage=passage, question_text=f"Q{i}?", question_type=qtype,
+                choices=["A", "B"], correct_answer="A", order=i,
+            )
+            for i, qtype in enumerate(["multiple_choice", "vocabulary", "vocabulary"])
+        ]
+
+    def _submit(self, selections):
+        from .grading import submit_exam_answers
+        attempt = TestAttempt.objects.create(test=self.test_obj, user_id="learner")
+        submit_exam_answers(attempt, [
+            {"question_id": q.id, "selected_answer": s, "time_spent": 20} for q, s in zip(self.questions, selections)
+        ])
+        return attempt
+
+    def test_rollup_matches_rebuild(self):
+        from .analytics import dashboard_metrics, get_user_progress, rebuild_user_progress, window_metrics
+        self._submit(["A", "B", "A"])
+        self._submit(["A", "A", "B"])
+        in_progress = TestAttempt.objects.create(test=self.test_obj, user_id="learner")
+        Answer.objects.create(attempt=in_progress, question=self.questions[0], selected_answer="A", is_correct=True)
+
+        progress = get_user_progress("learner")
+        incremental = {f: getattr(progress, f) for f in ("completed_attempts", "score_sum", "answers_total", "by_type")}
+        rebuild_user_progress(["learner"])
+        progress = get_user_progress("learner")
+        self.assertEqual(incremental, {f: getattr(progress, f) for f in incremental})
+        self.assertEqual(progress.by_type, {"multiple_choice": [2, 2], "vocabulary": [2, 4]})
+
+        metrics = window_metrics("learner")
+        self.assertEqual((metrics["sessions_count"], metrics["accuracy_pct"], metrics["avg_time_q"]), (2, 67, 20.0))
+        self.assertEqual(dashboard_metrics("learner")["by_type"]["multiple_choice"], (3, 3))
+
+    def test_score_trend_buckets(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .analytics import score_trend
+        now = timezone.now()
+        for days_ago, score in [(1, 30), (2, 15), (10, 0), (40, 30)]:
+            attempt = TestAttempt.objects.create(test=self.test_obj, user_id="learner", status="completed", score=score)
+            TestAttempt.objects.filter(id=attempt.id).update(started_at=now - timedelta(days=days_ago))
+        edges = [now - timedelta(days=14), now - timedelta(days=7), now]
+        self.assertEqual(score_trend("learner", edges), [0, 75])
+
+
+@override_settings(DATABASES=TEST_DATABASES)
+class TestCatalogTests(TestCase):
+    databases = {"default", "team15"}
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(using="team15", execute=True):
+            self.exam = Test.objects.create(title="Exam", mode="exam", time_limit=60)
+            for order in (1, 2):
+                passage = Passage.objects.create(test=self.exam, title=f"P{order}", content="...", order=order)
+                for q in range(3):
+                    Question.objects.create(
+                        passage=passage, question_text="Q?", choices=["A"], correct_answer="A", order=q
+                    )
+            Test.objects.create(title="Practice", mode="practice")
+
+    def test_listing_counts_in_one_query(self):
+        from .catalog import get_test_catalog
+        with self.assertNumQueries(1, using="team15"):
+            listing = get_test_catalog("exam")
+        self.assertEqual([(t["title"], t["passage_count"], t["question_count"]) for t in listing], [("Exam", 2, 6)])
+        with self.assertNumQueries(0, using="team15"):
+            get_test_catalog("exam")
+        self.assertEqual(len(get_test_catalog()), 2)
+
+    def test_listing_invalidated_on_content_change(self):
+        from .catalog import get_test_catalog
+        get_test_catalog("exam")
+        with self.captureOnCommitCallbacks(using="team15", execute=True):
+            Passage.objects.filter(test=self.exam).first().soft_delete()
+            # Not committed yet: the listing is not rebuilt from the open transaction.
+            self.assertEqual(get_test_catalog("exam")[0]["passage_count"], 2)
+        self.assertEqual(get_test_catalog("exam")[0]["passage_count"], 1)
+        self.assertEqual(get_test_catalog("exam")[0]["question_count"], 3)
+        self.exam.is_active = False
+        with self.captureOnCommitCallbacks(using="team15", execute=True):
+            self.exam.save()
+        self.assertEqual(get_test_catalog("exam"), [])
+
+
+@override_settings(DATABASES=TEST_DATABASES)
+class MockDataLoaderTests(TestCase):
+    databases = {"default", "team15"}
+
+    def test_insert_without_returned_bulk_keys(self):
+        # MySQL leaves bulk_create PKs unset; parents are then inserted one by one.
+        from unittest import mock
+        from django.db import connections
+        from .management.commands.load_team15_mock_data import Command
+
+        tests_data = [{
+            "title": "Loader", "mode": "exam", "time_limit": 60, "is_active": True,
+            "passages": [{
+                "title": f"P{p}", "content": "...", "order": p,
+                "questions": [{
+                    "question_text": "Q?", "question_type": "multiple_choice",
+                    "choices": ["A", "B"], "correct_answer": "A", "order": q,
+                } for q in range(3)],
+            } for p in (1, 2)],
+        }]
+        features = type(connections["team15"].features)
+        with mock.patch.object(features, "can_return_rows_from_bulk_insert", False):
+            counts = Command()._insert_tests(tests_data)
+
+        self.assertEqual(counts, (1, 2, 6))
+        self.assertEqual(Question.objects.filter(passage__test__title="Loader").count(), 6)
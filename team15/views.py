@@ -2,7 +2,6 @@ from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.utils import timezone
 from django.db.models import Avg, Count
-from django.contrib.auth import get_user_model
 from functools import wraps
 from collections import defaultdict
 from datetime import timedelta
@@ -11,18 +10,25 @@ from rest_framework.decorators import api_view, authentication_classes, permissi
 from rest_framework.response import Response
 from rest_framework import status
 from core.jwt_utils import decode_token
+from core.principal_cache import resolve_principal
 
 from .models import Test, Question, TestAttempt, Answer
 from .serializers import (
-    TestListSerializer, TestDetailSerializer,
+    TestDetailSerializer,
     StartAttemptSerializer, SubmitAnswerSerializer,
     SubmitExamSerializer, FinishPracticeSerializer,
     AttemptResultSerializer, AttemptHistorySerializer,
 )
+from .analytics import (
+    dashboard_metrics, pct_from_score_30 as _pct_from_score_30,
+    score_to_30 as _score_to_30, score_trend, window_metrics,
+)
+from .catalog import get_test_catalog, tests_with_counts
+from .grading import finish_practice_attempt, submit_exam_answers
+from .layout import get_test_layout
 from .scoring import calculate_score, calculate_accuracy
 
 TEAM_NAME = "team15"
-User = get_user_model()
 
 
 def _request_user(request):
@@ -42,16 +48,7 @@ def _request_user(request):
 
     try:
         payload = decode_token(access_token)
-        if payload.get("type") != "access":
-            return None
-        user_id = payload.get("sub")
-        tv = payload.get("tv")
-        user = User.objects.filter(id=user_id, is_active=True).first()
-        if not user:
-            return None
-        if user.token_version != tv:
-            return None
-        return user
+        return resolve_principal(payload)
     except Exception:
         return None
     return None
@@ -116,17 +113,6 @@ def _relative_date(dt):
     return f"{delta_days} days ago"
 
 
-def _score_to_30(score):
-    if score is None:
-        return 0
-    return max(0, min(30, int(round(score))))
-
-
-def _pct_from_score_30(score):
-    base = _score_to_30(score)
-    return int(round((base / 30) * 100))
-
-
 def _choice_list(choices, size=4):
     values = list(choices or [])
     if len(values) < size:
@@ -231,15 +217,10 @@ def _dashboard_context(user):
     user_id = str(user.id)
     attempts_qs = TestAttempt.objects.filter(user_id=user_id).select_related("test").order_by("-started_at")
     completed_qs = attempts_qs.filter(status="completed")
-    answers_qs = Answer.objects.filter(attempt__user_id=user_id).select_related("question")
 
-    avg_score = completed_qs.aggregate(v=Avg("score"))["v"]
-    avg_time_q = answers_qs.filter(time_spent__gt=0).aggregate(v=Avg("time_spent"))["v"]
-    if not avg_time_q:
-        total_answered = answers_qs.count()
-        total_attempt_time = sum(int(item.total_time or 0) for item in completed_qs if item.total_time)
-        if total_answered > 0 and total_attempt_time > 0:
-            avg_time_q = total_attempt_time / total_answered
+    metrics = dashboard_metrics(user_id)
+    avg_score = metrics["avg_score"]
+    avg_time_q = metrics["avg_time_q"]
 
     recent_attempts = []
     for attempt in completed_qs[:3]:
@@ -284,18 +265,10 @@ def _dashboard_context(user):
             "bar_class": "bg-primary-600/20",
         })
 
-    by_type = defaultdict(lambda: {"correct": 0, "total": 0})
-    for answer in answers_qs:
-        qtype = answer.question.question_type if answer.question_id else "multiple_choice"
-        by_type[qtype]["total"] += 1
-        if answer.is_correct:
-            by_type[qtype]["correct"] += 1
-
     weakest_type = None
     weakest_accuracy = None
-    for qtype, item in by_type.items():
-        total = item["total"] or 1
-        accuracy = int(round((item["correct"] / total) * 100))
+    for qtype, (correct, total) in metrics["by_type"].items():
+        accuracy = int(round((correct / (total or 1)) * 100))
         if weakest_accuracy is None or accuracy < weakest_accuracy:
             weakest_accuracy = accuracy
             weakest_type = qtype
@@ -308,7 +281,7 @@ def _dashboard_context(user):
         "proficiency_dashoffset": max(0, 100 - _pct_from_score_30(avg_score)),
         "average_score_pct": _pct_from_score_30(avg_score),
         "avg_time_per_question": _format_time_compact(avg_time_q),
-        "questions_answered": answers_qs.count(),
+        "questions_answered": metrics["answer_count"],
         "recent_attempts": recent_attempts,
         "recent_scores": recent_scores[:5],
         "weak_skill_name": _question_type_label(weakest_type) if weakest_type else "Reading",
@@ -317,11 +290,7 @@ def _dashboard_context(user):
 
 
 def _exam_setup_context():
-    tests = list(
-        Test.objects.filter(is_active=True, mode="exam")
-        .annotate(passage_count=Count("passages"), question_count=Count("passages__questions"))
-        .order_by("id")
-    )
+    tests = list(tests_with_counts(Test.objects.filter(is_active=True, mode="exam")).order_by("id"))
     session_options = []
     for idx, test in enumerate(tests[:2]):
         session_options.append({
@@ -352,7 +321,7 @@ def _exam_setup_context():
 def _exam_reading_context(user, request):
     selected_test_id = request.GET.get("test_id")
     selected_attempt_id = request.GET.get("attempt_id")
-    tests_qs = Test.objects.filter(is_active=True, mode="exam").prefetch_related("passages__questions").order_by("id")
+    tests_qs = Test.objects.filter(is_active=True, mode="exam").order_by("id")
     if selected_test_id:
         test = tests_qs.filter(id=selected_test_id).first()
     else:
@@ -412,19 +381,15 @@ def _exam_reading_context(user, request):
 
     attempt_id = attempt.id if attempt else ""
 
-    questions = list(
-        Question.objects.filter(passage__test=test)
-        .select_related("passage")
-        .order_by("passage__order", "order", "id")
-    )
-    total_questions = len(questions)
+    layout = get_test_layout(test)
+    questions = layout.questions
+    total_questions = layout.total_questions
     q_param = request.GET.get("q", "1")
     try:
         question_number = int(q_param)
     except (TypeError, ValueError):
         question_number = 1
-    question_number = max(1, min(question_number, max(total_questions, 1)))
-    question = questions[question_number - 1] if questions else None
+    question = layout.question_at(question_number)
     passage = question.passage if question else None
 
     time_limit_seconds = max(int((test.time_limit or 0) * 60), 0)
@@ -437,12 +402,12 @@ def _exam_reading_context(user, request):
     hours, rem = divmod(remaining_seconds, 3600)
     mins, sec = divmod(rem, 60)
 
-    paragraphs = [p.strip() for p in (passage.content.splitlines() if passage else []) if p.strip()]
+    paragraphs = list(passage.paragraphs) if passage else []
     while len(paragraphs) < 3:
         paragraphs.append("")
 
     choices = _choice_list(question.choices if question else [])
-    question_number = question_number if question else 0
+    question_number = question.number if question else 0
     question_progress_pct = _safe_percentage(question_number, total_questions)
 
     answered_question_ids = set()
@@ -551,26 +516,22 @@ def _practice_context(user, request):
     if attempt is None:
         attempt = TestAttempt.objects.create(user_id=user_id, test=test)
 
-    questions = list(
-        Question.objects.filter(passage__test=test)
-        .select_related("passage")
-        .order_by("passage__order", "order", "id")
-    )
-    total_questions = len(questions)
+    layout = get_test_layout(test)
+    total_questions = layout.total_questions
     q_param = request.GET.get("q", "1")
     try:
         question_index = int(q_param)
     except (TypeError, ValueError):
         question_index = 1
     question_index = max(1, min(question_index, max(total_questions, 1)))
-    question = questions[question_index - 1] if questions else None
+    question = layout.question_at(question_index)
     passage = question.passage if question else None
     current_answer = (
-        Answer.objects.filter(attempt=attempt, question=question).select_related("question").first()
+        Answer.objects.filter(attempt=attempt, question_id=question.id).first()
         if question else None
     )
 
-    paragraphs = [p.strip() for p in (passage.content.splitlines() if passage else []) if p.strip()]
+    paragraphs = list(passage.paragraphs) if passage else []
     choices = _choice_list(question.choices if question else [])
 
     selected = current_answer.selected_answer if current_answer else ""
@@ -729,32 +690,6 @@ def _progress_context(user, request):
             return qs
         return qs.filter(started_at__gte=start_dt, started_at__lt=end_dt)
 
-    def build_metrics(attempts_qs):
-        attempts_list = list(attempts_qs)
-        attempt_ids = [item.id for item in attempts_list]
-        answers_qs = Answer.objects.filter(attempt_id__in=attempt_ids).select_related("question")
-
-        score_values = [_score_to_30(item.score) for item in attempts_list if item.score is not None]
-        avg_score_raw = (sum(score_values) / len(score_values)) if score_values else 0
-
-        answer_count = answers_qs.count()
-        correct_count = answers_qs.filter(is_correct=True).count()
-        accuracy_pct = int(round((correct_count / answer_count) * 100)) if answer_count else 0
-        avg_time_q = answers_qs.filter(time_spent__gt=0).aggregate(v=Avg("time_spent"))["v"] or 0
-        if not avg_time_q:
-            total_attempt_time = sum(int(item.total_time or 0) for item in attempts_list if item.total_time)
-            if answer_count > 0 and total_attempt_time > 0:
-                avg_time_q = total_attempt_time / answer_count
-
-        return {
-            "attempts": attempts_list,
-            "answers_qs": answers_qs,
-            "avg_score_raw": avg_score_raw,
-            "accuracy_pct": accuracy_pct,
-            "avg_time_q": float(avg_time_q or 0),
-            "sessions_count": len(attempts_list),
-        }
-
     def delta_class(value, positive_good=True):
         amount = float(value or 0)
         if amount > 0:
@@ -775,9 +710,9 @@ def _progress_context(user, request):
 
         trend_labels = [f"Week {idx}" for idx in range(1, 5)]
         trend_bucket_count = 4
-        trend_values = [0] * trend_bucket_count
-        trend_scores = [[] for _ in range(trend_bucket_count)]
         bucket_seconds = max((current_end - current_start).total_seconds() / trend_bucket_count, 1)
+        trend_edges = [current_start + timedelta(seconds=bucket_seconds * idx) for idx in range(trend_bucket_count)]
+        trend_edges.append(current_end)
     elif selected_range == "6m":
         current_start = _shift_months_preserving_day(now, -6)
         current_end = now
@@ -788,10 +723,7 @@ def _progress_context(user, request):
         current_month_start = _month_start(current_start)
         trend_month_starts = [_add_months(current_month_start, idx) for idx in range(6)]
         trend_labels = [item.strftime("%b") for item in trend_month_starts]
-        trend_bucket_count = 6
-        trend_values = [0] * trend_bucket_count
-        trend_scores = [[] for _ in range(trend_bucket_count)]
-        bucket_seconds = None
+        trend_edges = trend_month_starts + [_add_months(current_month_start, 6)]
     else:
         current_start = None
         current_end = None
@@ -809,16 +741,13 @@ def _progress_context(user, request):
         trend_start_month = _add_months(current_month, -(trend_bucket_count - 1))
         trend_month_starts = [_add_months(trend_start_month, idx) for idx in range(trend_bucket_count)]
         trend_labels = [item.strftime("%b") for item in trend_month_starts]
-        trend_values = [0] * trend_bucket_count
-        trend_scores = [[] for _ in range(trend_bucket_count)]
-        bucket_seconds = None
+        trend_edges = trend_month_starts + [_add_months(trend_start_month, trend_bucket_count)]
 
     current_attempts_qs = filter_attempts_in_window(attempts_all_qs, current_start, current_end)
-    current_metrics = build_metrics(current_attempts_qs)
+    current_metrics = window_metrics(user_id, current_start, current_end)
 
     if previous_start is not None and previous_end is not None:
-        previous_attempts_qs = filter_attempts_in_window(attempts_all_qs, previous_start, previous_end)
-        previous_metrics = build_metrics(previous_attempts_qs)
+        previous_metrics = window_metrics(user_id, previous_start, previous_end)
     else:
         previous_metrics = {
             "avg_score_raw": current_metrics["avg_score_raw"],
@@ -827,46 +756,14 @@ def _progress_context(user, request):
             "sessions_count": current_metrics["sessions_count"],
         }
 
-    current_attempts = current_metrics["attempts"]
-    if selected_range == "30d":
-        for attempt in current_attempts:
-            if attempt.score is None:
-                continue
-            offset_seconds = (attempt.started_at - current_start).total_seconds()
-            bucket_index = int(offset_seconds // bucket_seconds) if bucket_seconds else 0
-            bucket_index = max(0, min(bucket_index, trend_bucket_count - 1))
-            trend_scores[bucket_index].append(_pct_from_score_30(attempt.score))
-    elif selected_range == "6m":
-        trend_start = _month_start(current_start)
-        for attempt in current_attempts:
-            if attempt.score is None:
-                continue
-            local_started = timezone.localtime(attempt.started_at)
-            bucket_index = (local_started.year - trend_start.year) * 12 + (local_started.month - trend_start.month)
-            if 0 <= bucket_index < trend_bucket_count:
-                trend_scores[bucket_index].append(_pct_from_score_30(attempt.score))
-    else:
-        trend_start = _add_months(_month_start(now), -(trend_bucket_count - 1))
-        for attempt in current_attempts:
-            if attempt.score is None:
-                continue
-            local_started = timezone.localtime(attempt.started_at)
-            bucket_index = (local_started.year - trend_start.year) * 12 + (local_started.month - trend_start.month)
-            if 0 <= bucket_index < trend_bucket_count:
-                trend_scores[bucket_index].append(_pct_from_score_30(attempt.score))
-
-    for idx, bucket in enumerate(trend_scores):
-        if bucket:
-            trend_values[idx] = int(round(sum(bucket) / len(bucket)))
-
+    trend_values = score_trend(user_id, trend_edges, attempts=current_attempts_qs.order_by())
     area_path, line_path = _build_trend_paths(trend_values)
 
     type_stats = defaultdict(lambda: {"correct": 0, "total": 0})
-    for ans in current_metrics["answers_qs"]:
-        qtype = _question_type_label(ans.question.question_type if ans.question_id else "")
-        type_stats[qtype]["total"] += 1
-        if ans.is_correct:
-            type_stats[qtype]["correct"] += 1
+    for qtype, (correct, total) in current_metrics["by_type"].items():
+        label = _question_type_label(qtype)
+        type_stats[label]["correct"] += correct
+        type_stats[label]["total"] += total
 
     by_type = []
     palette = ["bg-primary", "bg-primary-600", "bg-warning", "bg-accent-orange"]
@@ -877,7 +774,7 @@ def _progress_context(user, request):
     by_type = by_type[:4]
 
     history_rows = []
-    for item in current_attempts[:8]:
+    for item in current_attempts_qs[:8]:
         history_rows.append({
             "date": timezone.localtime(item.started_at).strftime("%b %d, %Y"),
             "mode": item.test.mode.title(),
@@ -1045,12 +942,8 @@ def ping(request):
 @permission_classes([])
 @_api_login_required
 def test_list(request):
-    qs = Test.objects.filter(is_active=True)
     mode = request.query_params.get("mode")
-    if mode in ("exam", "practice"):
-        qs = qs.filter(mode=mode)
-    serializer = TestListSerializer(qs, many=True)
-    return Response(serializer.data)
+    return Response(get_test_catalog(mode if mode in ("exam", "practice") else None))
 
 
 @api_view(["GET"])
@@ -1171,56 +1064,20 @@ def submit_exam(request):
     user_id = _get_user_id(request)
 
     try:
-        attempt = TestAttempt.objects.get(id=attempt_id, user_id=user_id, status="in_progress")
+        attempt = TestAttempt.objects.select_related("test").get(id=attempt_id, user_id=user_id, status="in_progress")
     except TestAttempt.DoesNotExist:
         return Response({"detail": "Attempt not found or already completed."},
                         status=status.HTTP_404_NOT_FOUND)
 
-    test_question_ids = set(
-        Question.objects.filter(passage__test=attempt.test).values_list("id", flat=True)
-    )
-
-    correct_count = 0
-    total_questions = len(test_question_ids)
-
-    for ans in answers_data:
-        qid = ans["question_id"]
-        if qid not in test_question_ids:
-            continue
-
-        try:
-            question = Question.objects.get(id=qid)
-        except Question.DoesNotExist:
-            continue
-
-        selected_answer = str(ans.get("selected_answer") or "").strip()
-        is_correct = selected_answer == question.correct_answer.strip()
-        if is_correct:
-            correct_count += 1
-
-        incoming_time = ans.get("time_spent")
-        normalized_time = max(1, int(incoming_time)) if incoming_time is not None else None
-
-        Answer.objects.update_or_create(
-            attempt=attempt,
-            question=question,
-            defaults={
-                "selected_answer": selected_answer,
-                "is_correct": is_correct,
-                "time_spent": normalized_time,
-            },
-        )
+    # Answer key from the cached layout, one bulk upsert, one transaction
+    result = submit_exam_answers(attempt, answers_data)
+    if result is None:
+        return Response({"detail": "Attempt not found or already completed."},
+                        status=status.HTTP_404_NOT_FOUND)
 
-    score = calculate_score(correct_count, total_questions)
+    correct_count, total_questions, score = result
     accuracy = calculate_accuracy(correct_count, total_questions)
 
-    now = timezone.now()
-    attempt.status = "completed"
-    attempt.score = score
-    attempt.total_time = int((now - attempt.started_at).total_seconds())
-    attempt.finished_at = now
-    attempt.save()
-
     return Response({
         "attempt_id": attempt.id,
         "score": score,
@@ -1244,25 +1101,18 @@ def finish_practice(request):
     user_id = _get_user_id(request)
 
     try:
-        attempt = TestAttempt.objects.get(id=attempt_id, user_id=user_id, status="in_progress")
+        attempt = TestAttempt.objects.select_related("test").get(id=attempt_id, user_id=user_id, status="in_progress")
     except TestAttempt.DoesNotExist:
         return Response({"detail": "Attempt not found or already completed."},
                         status=status.HTTP_404_NOT_FOUND)
 
-    answers = attempt.answers.all()
-    correct_count = answers.filter(is_correct=True).count()
-    total_questions = Question.objects.filter(passage__test=attempt.test).count()
-
-    score = calculate_score(correct_count, total_questions)
+    finished = finish_practice_attempt(attempt)
+    if finished is None:
+        return Response({"detail": "Attempt not found or already completed."},
+                        status=status.HTTP_404_NOT_FOUND)
+    correct_count, total_questions, score = finished
     accuracy = calculate_accuracy(correct_count, total_questions)
 
-    now = timezone.now()
-    attempt.status = "completed"
-    attempt.score = score
-    attempt.total_time = int((now - attempt.started_at).total_seconds())
-    attempt.finished_at = now
-    attempt.save()
-
     return Response({
         "attempt_id": attempt.id,
         "score": score,
@@ -1290,9 +1140,9 @@ def attempt_result(request, attempt_id):
     serializer = AttemptResultSerializer(attempt)
     data = serializer.data
 
-    answers = attempt.answers.all()
-    correct_count = answers.filter(is_correct=True).count()
-    total_questions = Question.objects.filter(passage__test=attempt.test).count()
+    # Answers are already prefetched for the serializer.
+    correct_count = sum(1 for answer in attempt.answers.all() if answer.is_correct)
+    total_questions = get_test_layout(attempt.test).total_questions
     data["accuracy"] = calculate_accuracy(correct_count, total_questions)
     data["correct"] = correct_count
     data["total"] = total_questions
@@ -0,0 +1,193 @@
+"""Incrementally maintained per-user score analytics (UC-03).
+
+`record_evaluation` folds a newly saved evaluation into the user's
+UserAnalytics rows (scopes 'all' and its task type) in O(1): running count,
+sum, min/max, first/last score, a tenths histogram for the exact median and
+a window of the latest RECENT_WINDOW scores for the moving average.
+AnalyticsService.get_user_analytics reads these rows instead of scanning the
+user's history.
+
+`recompute_user_analytics` rebuilds the rows from the evaluations with
+vectorized NumPy reductions. It is used for backfills, bulk imports, rows
+that are missing, and evaluations that arrive out of order.
+"""
+import logging
+import uuid
+
+from django.db import transaction
+
+from .models import Evaluation, UserAnalytics
+
+logger = logging.getLogger(__name__)
+
+DB_ALIAS = 'team7'
+RECENT_WINDOW = 50
+
+
+def to_tenths(score):
+    return int(round(float(score) * 10))
+
+
+def _scopes(task_type):
+    return (UserAnalytics.SCOPE_ALL, task_type)
+
+
+def _apply(state, tenths, created_at):
+    state.count += 1
+    state.score_sum += tenths
+    state.min_score = tenths if state.min_score is None else min(state.min_score, tenths)
+    state.max_score = tenths if state.max_score is None else max(state.max_score, tenths)
+    if state.first_score is None:
+        state.first_score = tenths
+    state.last_score = tenths
+    key = str(tenths)
+    state.histogram[key] = state.histogram.get(key, 0) + 1
+    state.recent_scores = (state.recent_scores + [tenths])[-RECENT_WINDOW:]
+    state.last_evaluated_at = created_at
+
+
+def record_evaluation(evaluation):
+    """Add one saved evaluation to its user's analytics."""
+    # Unscored evaluations are ignored, as in the analytics response.
+    if not evaluation.overall_score:
+        return
+    tenths = to_tenths(evaluation.overall_score)
+    try:
+        with transaction.atomic(using=DB_ALIAS):
+            states = {
+                state.scope: state
+                for state in UserAnalytics.objects.using(DB_ALIAS).select_for_update().filter(
+                    user_id=evaluation.user_id, scope__in=_scopes(evaluation.task_type)
+                )
+            }
+            if UserAnalytics.SCOPE_ALL not in states:
+                # No state yet for an existing user: build it from the history instead.
+                if Evaluation.objects.using(DB_ALIAS).filter(user_id=evaluation.user_id).exclude(
+                        evaluation_id=evaluation.evaluation_id).exists():
+                    recompute_user_analytics([evaluation.user_id])
+                    return
+            last_seen = states.get(UserAnalytics.SCOPE_ALL)
+            if last_seen is not None and last_seen.last_evaluated_at and evaluation.created_at < last_seen.last_evaluated_at:
+                # Older than what we have seen: first/last and the window need the full order.
+                recompute_user_analytics([evaluation.user_id])
+                return
+
+            for scope in _scopes(evaluation.task_type):
+                state = states.get(scope) or UserAnalytics(user_id=evaluation.user_id, scope=scope)
+                _apply(state, tenths, evaluation.created_at)
+                state.save(using=DB_ALIAS)
+    except Exception as e:
+        # Never fail the evaluation itself; drop the state so the next read rebuilds it.
+        logger.exception(f"Failed to update analytics for user {evaluation.user_id}: {str(e)}")
+        UserAnalytics.objects.using(DB_ALIAS).filter(user_id=evaluation.user_id).delete()
+
+
+def get_user_states(user_id):
+    """{scope: UserAnalytics} for a user, rebuilt from history if missing."""
+    states = {s.scope: s for s in UserAnalytics.objects.using(DB_ALIAS).filter(user_id=user_id)}
+    if UserAnalytics.SCOPE_ALL not in states:
+        recompute_user_analytics([user_id])
+        states = {s.scope: s for s in UserAnalytics.objects.using(DB_ALIAS).filter(user_id=user_id)}
+    return states
+
+
+def median_tenths(state):
+    """Exact median from the histogram, in tenths (may be a .5 for even counts)."""
+    if not state.count:
+        return None
+    lower_rank, upper_rank = (state.count - 1) // 2, state.count // 2
+    lower = upper = None
+    seen = 0
+    for tenths in sorted(int(key) for key in state.histogram):
+        seen += state.histogram[str(tenths)]
+        if lower is None and seen > lower_rank:
+            lower = tenths
+        if seen > upper_rank:
+            upper = tenths
+            break
+    return (lower + upper) / 2
+
+
+# ---------------------------------------------------------------------------
+# Batch recompute (NumPy)
+# ---------------------------------------------------------------------------
+
+def _group_states(np, user_ids, codes, scores, timestamps, scope):
+    """UserAnalytics rows for one scope; rows are sorted by (user, created_at)."""
+    if not len(codes):
+        return []
+    users, starts, counts = np.unique(codes, return_index=True, return_counts=True)
+    ends = starts + counts
+    sums = np.add.reduceat(scores, starts)
+    mins = np.minimum.reduceat(scores, starts)
+    maxs = np.maximum.reduceat(scores, starts)
+
+    # Histogram of every user at once: count (user, score) pairs.
+    pairs, pair_counts = np.unique(np.stack([codes, scores], axis=1), axis=0, return_counts=True)
+    pair_bounds = np.searchsorted(pairs[:, 0], users, side='right')
+
+    states = []
+    pair_start = 0
+    for i, user in enumerate(users):
+        start, end = starts[i], ends[i]
+        pair_end = pair_bounds[i]
+        states.append(UserAnalytics(
+            user_id=user_ids[user],
+            scope=scope,
+            count=int(counts[i]),
+            score_sum=int(sums[i]),
+            min_score=int(mins[i]),
+            max_score=int(maxs[i]),
+            first_score=int(scores[start]),
+            last_score=int(scores[end - 1]),
+            histogram={str(int(s)): int(c) for s, c in zip(pairs[pair_start:pair_end, 1], pair_counts[pair_start:pair_end])},
+            recent_scores=[int(s) for s in scores[max(start, end - RECENT_WINDOW):end]],
+            last_evaluated_at=timestamps[end - 1],
+        ))
+        pair_start = pair_end
+    return states
+
+
+def recompute_user_analytics(user_ids=None, batch_size=500):
+    """Rebuild UserAnalytics from Evaluation rows; all users when user_ids is None.
+
+    Returns the number of users processed.
+    """
+    import numpy as np
+
+    evaluations = Evaluation.objects.using(DB_ALIAS)
+    if user_ids is None:
+        user_ids = evaluations.order_by().values_list('user_id', flat=True).distinct()
+    user_ids = list(dict.fromkeys(uuid.UUID(str(user_id)) for user_id in user_ids))
+
+    for offset in range(0, len(user_ids), batch_size):
+        batch = user_ids[offset:offset + batch_size]
+        rows = list(
+            evaluations.filter(user_id__in=batch)
+            .exclude(overall_score__isnull=True).exclude(overall_score=0)
+            .order_by('created_at')
+            .values_list('user_id', 'task_type', 'overall_score', 'created_at')
+        )
+        index = {user_id: code for code, user_id in enumerate(batch)}
+        codes = np.fromiter((index[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+        # Group by user, keeping each user's rows in time order.
+        order = np.argsort(codes, kind='stable')
+        rows = [rows[i] for i in order]
+        codes = codes[order]
+        task_types = np.array([r[1] for r in rows], dtype=object)
+        scores = np.rint(np.array([float(r[2]) for r in rows], dtype=np.float64) * 10).astype(np.int64)
+        timestamps = [r[3] for r in rows]
+
+        states = _group_states(np, batch, codes, scores, timestamps, UserAnalytics.SCOPE_ALL)
+        for task_type in np.unique(task_types) if len(rows) else []:
+            mask = task_types == task_type
+            positions = np.flatnonzero(mask)
+            states += _group_states(np, batch, codes[mask], scores[mask], [timestamps[p] for p in positions], task_type)
+        # Users without scored evaluations still get an (empty) 'all' row, so reads don't rebuild it again.
+        scored = {state.user_id for state in states}
+        states += [UserAnalytics(user_id=user_id, scope=UserAnalytics.SCOPE_ALL) for user_id in batch if user_id not in scored]
+
+        with transaction.atomic(using=DB_ALIAS):
+            UserAnalytics.objects.using(DB_ALIAS).filter(user_id__in=batch).delete()
+            UserAnalytics.objects.using(DB_ALIAS).bulk_create(states)
+    return len(user_ids)
@@ -0,0 +1,257 @@
+"""Buffered APILog pipeline used by team7.middleware.APILoggingMiddleware.
+
+Requests only append a small record to an in-memory ring buffer; a
+background thread writes the records with bulk_create every
+TEAM7_API_LOG_BATCH_SIZE records or TEAM7_API_LOG_FLUSH_MS milliseconds.
+When the buffer (TEAM7_API_LOG_BUFFER_SIZE) is full, new records are
+dropped and counted instead of slowing the request down. Error messages are
+extracted from the response bodies on the flusher thread.
+
+`compact_api_logs` folds old rows into APILogRollup per-minute histograms
+(see `manage.py compact_api_logs`).
+"""
+import atexit
+import json
+import logging
+import threading
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncMinute
+
+from .models import APILog, APILogRollup
+
+logger = logging.getLogger(__name__)
+
+# Error bodies larger than this are not parsed for a message.
+MAX_ERROR_BODY = 4096
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def error_message_from(record):
+    if record.get('error_message') is not None:
+        return record['error_message']
+    body = record.get('error_body')
+    if body is None:
+        return None
+    try:
+        error_data = json.loads(body)
+        return error_data.get('message', error_data.get('error', ''))
+    except Exception:
+        return f"HTTP {record['status_code']}"
+
+
+class APILogBuffer:
+    def __init__(self, capacity=10000, batch_size=200, flush_interval=1.0):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._records = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def append(self, record):
+        """Queue one record. Returns False when it was dropped because the buffer is full."""
+        with self._cond:
+            if len(self._records) >= self.capacity:
+                self.dropped += 1
+                self._cond.notify()
+                return False
+            self._records.append(record)
+            if len(self._records) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_started()
+        return True
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="team7-apilog-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._records) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"API log flusher error: {str(e)}")
+            close_old_connections()
+
+    def flush(self):
+        """Write everything buffered so far. Returns the number of rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    batch = [self._records.popleft() for _ in range(min(self.batch_size, len(self._records)))]
+                if not batch:
+                    return written
+                try:
+                    APILog.objects.using('team7').bulk_create([
+                        APILog(
+                            user_id=record.get('user_id'),
+                            endpoint=record['endpoint'],
+                            method=record['method'],
+                            status_code=record['status_code'],
+                            latency_ms=record['latency_ms'],
+                            timestamp=record['timestamp'],
+                            error_message=error_message_from(record),
+                            request_size=record.get('request_size'),
+                            response_size=record.get('response_size'),
+                        )
+                        for record in batch
+                    ])
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.error(f"Failed to write {len(batch)} API log records: {str(e)}")
+                    return written
+                self.written += len(batch)
+                self.flushes += 1
+                written += len(batch)
+
+    def stats(self):
+        with self._cond:
+            queued = len(self._records)
+        return {
+            "queued": queued,
+            "capacity": self.capacity,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_api_log_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = APILogBuffer(
+                    capacity=_setting('TEAM7_API_LOG_BUFFER_SIZE', 10000),
+                    batch_size=_setting('TEAM7_API_LOG_BATCH_SIZE', 200),
+                    flush_interval=_setting('TEAM7_API_LOG_FLUSH_MS', 1000) / 1000,
+                )
+                # Write what is left when the process exits normally.
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+# ---------------------------------------------------------------------------
+# Retention / rollup
+# ---------------------------------------------------------------------------
+
+def _bucket_counts():
+    bounds = APILogRollup.LATENCY_BUCKETS_MS
+    counts = {}
+    lower = None
+    for index, upper in enumerate(bounds + (None,)):
+        condition = Q()
+        if lower is not None:
+            condition &= Q(latency_ms__gt=lower)
+        if upper is not None:
+            condition &= Q(latency_ms__lte=upper)
+        counts[f'bucket_{index}'] = Count('log_id', filter=condition)
+        lower = upper
+    return counts
+
+
+def _merge(rollup, row, histogram):
+    rollup.request_count += row['request_count']
+    rollup.error_count += row['error_count']
+    rollup.latency_sum_ms += row['latency_sum_ms'] or 0
+    rollup.latency_min_ms = min(v for v in (rollup.latency_min_ms, row['latency_min_ms']) if v is not None)
+    rollup.latency_max_ms = max(v for v in (rollup.latency_max_ms, row['latency_max_ms']) if v is not None)
+    previous = rollup.histogram or [0] * len(histogram)
+    rollup.histogram = [a + b for a, b in zip(previous, histogram)]
+
+
+def compact_api_logs(before, window=timedelta(hours=1)):
+    """Replace APILog rows older than `before` by APILogRollup rows.
+
+    Works through one `window` of time per transaction. Rollups that already
+    exist for a minute (e.g. late rows) are merged into.
+    Returns (log_rows_removed, rollup_rows_written).
+    """
+    before = before.replace(second=0, microsecond=0)
+    logs = APILog.objects.using('team7')
+    rollups = APILogRollup.objects.using('team7')
+    bucket_count = len(APILogRollup.LATENCY_BUCKETS_MS) + 1
+    removed = written = 0
+
+    start = logs.filter(timestamp__lt=before).order_by('timestamp').values_list('timestamp', flat=True).first()
+    while start is not None:
+        start = start.replace(second=0, microsecond=0)
+        end = min(start + window, before)
+        with transaction.atomic(using='team7'):
+            window_logs = logs.filter(timestamp__gte=start, timestamp__lt=end)
+            rows = (
+                window_logs.order_by()
+                .values('endpoint', 'method', minute=TruncMinute('timestamp'))
+                .annotate(
+                    request_count=Count('log_id'),
+                    error_count=Count('log_id', filter=Q(status_code__gte=400)),
+                    latency_sum_ms=Sum('latency_ms'),
+                    latency_min_ms=Min('latency_ms'),
+                    latency_max_ms=Max('latency_ms'),
+                    **_bucket_counts(),
+                )
+            )
+            existing = {
+                (r.endpoint, r.method, r.minute): r
+                for r in rollups.filter(minute__gte=start, minute__lt=end)
+            }
+            created, updated = [], []
+            for row in rows:
+                histogram = [row[f'bucket_{i}'] for i in range(bucket_count)]
+                rollup = existing.get((row['endpoint'], row['method'], row['minute']))
+                if rollup is None:
+                    created.append(APILogRollup(
+                        endpoint=row['endpoint'],
+                        method=row['method'],
+                        minute=row['minute'],
+                        request_count=row['request_count'],
+                        error_count=row['error_count'],
+                        latency_sum_ms=row['latency_sum_ms'] or 0,
+                        latency_min_ms=row['latency_min_ms'],
+                        latency_max_ms=row['latency_max_ms'],
+                        histogram=histogram,
+                    ))
+                else:
+                    _merge(rollup, row, histogram)
+                    updated.append(rollup)
+            rollups.bulk_create(created)
+            if updated:
+                rollups.bulk_update(updated, [
+                    'request_count', 'error_count', 'latency_sum_ms', 'latency_min_ms', 'latency_max_ms', 'histogram',
+                ])
+            removed += window_logs.delete()[0]
+            written += len(created) + len(updated)
+
+        # Skip empty stretches instead of walking them window by window.
+        start = (
+            logs.filter(timestamp__gte=end, timestamp__lt=before)
+            .order_by('timestamp').values_list('timestamp', flat=True).first()
+        )
+    return removed, written
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class Team7Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'team7'
+
+    def ready(self):
+        import team7.signals
@@ -0,0 +1,332 @@
+"""Soniox async transcription client (ASR) shared by the whole process.
+
+- One keep-alive `requests.Session` (connection pool sized by
+  SONIOX_POOL_SIZE) instead of a new session per transcription.
+- Uploads are streamed from the file object in chunks, never read whole.
+- Completion is awaited with exponential polling (SONIOX_POLL_INITIAL ->
+  SONIOX_POLL_MAX seconds, x1.3 per round). With SONIOX_WEBHOOK_URL set, Soniox calls the
+  `soniox_webhook` view, which wakes the waiting thread at once; polling
+  continues at the slow end as a safety net.
+- Deleting the transcription and the uploaded file happens on a background
+  reaper thread, off the request path.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from . import config as team7_config
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.flac': 'audio/flac',
+    '.m4a': 'audio/mp4',
+    '.mp4': 'audio/mp4',
+    '.ogg': 'audio/ogg',
+    '.webm': 'audio/webm',
+    '.aac': 'audio/aac',
+    '.aiff': 'audio/aiff',
+    '.amr': 'audio/amr',
+    '.asf': 'audio/x-ms-asf',
+}
+UPLOAD_CHUNK_SIZE = 64 * 1024
+_WEBHOOK_CACHE_KEY = "team7:soniox:done:{}"
+WEBHOOK_AUTH_HEADER = "X-Soniox-Webhook-Secret"
+
+
+class MultipartFileStream:
+    """multipart/form-data body for one file, produced chunk by chunk.
+
+    Has a length, so requests sends a Content-Length instead of chunked
+    transfer encoding, and the file is read in UPLOAD_CHUNK_SIZE pieces.
+    """
+
+    def __init__(self, fileobj, filename, content_type, field="file"):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._file = fileobj
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{os.path.basename(filename)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._file_size = self._size(fileobj)
+        self._buffer = b""
+        self._chunks = self._iter_chunks()
+
+    @staticmethod
+    def _size(fileobj):
+        size = getattr(fileobj, "size", None)
+        if size is None:
+            pos = fileobj.tell()
+            fileobj.seek(0, os.SEEK_END)
+            size = fileobj.tell() - pos
+            fileobj.seek(pos)
+        return size
+
+    def __len__(self):
+        return len(self._head) + self._file_size + len(self._tail)
+
+    def _iter_chunks(self):
+        yield self._head
+        while True:
+            chunk = self._file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        yield self._tail
+
+    def __iter__(self):
+        return self._chunks
+
+    def read(self, size=-1):
+        # http.client reads file-like bodies block by block.
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class CleanupReaper:
+    """Background thread that deletes finished Soniox resources, with a few retries."""
+
+    def __init__(self, session_factory, base_url, max_retries=3):
+        self._session_factory = session_factory
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.deleted = 0
+        self.failed = 0
+
+    def schedule(self, transcription_id=None, file_id=None):
+        # The transcription goes first: Soniox refuses to delete a file still in use.
+        if transcription_id:
+            self._put(f"/v1/transcriptions/{transcription_id}")
+        if file_id:
+            self._put(f"/v1/files/{file_id}")
+
+    def _put(self, path, attempt=0):
+        self._ensure_started()
+        self._queue.put((path, attempt))
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="soniox-reaper", daemon=True)
+                self._thread.start()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def join(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            path, attempt = self._queue.get()
+            try:
+                response = self._session_factory().delete(f"{self.base_url}{path}", timeout=10)
+                if response.status_code >= 500:
+                    raise requests.HTTPError(f"{response.status_code} on DELETE {path}")
+                self.deleted += 1
+            except requests.RequestException as e:
+                if attempt + 1 < self.max_retries:
+                    threading.Timer(2 ** attempt, self._queue.put, args=((path, attempt + 1),)).start()
+                else:
+                    self.failed += 1
+                    logger.warning(f"Soniox cleanup gave up on {path}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+
+class SonioxClient:
+    def __init__(self, api_key, base_url, model, pool_size=10, poll_initial=0.5, poll_max=2.0,
+                 webhook_url=None, webhook_secret=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {api_key}'
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.reaper = CleanupReaper(lambda: self.session, self.base_url)
+        self._waiters = {}
+        self._waiters_lock = threading.Lock()
+
+    # -- webhook completion -------------------------------------------------
+
+    def notify_completed(self, transcription_id):
+        """Called by the webhook view; wakes a waiter in this process, others see the cache flag."""
+        cache.set(_WEBHOOK_CACHE_KEY.format(transcription_id), True, 600)
+        with self._waiters_lock:
+            event = self._waiters.get(transcription_id)
+        if event is not None:
+            event.set()
+
+    def _wait(self, transcription_id, delay):
+        with self._waiters_lock:
+            event = self._waiters.get(transcription_id)
+        if event is None or not self.webhook_url:
+            time.sleep(delay)
+            return
+        # Wake early when the webhook arrives, here (event) or in another worker (cache flag).
+        key = _WEBHOOK_CACHE_KEY.format(transcription_id)
+        end = time.monotonic() + delay
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0 or event.wait(min(remaining, 0.25)) or cache.get(key):
+                break
+        event.clear()
+
+    # -- transcription ------------------------------------------------------
+
+    def _upload(self, audio_file, filename):
+        ext = os.path.splitext(filename)[1].lower()
+        body = MultipartFileStream(audio_file, filename, MIME_TYPES.get(ext, 'audio/mpeg'))
+        response = self.session.post(
+            f"{self.base_url}/v1/files", data=body, headers={"Content-Type": body.content_type}, timeout=60
+        )
+        if not response.ok:
+            logger.error(f"Soniox file upload failed: {response.status_code} {response.text}")
+        response.raise_for_status()
+        return response.json()['id']
+
+    def _create(self, file_id):
+        config = {
+            "model": self.model,
+            "file_id": file_id,
+            "language_hints": ["en"],  # TOEFL is English-only
+            "enable_language_identification": False,
+            "enable_speaker_diarization": False,
+        }
+        if self.webhook_url:
+            config["webhook_url"] = self.webhook_url
+            if self.webhook_secret:
+                config["webhook_auth_header_name"] = WEBHOOK_AUTH_HEADER
+                config["webhook_auth_header_value"] = self.webhook_secret
+        response = self.session.post(f"{self.base_url}/v1/transcriptions", json=config, timeout=30)
+        if not response.ok:
+            logger.error(f"Soniox transcription creation failed: {response.status_code} {response.text}")
+        response.raise_for_status()
+        return response.json()['id']
+
+    def _await_completion(self, transcription_id, timeout):
+        deadline = time.monotonic() + timeout
+        # With a webhook we mostly wait for the callback and poll only as a fallback.
+        delay = self.poll_max if self.webhook_url else self.poll_initial
+        while True:
+            response = self.session.get(f"{self.base_url}/v1/transcriptions/{transcription_id}", timeout=30)
+            response.raise_for_status()
+            data = response.json()
+            if data['status'] == 'completed':
+                return True
+            if data['status'] == 'error':
+                logger.error(f"Soniox ASR error: {data.get('error_message', 'Unknown error')}")
+                return False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"Soniox ASR timeout after {timeout}s")
+                return False
+            self._wait(transcription_id, min(delay, remaining))
+            delay = min(delay * 1.3, self.poll_max)
+
+    def transcribe(self, audio_file, timeout=120):
+        """Transcribe an open audio file. Returns {'transcript', 'language', 'token_count'} or None."""
+        filename = getattr(audio_file, 'name', None) or 'audio.mp3'
+        file_id = transcription_id = None
+        event = threading.Event()
+        try:
+            audio_file.seek(0)
+            file_id = self._upload(audio_file, filename)
+            transcription_id = self._create(file_id)
+            with self._waiters_lock:
+                self._waiters[transcription_id] = event
+
+            if not self._await_completion(transcription_id, timeout):
+                return None
+
+            response = self.session.get(
+                f"{self.base_url}/v1/transcriptions/{transcription_id}/transcript", timeout=30
+            )
+            response.raise_for_status()
+            tokens = response.json().get('tokens', [])
+            if not tokens:
+                logger.error("Soniox returned empty token list")
+                return None
+
+            transcript_text = ''.join(token['text'] for token in tokens).strip()
+            # Check if speech was detected (FR-SP validation)
+            if len(transcript_text) < 10:
+                logger.warning(f"Soniox ASR: Transcript too short. Length: {len(transcript_text)} chars")
+                return None
+
+            return {'transcript': transcript_text, 'language': 'en', 'token_count': len(tokens)}
+
+        except requests.exceptions.Timeout:
+            logger.error("Soniox API timeout")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Soniox API request error: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Soniox ASR transcription error: {str(e)}")
+            return None
+        finally:
+            if transcription_id:
+                with self._waiters_lock:
+                    self._waiters.pop(transcription_id, None)
+            self.reaper.schedule(transcription_id=transcription_id, file_id=file_id)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _setting(name):
+    # Django settings win; team7/config.py holds the team defaults.
+    return getattr(settings, name, getattr(team7_config, name))
+
+
+def get_soniox_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SonioxClient(
+                    api_key=_setting('SONIOX_API_KEY'),
+                    base_url=_setting('SONIOX_API_BASE_URL'),
+                    model=_setting('SONIOX_MODEL'),
+                    pool_size=_setting('SONIOX_POOL_SIZE'),
+                    poll_initial=_setting('SONIOX_POLL_INITIAL'),
+                    poll_max=_setting('SONIOX_POLL_MAX'),
+                    webhook_url=_setting('SONIOX_WEBHOOK_URL') or None,
+                    webhook_secret=_setting('SONIOX_WEBHOOK_SECRET') or None,
+                )
+    return _client
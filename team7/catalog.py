@@ -0,0 +1,152 @@
+"""Versioned, pre-serialized exam catalog served by the list_exams view.
+
+The catalog (exams with their questions) is built in two queries and stored
+as ready JSON bytes plus an ETag for every filter list_exams accepts: all
+exams, each exam_type and each exam_id. The payloads are cached under a
+version key; saving or deleting an Exam or Question (team7.signals) or
+running seed_questions moves to a new version, the same scheme as the team1
+dashboard snapshots. Each process also keeps the current payloads in
+memory, so a request is one cache lookup for the version.
+
+Payloads expire after TEAM7_EXAM_CATALOG_TTL seconds, which bounds
+staleness when the cache backend is not shared between processes.
+"""
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Exam, TaskType
+
+_VERSION_KEY = "team7:exam_catalog:version"
+_local = threading.local()
+_memo = None  # (version, payloads, expires_at)
+
+
+def _catalog_key(version):
+    return f"team7:exam_catalog:{version}"
+
+
+def _ttl():
+    return getattr(settings, 'TEAM7_EXAM_CATALOG_TTL', 600)
+
+
+def _new_version():
+    global _memo
+    cache.set(_VERSION_KEY, time.time_ns(), None)
+    _memo = None
+
+
+def invalidate_exam_catalog():
+    """Make every cached catalog payload unreachable (also in other workers sharing the cache).
+
+    The version moves once the writing transaction commits: moved earlier, a
+    concurrent request could rebuild from the old rows and cache them under
+    the new version.
+    """
+    if getattr(_local, 'depth', 0):
+        _local.dirty = True
+        return
+    transaction.on_commit(_new_version, using='team7')
+
+
+@contextmanager
+def catalog_changes():
+    """Group many Exam/Question writes (seed commands) into one invalidation at the end."""
+    _local.depth = getattr(_local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+        if not _local.depth and getattr(_local, 'dirty', False):
+            _local.dirty = False
+            invalidate_exam_catalog()
+
+
+def _current_version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(_VERSION_KEY)
+    return version
+
+
+def _exam_data(exam):
+    # Determine badge and instruction based on exam type
+    if exam.exam_type == TaskType.WRITING:
+        badge = 'TOEFL Writing Exam'
+        instruction = 'Instructions: Read the topic carefully and write your response in a logical and clear manner.'
+    else:  # SPEAKING
+        badge = 'TOEFL Speaking Exam'
+        instruction = 'Instructions: Read the topic carefully and speak about it with clarity and fluency.'
+
+    return {
+        "id": str(exam.exam_id),
+        "title": exam.title,
+        "type": exam.exam_type,
+        "totalQuestions": exam.total_questions,
+        "totalTime": exam.total_time,
+        "difficulty": exam.difficulty,
+        "questions": [
+            {
+                "id": str(question.question_id),
+                "title": question.title or f"Question {question.question_id}",
+                "badge": badge,
+                "instruction": instruction,
+                "content": question.prompt_text,
+                "requirements": question.requirements if question.requirements else [],
+                "tips": question.tips if question.tips else [],
+                "preparationTime": 45,
+                "speakingTime": 120 if exam.exam_type == 'speaking' else None,
+                "task_type": question.task_type,
+                "mode": question.mode,
+                "resource_url": question.resource_url
+            }
+            for question in exam.questions.all()
+        ]
+    }
+
+
+def _payload(exams):
+    body = json.dumps({"exams": exams}, cls=DjangoJSONEncoder).encode()
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def build_exam_catalog():
+    """{(exam_type, exam_id): (json_bytes, etag)}; '' stands for "no filter"."""
+    exams = [
+        (exam, _exam_data(exam))
+        for exam in Exam.objects.using('team7').prefetch_related('questions').order_by('title')
+    ]
+    payloads = {('', ''): _payload([data for _, data in exams])}
+    for exam_type in (TaskType.WRITING, TaskType.SPEAKING):
+        payloads[(exam_type.value, '')] = _payload([data for exam, data in exams if exam.exam_type == exam_type])
+    for exam, data in exams:
+        payloads[('', str(exam.exam_id))] = _payload([data])
+    return payloads
+
+
+def get_exam_catalog():
+    global _memo
+    version = _current_version()
+    memo = _memo
+    if memo is not None and memo[0] == version and memo[2] > time.monotonic():
+        return memo[1]
+
+    payloads = cache.get(_catalog_key(version))
+    if payloads is None:
+        payloads = build_exam_catalog()
+        cache.set(_catalog_key(version), payloads, _ttl())
+    _memo = (version, payloads, time.monotonic() + _ttl())
+    return payloads
+
+
+def get_catalog_payload(exam_type='', exam_id=''):
+    """(json_bytes, etag) for a filter, or None for an unknown exam_id."""
+    return get_exam_catalog().get((exam_type or '', exam_id or ''))
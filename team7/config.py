@@ -24,6 +24,13 @@ AI_GENERATOR_MODEL = "gpt-4o-mini"
 SONIOX_API_KEY = env("SONIOX_API_KEY", default="")
 SONIOX_API_BASE_URL = env("SONIOX_API_BASE_URL", default="https://api.soniox.com")
 SONIOX_MODEL = env("SONIOX_MODEL", default="stt-async-v4")
+# Shared client (team7.asr): keep-alive pool size and status polling (seconds, grows x1.3 up to the max)
+SONIOX_POOL_SIZE = env.int("SONIOX_POOL_SIZE", default=10)
+SONIOX_POLL_INITIAL = env.float("SONIOX_POLL_INITIAL", default=0.5)
+SONIOX_POLL_MAX = env.float("SONIOX_POLL_MAX", default=2.0)
+# Public URL of /team7/api/asr/soniox-webhook/ to be notified instead of polling; the secret is checked on callbacks
+SONIOX_WEBHOOK_URL = env("SONIOX_WEBHOOK_URL", default="")
+SONIOX_WEBHOOK_SECRET = env("SONIOX_WEBHOOK_SECRET", default="")
 
 # ==================== Validation ====================
 def validate_config():
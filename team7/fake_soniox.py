@@ -0,0 +1,157 @@
+"""Local stand-in for the Soniox async API, for benchmarks and tests.
+
+    with FakeSonioxServer(processing_delay=1.5) as server:
+        client = SonioxClient("key", server.base_url, "stt-async-v4")
+
+Implements the endpoints team7 uses (file upload, transcription create /
+status / transcript, deletes). A transcription reports `completed` once
+`processing_delay` (+ up to `jitter`) seconds have passed since it was created; with a
+webhook_url in the request the server also POSTs the completion to it.
+Counters show how many TCP connections and requests the clients made.
+`rtt` adds a network round trip to every request, and two more to every new
+connection (the TLS handshake a real client pays).
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+TRANSCRIPT_TEXT = "I believe students learn best when they work on real projects together."
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling is visible
+
+    def setup(self):
+        super().setup()
+        self.server.fake.count("connections")
+        time.sleep(2 * self.server.fake.rtt)
+
+    def parse_request(self):
+        ok = super().parse_request()
+        time.sleep(self.server.fake.rtt)
+        return ok
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status, payload=None):
+        body = json.dumps(payload or {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _drain_body(self):
+        remaining = int(self.headers.get("Content-Length") or 0)
+        data = b""
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            self.server.fake.count("bytes_uploaded", len(chunk))
+            if len(data) < 1 << 16:
+                data += chunk
+        return data
+
+    def do_POST(self):
+        fake = self.server.fake
+        fake.count("requests")
+        body = self._drain_body()
+        if self.path == "/v1/files":
+            self._json(201, {"id": uuid.uuid4().hex})
+        elif self.path == "/v1/transcriptions":
+            config = json.loads(body or b"{}")
+            transcription_id = uuid.uuid4().hex
+            fake.create(transcription_id, config.get("webhook_url"))
+            self._json(201, {"id": transcription_id, "status": "queued"})
+        else:
+            self._json(404)
+
+    def do_GET(self):
+        fake = self.server.fake
+        fake.count("requests")
+        parts = self.path.strip("/").split("/")
+        if len(parts) >= 3 and parts[:2] == ["v1", "transcriptions"]:
+            done = fake.is_done(parts[2])
+            if done is None:
+                self._json(404)
+            elif len(parts) == 4 and parts[3] == "transcript":
+                tokens = [{"text": word + " "} for word in TRANSCRIPT_TEXT.split()]
+                self._json(200, {"id": parts[2], "tokens": tokens})
+            else:
+                fake.count("status_polls")
+                self._json(200, {"id": parts[2], "status": "completed" if done else "processing"})
+        else:
+            self._json(404)
+
+    def do_DELETE(self):
+        self.server.fake.count("requests")
+        self.server.fake.count("deletes")
+        self._json(200)
+
+
+class FakeSonioxServer:
+    def __init__(self, processing_delay=1.0, jitter=0.0, rtt=0.0, host="127.0.0.1", port=0):
+        self.processing_delay = processing_delay
+        self.jitter = jitter
+        self.rtt = rtt
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._lock = threading.Lock()
+        self._ready_at = {}
+        self.counters = {"connections": 0, "requests": 0, "status_polls": 0, "deletes": 0, "bytes_uploaded": 0}
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def reset_counters(self):
+        with self._lock:
+            for name in self.counters:
+                self.counters[name] = 0
+
+    def create(self, transcription_id, webhook_url=None):
+        delay = self.processing_delay + random.uniform(0, self.jitter)
+        with self._lock:
+            self._ready_at[transcription_id] = time.monotonic() + delay
+        if webhook_url:
+            timer = threading.Timer(
+                delay,
+                lambda: requests.post(webhook_url, json={"id": transcription_id, "status": "completed"}, timeout=5),
+            )
+            timer.daemon = True
+            timer.start()
+
+    def is_done(self, transcription_id):
+        with self._lock:
+            ready_at = self._ready_at.get(transcription_id)
+        return None if ready_at is None else time.monotonic() >= ready_at
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-soniox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,358 @@
+"""Precomputed health snapshot served by the admin_health view.
+
+A background thread refreshes the snapshot every TEAM7_HEALTH_REFRESH_SECONDS:
+
+- API metrics for the last 24 hours are kept incrementally. Each refresh
+  reads only the APILog rows written since the previous one into per-minute,
+  per-endpoint buckets (counts, errors and a latency sketch); minutes that
+  leave the window are subtracted again. p50/p95/p99 come from the sketches,
+  not from Avg scans.
+- Evaluation counts grow with the new rows and are recounted in full every
+  FULL_RECOUNT_EVERY refreshes.
+- The LLM probe (models.list) runs at most every TEAM7_HEALTH_LLM_PROBE_SECONDS;
+  in between the last result is reused.
+
+The view only returns the latest snapshot.
+"""
+import logging
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from .models import APILog, Evaluation, Question
+
+logger = logging.getLogger(__name__)
+
+WINDOW = timedelta(hours=24)
+# APILog rows are written in batches (team7.api_logging), so the newest
+# seconds are left for the next refresh.
+INGEST_LAG = timedelta(seconds=5)
+FULL_RECOUNT_EVERY = 20
+SLOWEST_ENDPOINTS = 5
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LatencySketch:
+    """Log-bucketed latency histogram, about 2.5% relative error.
+
+    Sketches can be added to and subtracted from each other, which keeps a
+    sliding window cheap.
+    """
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+
+    @classmethod
+    def bucket(cls, latency_ms):
+        if latency_ms < 1:
+            return 0
+        return int(math.log(latency_ms) / math.log(cls.GROWTH)) + 1
+
+    @classmethod
+    def bucket_value(cls, index):
+        if index == 0:
+            return 0
+        return cls.GROWTH ** (index - 0.5)
+
+    def add(self, latency_ms, count=1):
+        self.counts[self.bucket(latency_ms)] += count
+        self.total += count
+
+    def merge(self, other, sign=1):
+        for index, count in other.counts.items():
+            self.counts[index] += sign * count
+            if self.counts[index] <= 0:
+                del self.counts[index]
+        self.total += sign * other.total
+
+    def quantile(self, q):
+        if self.total <= 0:
+            return None
+        rank = q * self.total
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return round(self.bucket_value(index), 1)
+        return round(self.bucket_value(max(self.counts)), 1)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0
+        self.sketch = LatencySketch()
+
+    def add(self, status_code, latency_ms):
+        self.count += 1
+        self.errors += status_code >= 400
+        self.latency_sum += latency_ms
+        self.sketch.add(latency_ms)
+
+    def merge(self, other, sign=1):
+        self.count += sign * other.count
+        self.errors += sign * other.errors
+        self.latency_sum += sign * other.latency_sum
+        self.sketch.merge(other.sketch, sign)
+
+    @property
+    def avg_latency(self):
+        return self.latency_sum / self.count if self.count else 0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "avg_latency": round(self.avg_latency, 2),
+            "p50_ms": self.sketch.quantile(0.50),
+            "p95_ms": self.sketch.quantile(0.95),
+            "p99_ms": self.sketch.quantile(0.99),
+        }
+
+
+class APIWindow:
+    """Sliding 24 h window of per-endpoint stats, kept per minute."""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._minutes = OrderedDict()  # minute -> {endpoint: EndpointStats}
+        self.totals = {}
+
+    def add(self, endpoint, status_code, latency_ms, timestamp):
+        minute = timestamp.replace(second=0, microsecond=0)
+        per_endpoint = self._minutes.get(minute)
+        if per_endpoint is None:
+            # Rows arrive roughly in time order; keep the minutes sorted for expire().
+            out_of_order = bool(self._minutes) and minute < next(reversed(self._minutes))
+            per_endpoint = self._minutes[minute] = {}
+            if out_of_order:
+                self._minutes = OrderedDict(sorted(self._minutes.items()))
+        per_endpoint.setdefault(endpoint, EndpointStats()).add(status_code, latency_ms)
+        self.totals.setdefault(endpoint, EndpointStats()).add(status_code, latency_ms)
+
+    def expire(self, now):
+        cutoff = now - self.window
+        while self._minutes:
+            minute = next(iter(self._minutes))
+            if minute >= cutoff:
+                break
+            for endpoint, stats in self._minutes.pop(minute).items():
+                total = self.totals[endpoint]
+                total.merge(stats, sign=-1)
+                if total.count <= 0:
+                    del self.totals[endpoint]
+
+    def overall(self):
+        overall = EndpointStats()
+        for stats in self.totals.values():
+            overall.merge(stats)
+        return overall
+
+
+class HealthMonitor:
+    def __init__(self, refresh_seconds=15, llm_probe_seconds=300):
+        self.refresh_seconds = refresh_seconds
+        self.llm_probe_seconds = llm_probe_seconds
+        self.snapshot = None
+        self._snapshot_at = None
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._api = APIWindow()
+        self._api_cursor = None
+        self._eval_cursor = None
+        self._refreshes = 0
+        self._counts = {"total_evaluations": 0, "total_questions": 0, "evaluations_today": 0}
+        self._today = None
+        self._llm_check = None
+        self._llm_checked_at = 0.0
+        self._llm_client = None
+
+    # -- checks -------------------------------------------------------------
+
+    def _check_database(self):
+        try:
+            with connections['team7'].cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            return {"status": "healthy", "message": "Database connection successful"}
+        except Exception as e:
+            logger.error(f"Database health check failed: {str(e)}")
+            return {"status": "unhealthy", "message": f"Database error: {str(e)}"}
+
+    def _check_llm(self):
+        if self._llm_check is not None and time.monotonic() - self._llm_checked_at < self.llm_probe_seconds:
+            return self._llm_check
+        try:
+            if self._llm_client is None:
+                from openai import OpenAI
+
+                # Same endpoint and key the evaluators use.
+                self._llm_client = OpenAI(
+                    api_key=getattr(settings, 'AI_GENERATOR_API_KEY', 'PLACEHOLDER_KEY'),
+                    base_url=getattr(settings, 'AI_GENERATOR_BASE_URL', 'https://api.gpt4-all.xyz/v1'),
+                    timeout=10,
+                    max_retries=0,
+                )
+            models = self._llm_client.models.list()
+            check = {
+                "status": "healthy",
+                "message": "LLM API accessible",
+                "models_available": len(models.data) if hasattr(models, 'data') else 0
+            }
+        except Exception as e:
+            logger.warning(f"LLM service health check failed: {str(e)}")
+            check = {"status": "unhealthy", "message": f"LLM service error: {str(e)}"}
+        check["checked_at"] = timezone.now().isoformat()
+        self._llm_check, self._llm_checked_at = check, time.monotonic()
+        return check
+
+    def _ingest_api_logs(self, now):
+        upper = now - INGEST_LAG
+        if self._api_cursor is None:
+            self._api_cursor = now - WINDOW
+        rows = (
+            APILog.objects.using('team7')
+            .filter(timestamp__gt=self._api_cursor, timestamp__lte=upper)
+            .order_by()
+            .values_list('endpoint', 'status_code', 'latency_ms', 'timestamp')
+        )
+        for endpoint, status_code, latency_ms, timestamp in rows.iterator(chunk_size=5000):
+            self._api.add(endpoint, status_code, latency_ms, timestamp)
+        self._api_cursor = upper
+        self._api.expire(now)
+
+    def _check_api_performance(self, now):
+        try:
+            self._ingest_api_logs(now)
+        except Exception as e:
+            logger.error(f"API performance check failed: {str(e)}")
+            return {"status": "unknown", "message": f"Unable to calculate metrics: {str(e)}"}
+
+        overall = self._api.overall()
+        error_rate = (overall.errors / overall.count * 100) if overall.count else 0
+        slowest = sorted(self._api.totals.items(), key=lambda item: item[1].avg_latency, reverse=True)
+        return {
+            "status": "healthy" if error_rate < 10 and overall.avg_latency < 5000 else "degraded",
+            "total_requests_24h": overall.count,
+            "error_requests_24h": overall.errors,
+            "error_rate": round(error_rate, 2),
+            "avg_latency_ms": round(overall.avg_latency, 2),
+            "p50_latency_ms": overall.sketch.quantile(0.50),
+            "p95_latency_ms": overall.sketch.quantile(0.95),
+            "p99_latency_ms": overall.sketch.quantile(0.99),
+            "slowest_endpoints": [
+                {"endpoint": endpoint, **stats.summary()} for endpoint, stats in slowest[:SLOWEST_ENDPOINTS]
+            ],
+        }
+
+    def _database_stats(self, now):
+        try:
+            evaluations = Evaluation.objects.using('team7')
+            today = timezone.localtime(now).date()
+            if self._eval_cursor is None or self._refreshes % FULL_RECOUNT_EVERY == 0 or today != self._today:
+                # Full recount: picks up deletes and the new day.
+                midnight = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+                self._counts = {
+                    "total_evaluations": evaluations.filter(created_at__lte=now).count(),
+                    "total_questions": Question.objects.using('team7').count(),
+                    "evaluations_today": evaluations.filter(created_at__gte=midnight, created_at__lte=now).count(),
+                }
+                self._today = today
+            else:
+                new = evaluations.filter(created_at__gt=self._eval_cursor, created_at__lte=now).count()
+                self._counts["total_evaluations"] += new
+                self._counts["evaluations_today"] += new
+            self._eval_cursor = now
+        except Exception as e:
+            logger.error(f"Database stats check failed: {str(e)}")
+        return {"status": "info", **self._counts}
+
+    # -- snapshot -----------------------------------------------------------
+
+    def refresh(self):
+        with self._lock:
+            return self._build()
+
+    def _build(self):
+        now = timezone.now()
+        health_status = {
+            "service": "team7",
+            "timestamp": now.isoformat(),
+            "status": "healthy",
+            "checks": {}
+        }
+        checks = health_status["checks"]
+        checks["database"] = self._check_database()
+        checks["llm_service"] = self._check_llm()
+        if "unhealthy" in (checks["database"]["status"], checks["llm_service"]["status"]):
+            health_status["status"] = "degraded"
+
+        checks["api_performance"] = self._check_api_performance(now)
+        error_rate = checks["api_performance"].get("error_rate", 0)
+        # Update overall status based on error rate
+        if error_rate > 25:
+            health_status["status"] = "unhealthy"
+        elif error_rate > 10:
+            health_status["status"] = "degraded"
+
+        checks["database_stats"] = self._database_stats(now)
+        self._refreshes += 1
+        self.snapshot, self._snapshot_at = health_status, now
+        return health_status
+
+    def _run(self):
+        while True:
+            close_old_connections()
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception(f"Health snapshot refresh failed: {str(e)}")
+            time.sleep(self.refresh_seconds)
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="team7-health", daemon=True)
+                self._thread.start()
+
+    def current(self):
+        """Latest snapshot; only the very first call waits for one to be built."""
+        self.ensure_started()
+        if self.snapshot is None:
+            with self._lock:
+                if self.snapshot is None:
+                    self._build()
+        return self.snapshot
+
+    def snapshot_age_seconds(self):
+        return round((timezone.now() - self._snapshot_at).total_seconds(), 1)
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_health_monitor():
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = HealthMonitor(
+                    refresh_seconds=_setting('TEAM7_HEALTH_REFRESH_SECONDS', 15),
+                    llm_probe_seconds=_setting('TEAM7_HEALTH_LLM_PROBE_SECONDS', 300),
+                )
+    return _monitor
@@ -0,0 +1,266 @@
+"""Asynchronous evaluation jobs (writing and speaking).
+
+Submissions are validated, stored as EvaluationJob rows and answered with
+202 + job id; worker threads claim due rows, run the usual EvaluationService
+workflow and store its response for the status endpoint.
+
+Workers run either inside the web process (TEAM7_EVAL_INPROCESS_WORKERS
+threads, started on a submission or a status poll) or in a dedicated process
+via `python manage.py run_evaluation_workers`. Claiming and lease renewal
+come from core.job_queue: after a restart jobs left queued are resumed as soon
+as their clients poll again, and one whose process died is taken over once the
+(short) lease expires. Calls to each upstream provider (Soniox ASR, the LLM)
+are capped per process by TEAM7_EVAL_PROVIDER_LIMITS, and 5xx outcomes are
+retried with exponential backoff.
+"""
+import logging
+import os
+import random
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+
+from core.job_queue import LeasedWorkerPool, claim_next
+
+from .models import EvaluationJob, JobStatus, Question, TaskType
+from .services import EvaluationService, SpeakingEvaluator, WritingEvaluator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER_LIMITS = {"soniox": 2, "llm": 4}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------------------------------------------------------------------------
+# Enqueueing
+# ---------------------------------------------------------------------------
+
+def _get_question(question_id):
+    try:
+        return Question.objects.using('team7').get(question_id=question_id)
+    except (Question.DoesNotExist, ValueError):
+        return None
+
+
+def _create_job(user_id, question_id, task_type, payload):
+    job = EvaluationJob.objects.using('team7').create(
+        user_id=user_id,
+        question_id=question_id,
+        task_type=task_type,
+        payload=payload,
+        max_attempts=_setting('TEAM7_EVAL_MAX_ATTEMPTS', 3),
+        next_attempt_at=timezone.now(),
+    )
+    ensure_workers_started()
+    return job
+
+
+def _accepted(job):
+    return {
+        "status": JobStatus.QUEUED.value,
+        "job_id": str(job.job_id),
+        "status_url": reverse('team7:evaluation_job_status', args=[job.job_id]),
+    }, 202
+
+
+def enqueue_writing(user_id, question_id, text):
+    """Validate a writing submission and queue it. Returns (response_dict, http_status)."""
+    if _get_question(question_id) is None:
+        return {"error": "QUESTION_NOT_FOUND", "message": "Invalid question ID"}, 404
+
+    is_valid, message = WritingEvaluator().validate_length(text)
+    if not is_valid:
+        return {"error": message, "code": "INVALID_INPUT"}, 400
+
+    job = _create_job(user_id, question_id, TaskType.WRITING, {"text": text})
+    logger.info(f"Queued writing evaluation job {job.job_id} for user {user_id}")
+    return _accepted(job)
+
+
+def enqueue_speaking(user_id, question_id, audio_file):
+    """Validate a speaking submission, store the audio and queue it."""
+    if _get_question(question_id) is None:
+        return {"error": "QUESTION_NOT_FOUND", "message": "Invalid question ID"}, 404
+
+    is_valid, message = SpeakingEvaluator().validate_audio_file(audio_file)
+    if not is_valid:
+        return {"error": message, "code": "INVALID_INPUT"}, 400
+
+    # The worker may run in another process, so the upload goes to storage first.
+    file_extension = os.path.splitext(audio_file.name)[1]
+    audio_file.seek(0)
+    audio_path = default_storage.save(f"speaking/{user_id}/{uuid.uuid4()}{file_extension}", audio_file)
+
+    job = _create_job(user_id, question_id, TaskType.SPEAKING, {"audio_path": audio_path})
+    logger.info(f"Queued speaking evaluation job {job.job_id} for user {user_id}")
+    return _accepted(job)
+
+
+def job_status_payload(job):
+    data = {
+        "job_id": str(job.job_id),
+        "task_type": job.task_type,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+    if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+        data["status_code"] = job.result_status_code
+        data["result"] = job.result
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Claiming and running
+# ---------------------------------------------------------------------------
+
+def _lease_seconds():
+    return _setting('TEAM7_EVAL_JOB_LEASE_SECONDS', 120)
+
+
+def claim_next_job(worker_id):
+    """Atomically take the oldest due job (or one whose worker died), or return None."""
+    return claim_next(
+        EvaluationJob.objects.using('team7'), worker_id,
+        queued=JobStatus.QUEUED, running=JobStatus.RUNNING, lease_seconds=_lease_seconds(), stamp=('updated_at',),
+    )
+
+
+def _backoff_seconds(attempts):
+    base = _setting('TEAM7_EVAL_RETRY_BASE_SECONDS', 5)
+    return base * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+def _evaluate(job, service):
+    if job.task_type == TaskType.WRITING:
+        return service.evaluate_writing(job.user_id, job.question_id, job.payload["text"])
+
+    audio_path = job.payload["audio_path"]
+    with default_storage.open(audio_path, 'rb') as audio_file:
+        return service.evaluate_speaking(
+            user_id=job.user_id,
+            question_id=job.question_id,
+            audio_file=audio_file,
+            stored_audio_path=audio_path,
+        )
+
+
+def run_job(job, service):
+    """Run one claimed job and record its outcome (or schedule a retry)."""
+    if job.attempts > job.max_attempts:
+        body, status_code = {"error": "INTERNAL_ERROR", "message": "Evaluation did not finish."}, 500
+    else:
+        try:
+            body, status_code = _evaluate(job, service)
+        except Exception as e:
+            logger.exception(f"Evaluation job {job.job_id} crashed: {str(e)}")
+            body, status_code = {"error": "INTERNAL_ERROR", "message": "An unexpected error occurred"}, 500
+
+        if status_code >= 500 and job.attempts < job.max_attempts:
+            delay = _backoff_seconds(job.attempts)
+            logger.warning(f"Evaluation job {job.job_id} failed ({status_code}); retry in {delay:.0f}s")
+            EvaluationJob.objects.using('team7').filter(job_id=job.job_id, locked_by=job.locked_by).update(
+                status=JobStatus.QUEUED,
+                next_attempt_at=timezone.now() + timedelta(seconds=delay),
+                locked_at=None,
+                locked_by='',
+                error=str(body.get("message") or body.get("error") or ''),
+                updated_at=timezone.now(),
+            )
+            return
+
+    succeeded = status_code == 200
+    # Only the current lease holder records the outcome; a worker whose lease
+    # expired and was taken over must not overwrite the new owner's result.
+    finished = EvaluationJob.objects.using('team7').filter(job_id=job.job_id, locked_by=job.locked_by).update(
+        status=JobStatus.SUCCEEDED if succeeded else JobStatus.FAILED,
+        result=body,
+        result_status_code=status_code,
+        error='' if succeeded else str(body.get("message") or body.get("error") or ''),
+        locked_at=None,
+        updated_at=timezone.now(),
+    )
+    if not finished:
+        logger.warning(f"Evaluation job {job.job_id} was taken over by another worker; dropping this result")
+        return
+    if not succeeded and job.task_type == TaskType.SPEAKING:
+        # Audio is only kept for evaluations that were saved.
+        default_storage.delete(job.payload["audio_path"])
+    logger.info(f"Evaluation job {job.job_id} finished with {status_code}")
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+_provider_semaphores = {}
+_provider_lock = threading.Lock()
+
+
+def _provider_semaphore(provider):
+    with _provider_lock:
+        if provider not in _provider_semaphores:
+            limits = {**DEFAULT_PROVIDER_LIMITS, **_setting('TEAM7_EVAL_PROVIDER_LIMITS', {})}
+            _provider_semaphores[provider] = threading.BoundedSemaphore(limits.get(provider, 1))
+        return _provider_semaphores[provider]
+
+
+def _limited(fn, provider):
+    def call(*args, **kwargs):
+        with _provider_semaphore(provider):
+            return fn(*args, **kwargs)
+    return call
+
+
+def build_worker_service():
+    """EvaluationService whose upstream calls respect the per-provider limits."""
+    service = EvaluationService()
+    service.writing_evaluator.analyze = _limited(service.writing_evaluator.analyze, "llm")
+    service.speaking_evaluator.analyze_speaking = _limited(service.speaking_evaluator.analyze_speaking, "llm")
+    service.speaking_evaluator.transcribe_audio = _limited(service.speaking_evaluator.transcribe_audio, "soniox")
+    return service
+
+
+class EvaluationWorkerPool(LeasedWorkerPool):
+    name = 'team7-eval'
+
+    def claim(self, worker_id):
+        return claim_next_job(worker_id)
+
+    def run(self, job, service):
+        run_job(job, service)
+
+    def running_jobs(self):
+        return EvaluationJob.objects.using('team7').filter(status=JobStatus.RUNNING)
+
+    def lease_seconds(self):
+        return _lease_seconds()
+
+    def setup_worker(self):
+        return build_worker_service()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def ensure_workers_started():
+    """Start the in-process workers once (no-op when TEAM7_EVAL_INPROCESS_WORKERS=0)."""
+    global _pool
+    size = _setting('TEAM7_EVAL_INPROCESS_WORKERS', 2)
+    if size <= 0:
+        return
+    with _pool_lock:
+        if _pool is None:
+            _pool = EvaluationWorkerPool(size)
+            _pool.start()
+    _pool.wake()
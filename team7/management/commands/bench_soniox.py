@@ -0,0 +1,149 @@
+"""
+Throughput of Soniox transcription for concurrent speaking submissions,
+against the local fake Soniox server (team7.fake_soniox), so no API key or
+network is needed.
+
+  legacy : new requests.Session per call, whole-file upload, 1 s polling,
+           cleanup DELETEs inline (the previous transcribe_audio)
+  pooled : team7.asr.SonioxClient (shared pool, streamed upload,
+           exponential polling, background cleanup)
+  webhook: the same client, woken by completion webhooks
+
+Usage:
+    python manage.py bench_soniox                          # 50 concurrent submissions
+    python manage.py bench_soniox --concurrency 20 --processing-delay 3 --jitter 0 --size-kb 2048
+"""
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+from team7.asr import SonioxClient
+from team7.fake_soniox import FakeSonioxServer
+
+
+def _legacy_transcribe(base_url, path):
+    session = requests.Session()
+    session.headers['Authorization'] = 'Bearer bench'
+    file_id = transcription_id = None
+    try:
+        with open(path, 'rb') as audio_file:
+            response = session.post(f"{base_url}/v1/files", files={'file': (os.path.basename(path), audio_file)})
+        file_id = response.json()['id']
+        response = session.post(f"{base_url}/v1/transcriptions", json={"model": "stt-async-v4", "file_id": file_id})
+        transcription_id = response.json()['id']
+        while session.get(f"{base_url}/v1/transcriptions/{transcription_id}").json()['status'] != 'completed':
+            time.sleep(1)
+        tokens = session.get(f"{base_url}/v1/transcriptions/{transcription_id}/transcript").json()['tokens']
+        return ''.join(t['text'] for t in tokens).strip()
+    finally:
+        if transcription_id:
+            session.delete(f"{base_url}/v1/transcriptions/{transcription_id}")
+        if file_id:
+            session.delete(f"{base_url}/v1/files/{file_id}")
+
+
+def _pooled_transcribe(client, path):
+    with open(path, 'rb') as audio_file:
+        result = client.transcribe(audio_file, timeout=60)
+    return result and result['transcript']
+
+
+def _webhook_receiver(client):
+    """Minimal stand-in for the soniox_webhook view, bound to `client`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            client.notify_completed(json.loads(body)["id"])
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+class Command(BaseCommand):
+    help = 'Benchmark Soniox transcription with concurrent submissions against a fake server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--processing-delay', type=float, default=1.5, help='fake server seconds per job')
+        parser.add_argument('--jitter', type=float, default=1.5, help='extra random processing seconds')
+        parser.add_argument('--rtt', type=float, default=0.05, help='simulated network round trip (s)')
+        parser.add_argument('--size-kb', type=int, default=1024, help='audio file size')
+
+    def _run(self, server, label, fn, paths):
+        server.reset_counters()
+        timings = []
+
+        def timed(path):
+            started = time.perf_counter()
+            text = fn(path)
+            timings.append(time.perf_counter() - started)
+            return text
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+            results = list(pool.map(timed, paths))
+        wall = time.perf_counter() - started
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        ok = sum(1 for r in results if r)
+        c = server.counters
+        self.stdout.write(
+            f"{label:<8} {ok:>3}/{len(paths):<3} {wall:>7.2f} {statistics.mean(timings):>8.2f} {p95:>7.2f} "
+            f"{c['connections']:>6} {c['requests']:>6} {c['status_polls']:>6} {peak_mb:>8.1f}"
+        )
+
+    def handle(self, *args, **options):
+        n = options['concurrency']
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(n):
+                path = os.path.join(tmp, f"answer_{i}.webm")
+                with open(path, 'wb') as f:
+                    f.write(os.urandom(options['size_kb'] * 1024))
+                paths.append(path)
+
+            with FakeSonioxServer(processing_delay=options['processing_delay'], jitter=options['jitter'],
+                                  rtt=options['rtt']) as server:
+                client = SonioxClient('bench', server.base_url, 'stt-async-v4', pool_size=n)
+                hook_client = SonioxClient('bench', server.base_url, 'stt-async-v4', pool_size=n)
+                receiver = _webhook_receiver(hook_client)
+                hook_client.webhook_url = f"http://127.0.0.1:{receiver.server_address[1]}/"
+                self.stdout.write(
+                    f"{n} concurrent submissions, {options['size_kb']} KB audio, "
+                    f"{options['processing_delay']}-{options['processing_delay'] + options['jitter']}s fake processing, "
+                    f"{options['rtt'] * 1000:.0f} ms RTT\n"
+                )
+                self.stdout.write(
+                    f"{'mode':<8} {'ok':>7} {'wall s':>7} {'mean s':>8} {'p95 s':>7} {'conns':>6} {'reqs':>6} {'polls':>6} {'peak MB':>8}"
+                )
+                self._run(server, 'legacy', lambda p: _legacy_transcribe(server.base_url, p), paths)
+                self._run(server, 'pooled', lambda p: _pooled_transcribe(client, p), paths)
+                self._run(server, 'webhook', lambda p: _pooled_transcribe(hook_client, p), paths)
+                client.reaper.join()
+                hook_client.reaper.join()
+                receiver.shutdown()
+                deleted = client.reaper.deleted + hook_client.reaper.deleted
+                failed = client.reaper.failed + hook_client.reaper.failed
+                self.stdout.write(f"\nbackground cleanup: {deleted} deletes, {failed} failed")
@@ -0,0 +1,41 @@
+"""
+Compact old APILog rows into per-endpoint, per-minute latency histograms
+(APILogRollup) and delete the raw rows.
+
+Usage:
+    python manage.py compact_api_logs                       # rows older than TEAM7_API_LOG_RETENTION_DAYS
+    python manage.py compact_api_logs --older-than-days 1 --window-hours 6
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from team7.api_logging import compact_api_logs
+
+
+class Command(BaseCommand):
+    help = 'Roll old API request logs up into per-minute latency histograms'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=float,
+            default=getattr(settings, 'TEAM7_API_LOG_RETENTION_DAYS', 7),
+            help='Keep raw rows newer than this many days'
+        )
+        parser.add_argument(
+            '--window-hours',
+            type=float,
+            default=1,
+            help='Hours of logs compacted per transaction'
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['older_than_days'])
+        removed, written = compact_api_logs(before, window=timedelta(hours=options['window_hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {removed} API log rows older than {before:%Y-%m-%d %H:%M} into {written} minute rollups'
+        ))
@@ -0,0 +1,29 @@
+"""
+Rebuild the per-user analytics rows (UserAnalytics) from stored evaluations.
+Use after backfills or manual data fixes; normal submissions keep them up to date.
+
+Usage:
+    python manage.py recompute_user_analytics                      # every user
+    python manage.py recompute_user_analytics --user-id YOUR_UUID
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from team7.analytics import recompute_user_analytics
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user evaluation analytics (vectorized batch backfill)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', action='append', dest='user_ids', help='Only this user (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per batch')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users = recompute_user_analytics(options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed analytics for {users} user(s) in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,32 @@
+"""
+Run team7 evaluation workers in the foreground (Ctrl-C to stop).
+
+Usage:
+    python manage.py run_evaluation_workers                 # 4 worker threads
+    python manage.py run_evaluation_workers --threads 8 --poll-interval 0.5
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from team7.jobs import EvaluationWorkerPool
+
+
+class Command(BaseCommand):
+    help = 'Process queued writing/speaking evaluation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        pool = EvaluationWorkerPool(options['threads'], poll_interval=options['poll_interval'])
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(f"{options['threads']} evaluation workers running"))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers (running jobs finish first)...")
+            pool.stop()
@@ -1,20 +1,21 @@
 """
 Django management command to seed test evaluation history data into the database.
 Creates 10 writing and 10 speaking evaluation records with fake data for testing.
+Rows are inserted with bulk_create in chunked transactions, so --count can be large.
 
 Usage:
     python manage.py seed_history                           # Uses a default test user UUID
     python manage.py seed_history --user-id YOUR_UUID       # Uses a specific user UUID
+    python manage.py seed_history --count 5000              # 5000 records of each type
     python manage.py seed_history --list-users              # Lists all available users
 """
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import random
-import uuid as uuid_lib
-from team7.models import Exam, Question, Evaluation, DetailedScore, TaskType
+from team7.models import Question, TaskType
+from team7.persistence import bulk_import_evaluations
 from core.models import User
 
 
@@ -32,6 +33,18 @@ class Command(BaseCommand):
             action='store_true',
             help='List all available users'
         )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=10,
+            help='Number of evaluations to create per task type (default: 10)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Evaluations inserted per transaction (default: 500)'
+        )
 
     def handle(self, *args, **options):
         # Handle list-users command
@@ -54,9 +67,10 @@ class Command(BaseCommand):
         
         self.stdout.write(f'Starting to seed test history data for user: {user_id}')
         
-        with transaction.atomic():
-            self.seed_writing_history(user_id)
-            self.seed_speaking_history(user_id)
+        count = options['count']
+        chunk_size = options['chunk_size']
+        self.seed_writing_history(user_id, count, chunk_size)
+        self.seed_speaking_history(user_id, count, chunk_size)
         
         self.stdout.write(self.style.SUCCESS(f'Successfully seeded test history data for user {user_id}'))
     
@@ -80,84 +94,69 @@ class Command(BaseCommand):
         
         self.stdout.write(f'Total: {users.count()} user(s)\n')
 
-    def seed_writing_history(self, user_id):
-        """Seed 10 writing evaluation records"""
+    def seed_writing_history(self, user_id, count=10, chunk_size=500):
+        """Seed `count` writing evaluation records"""
         # Get a writing question to link to
         writing_question = Question.objects.filter(task_type=TaskType.WRITING).first()
         if not writing_question:
             self.stdout.write(self.style.WARNING('No writing questions found, skipping writing history'))
             return
-        
-        # Get the exam from the question
-        writing_exam = writing_question.exam
-        
-        for i in range(10):
-            # Create evaluation with random data
-            eval_score = round(random.uniform(2.0, 5.0), 1)
-            days_ago = random.randint(0, 60)
-            
-            evaluation = Evaluation.objects.create(
-                user_id=user_id,
-                question=writing_question,
-                exam=writing_exam,
-                task_type=TaskType.WRITING,
-                submitted_text=self._generate_essay(),
-                overall_score=eval_score,
-                ai_feedback=self._generate_feedback('writing'),
-                created_at=timezone.now() - timedelta(days=days_ago)
-            )
-            
-            # Add detailed scores
-            criteria = ['Grammar', 'Vocabulary', 'Organization', 'Topic Development']
-            for criterion in criteria:
-                DetailedScore.objects.create(
-                    evaluation=evaluation,
-                    criterion=criterion,
-                    score_value=round(random.uniform(2.0, 5.0), 1),
-                    comment=f'Good performance in {criterion}'
-                )
-            
-            self.stdout.write(f'Created writing evaluation {i+1}/10')
 
-    def seed_speaking_history(self, user_id):
-        """Seed 10 speaking evaluation records"""
+        records = (
+            {
+                'user_id': user_id,
+                'question_id': writing_question.question_id,
+                'exam_id': writing_question.exam_id,
+                'task_type': TaskType.WRITING,
+                'submitted_text': self._generate_essay(),
+                'overall_score': round(random.uniform(2.0, 5.0), 1),
+                'ai_feedback': self._generate_feedback('writing'),
+                'created_at': self._random_created_at(),
+                'criteria': self._generate_criteria(['Grammar', 'Vocabulary', 'Organization', 'Topic Development']),
+            }
+            for _ in range(count)
+        )
+        created = bulk_import_evaluations(records, chunk_size=chunk_size)
+        self.stdout.write(f'Created {created} writing evaluations')
+
+    def seed_speaking_history(self, user_id, count=10, chunk_size=500):
+        """Seed `count` speaking evaluation records"""
         # Get a speaking question to link to
         speaking_question = Question.objects.filter(task_type=TaskType.SPEAKING).first()
         if not speaking_question:
             self.stdout.write(self.style.WARNING('No speaking questions found, skipping speaking history'))
             return
-        
-        # Get the exam from the question
-        speaking_exam = speaking_question.exam
-        
-        for i in range(10):
-            # Create evaluation with random data
-            eval_score = round(random.uniform(2.0, 5.0), 1)
-            days_ago = random.randint(0, 60)
-            
-            evaluation = Evaluation.objects.create(
-                user_id=user_id,
-                question=speaking_question,
-                exam=speaking_exam,
-                task_type=TaskType.SPEAKING,
-                audio_path=f'/media/audio/speaking_test_{i}.wav',
-                transcript_text=self._generate_transcript(),
-                overall_score=eval_score,
-                ai_feedback=self._generate_feedback('speaking'),
-                created_at=timezone.now() - timedelta(days=days_ago)
-            )
-            
-            # Add detailed scores
-            criteria = ['Delivery', 'Language Use', 'Topic Development']
-            for criterion in criteria:
-                DetailedScore.objects.create(
-                    evaluation=evaluation,
-                    criterion=criterion,
-                    score_value=round(random.uniform(2.0, 5.0), 1),
-                    comment=f'Good performance in {criterion}'
-                )
-            
-            self.stdout.write(f'Created speaking evaluation {i+1}/10')
+
+        records = (
+            {
+                'user_id': user_id,
+                'question_id': speaking_question.question_id,
+                'exam_id': speaking_question.exam_id,
+                'task_type': TaskType.SPEAKING,
+                'audio_path': f'/media/audio/speaking_test_{i}.wav',
+                'transcript_text': self._generate_transcript(),
+                'overall_score': round(random.uniform(2.0, 5.0), 1),
+                'ai_feedback': self._generate_feedback('speaking'),
+                'created_at': self._random_created_at(),
+                'criteria': self._generate_criteria(['Delivery', 'Language Use', 'Topic Development']),
+            }
+            for i in range(count)
+        )
+        created = bulk_import_evaluations(records, chunk_size=chunk_size)
+        self.stdout.write(f'Created {created} speaking evaluations')
+
+    def _random_created_at(self):
+        return timezone.now() - timedelta(days=random.randint(0, 60))
+
+    def _generate_criteria(self, names):
+        return [
+            {
+                'name': criterion,
+                'score': round(random.uniform(2.0, 5.0), 1),
+                'comment': f'Good performance in {criterion}'
+            }
+            for criterion in names
+        ]
 
     def _generate_essay(self):
         """Generate a sample essay text"""
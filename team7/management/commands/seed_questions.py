@@ -5,6 +5,7 @@ Populates both writing and speaking exams with their questions, based on mock da
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from team7.catalog import catalog_changes
 from team7.models import Exam, Question, TaskType
 
 
@@ -14,7 +15,8 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Starting to seed exams and questions...')
         
-        with transaction.atomic():
+        # The exam catalog cache is invalidated once, after the commit, not per saved row
+        with catalog_changes(), transaction.atomic():
             self.seed_writing_exams()
             self.seed_speaking_exams()
         
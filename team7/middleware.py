@@ -7,8 +7,9 @@ system health monitoring and performance analysis.
 
 import time
 import logging
+from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
-from .models import APILog
+from .api_logging import MAX_ERROR_BODY, get_api_log_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,9 @@ class APILoggingMiddleware(MiddlewareMixin):
         - Processing latency
         - User ID (if authenticated)
         - Error messages (for failed requests)
+
+    Records are buffered and written in batches by team7.api_logging, so
+    logging adds no database write to the request.
     
     Usage:
         Add 'team7.middleware.APILoggingMiddleware' to MIDDLEWARE in settings.py
@@ -32,51 +36,49 @@ class APILoggingMiddleware(MiddlewareMixin):
         request._start_time = time.time()
         return None
 
+    @staticmethod
+    def _latency_ms(request):
+        if hasattr(request, '_start_time'):
+            return int((time.time() - request._start_time) * 1000)
+        return 0
+
+    @staticmethod
+    def _user_id(request):
+        if hasattr(request, 'user') and request.user.is_authenticated:
+            return str(request.user.id)
+        return None
+
     def process_response(self, request, response):
-        """Log the completed request to database."""
+        """Queue the completed request for logging."""
         # Only log team7 API endpoints
         if not request.path.startswith('/team7/api/'):
             return response
 
-        # Calculate latency
-        if hasattr(request, '_start_time'):
-            latency_ms = int((time.time() - request._start_time) * 1000)
-        else:
-            latency_ms = 0
+        latency_ms = self._latency_ms(request)
+        record = {
+            "user_id": self._user_id(request),
+            "endpoint": request.path,
+            "method": request.method,
+            "status_code": response.status_code,
+            "latency_ms": latency_ms,
+            "timestamp": timezone.now(),
+            # Sizes from headers/content already in memory; request.body is never read here.
+            "request_size": int(request.META.get('CONTENT_LENGTH') or 0) or None,
+            "response_size": None if response.streaming else len(response.content),
+        }
+
+        # Error message: the exception seen in process_exception, or parsed
+        # from the (small) error body later on the flusher thread.
+        if hasattr(request, '_api_log_exception'):
+            record["error_message"] = request._api_log_exception
+        elif response.status_code >= 400:
+            if not response.streaming and len(response.content) <= MAX_ERROR_BODY:
+                record["error_body"] = response.content
+            else:
+                record["error_message"] = f"HTTP {response.status_code}"
 
-        # Extract user ID (if authenticated)
-        user_id = None
-        if hasattr(request, 'user') and request.user.is_authenticated:
-            user_id = str(request.user.id)
-
-        # Extract error message for failed requests
-        error_message = None
-        if response.status_code >= 400:
-            try:
-                # Try to extract error from JSON response
-                if hasattr(response, 'content'):
-                    import json
-                    error_data = json.loads(response.content)
-                    error_message = error_data.get('message', error_data.get('error', ''))
-            except:
-                error_message = f"HTTP {response.status_code}"
-
-        # Get request and response sizes
-        request_size = len(request.body) if hasattr(request, 'body') else None
-        response_size = len(response.content) if hasattr(response, 'content') else None
-
-        # Log to database (async to avoid blocking)
         try:
-            APILog.objects.create(
-                user_id=user_id,
-                endpoint=request.path,
-                method=request.method,
-                status_code=response.status_code,
-                latency_ms=latency_ms,
-                error_message=error_message,
-                request_size=request_size,
-                response_size=response_size
-            )
+            get_api_log_buffer().append(record)
         except Exception as e:
             # Don't let logging errors break the request
             logger.error(f"Failed to log API request: {str(e)}")
@@ -87,32 +89,7 @@ class APILoggingMiddleware(MiddlewareMixin):
         return response
 
     def process_exception(self, request, exception):
-        """Log exceptions that occur during request processing."""
-        if not request.path.startswith('/team7/api/'):
-            return None
-
-        # Calculate latency
-        if hasattr(request, '_start_time'):
-            latency_ms = int((time.time() - request._start_time) * 1000)
-        else:
-            latency_ms = 0
-
-        # Extract user ID
-        user_id = None
-        if hasattr(request, 'user') and request.user.is_authenticated:
-            user_id = str(request.user.id)
-
-        # Log the exception
-        try:
-            APILog.objects.create(
-                user_id=user_id,
-                endpoint=request.path,
-                method=request.method,
-                status_code=500,  # Internal Server Error
-                latency_ms=latency_ms,
-                error_message=str(exception)
-            )
-        except Exception as e:
-            logger.error(f"Failed to log API exception: {str(e)}")
-
+        """Remember the exception; the resulting 500 response is logged in process_response."""
+        if request.path.startswith('/team7/api/'):
+            request._api_log_exception = str(exception)
         return None  # Let Django handle the exception normally
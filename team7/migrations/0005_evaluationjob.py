@@ -0,0 +1,39 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:23
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team7', '0004_evaluation_exam'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationJob',
+            fields=[
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('user_id', models.UUIDField(help_text='Reference to Core User UUID')),
+                ('question_id', models.UUIDField()),
+                ('task_type', models.CharField(choices=[('writing', 'Writing'), ('speaking', 'Speaking')], max_length=20)),
+                ('payload', models.JSONField(default=dict, help_text='Essay text, or stored audio path/name for speaking')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('max_attempts', models.IntegerField(default=3)),
+                ('next_attempt_at', models.DateTimeField()),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('result_status_code', models.IntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='team7_job_due_idx'), models.Index(fields=['user_id', '-created_at'], name='team7_job_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team7', '0005_evaluationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APILogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=200)),
+                ('method', models.CharField(default='GET', max_length=10)),
+                ('minute', models.DateTimeField(db_index=True)),
+                ('request_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0, help_text='Requests with status >= 400')),
+                ('latency_sum_ms', models.BigIntegerField(default=0)),
+                ('latency_min_ms', models.IntegerField(blank=True, null=True)),
+                ('latency_max_ms', models.IntegerField(blank=True, null=True)),
+                ('histogram', models.JSONField(default=list)),
+            ],
+            options={
+                'ordering': ['-minute'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='apilog',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='apilogrollup',
+            constraint=models.UniqueConstraint(fields=('endpoint', 'method', 'minute'), name='team7_apilog_rollup_minute_uniq'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team7', '0006_apilog_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAnalytics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.UUIDField(help_text='Reference to Core User UUID')),
+                ('scope', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('score_sum', models.IntegerField(default=0, help_text='Sum of scores in tenths')),
+                ('min_score', models.IntegerField(blank=True, null=True)),
+                ('max_score', models.IntegerField(blank=True, null=True)),
+                ('first_score', models.IntegerField(blank=True, null=True)),
+                ('last_score', models.IntegerField(blank=True, null=True)),
+                ('histogram', models.JSONField(default=dict)),
+                ('recent_scores', models.JSONField(default=list)),
+                ('last_evaluated_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='useranalytics',
+            constraint=models.UniqueConstraint(fields=('user_id', 'scope'), name='team7_user_analytics_scope_uniq'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 class TaskType(models.TextChoices):
@@ -75,6 +76,38 @@ class DetailedScore(models.Model):
         return f"{self.criterion}: {self.score_value}"
 
 
+class UserAnalytics(models.Model):
+    """Running score statistics of one user, kept up to date by team7.analytics.
+
+    One row per user and scope: 'all', 'writing' or 'speaking'. Scores are
+    stored in tenths (the Evaluation.overall_score precision); `histogram`
+    maps tenths to counts and gives the exact median, `recent_scores` holds
+    the latest scores (oldest first) for the moving average.
+    """
+    SCOPE_ALL = 'all'
+
+    user_id = models.UUIDField(help_text="Reference to Core User UUID")
+    scope = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    score_sum = models.IntegerField(default=0, help_text="Sum of scores in tenths")
+    min_score = models.IntegerField(null=True, blank=True)
+    max_score = models.IntegerField(null=True, blank=True)
+    first_score = models.IntegerField(null=True, blank=True)
+    last_score = models.IntegerField(null=True, blank=True)
+    histogram = models.JSONField(default=dict)
+    recent_scores = models.JSONField(default=list)
+    last_evaluated_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'scope'], name='team7_user_analytics_scope_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Analytics {self.user_id} - {self.scope} ({self.count} scores)"
+
+
 class APILog(models.Model):
     """API request logging for monitoring and analytics (FR-MON, NFR-AVAIL-01).
     
@@ -87,7 +120,8 @@ class APILog(models.Model):
     method = models.CharField(max_length=10, default='GET', help_text="HTTP method")
     status_code = models.IntegerField(help_text="HTTP response status code")
     latency_ms = models.IntegerField(help_text="Request processing time in milliseconds")
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Set when the request finished; rows are written later in batches (team7.api_logging).
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     
     # Optional fields for detailed debugging
     error_message = models.TextField(blank=True, null=True, help_text="Error details if status >= 400")
@@ -103,4 +137,77 @@ class APILog(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.method} {self.endpoint} - {self.status_code} ({self.latency_ms}ms)"
\ No newline at end of file
+        return f"{self.method} {self.endpoint} - {self.status_code} ({self.latency_ms}ms)"
+
+
+class APILogRollup(models.Model):
+    """Per-endpoint, per-minute summary of compacted APILog rows.
+
+    `histogram` holds request counts per latency bucket: bucket i counts
+    latencies <= LATENCY_BUCKETS_MS[i] (and above the previous bound), the
+    last bucket everything slower.
+    """
+    LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    endpoint = models.CharField(max_length=200)
+    method = models.CharField(max_length=10, default='GET')
+    minute = models.DateTimeField(db_index=True)
+    request_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0, help_text="Requests with status >= 400")
+    latency_sum_ms = models.BigIntegerField(default=0)
+    latency_min_ms = models.IntegerField(null=True, blank=True)
+    latency_max_ms = models.IntegerField(null=True, blank=True)
+    histogram = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ['-minute']
+        constraints = [
+            models.UniqueConstraint(fields=['endpoint', 'method', 'minute'], name='team7_apilog_rollup_minute_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} @ {self.minute:%Y-%m-%d %H:%M} ({self.request_count} requests)"
+
+class JobStatus(models.TextChoices):
+    QUEUED = 'queued', _('Queued')
+    RUNNING = 'running', _('Running')
+    SUCCEEDED = 'succeeded', _('Succeeded')
+    FAILED = 'failed', _('Failed')
+
+
+class EvaluationJob(models.Model):
+    """Queued writing/speaking evaluation, run by the workers in team7.jobs.
+
+    The table itself is the queue: workers claim the oldest due job with a
+    conditional UPDATE, so no message broker is needed.
+    """
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user_id = models.UUIDField(help_text="Reference to Core User UUID")
+    question_id = models.UUIDField()
+    task_type = models.CharField(max_length=20, choices=TaskType.choices)
+    payload = models.JSONField(default=dict, help_text="Essay text, or stored audio path/name for speaking")
+
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    next_attempt_at = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+
+    # Same body/status the synchronous endpoints used to return.
+    result = models.JSONField(null=True, blank=True)
+    result_status_code = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='team7_job_due_idx'),
+            models.Index(fields=['user_id', '-created_at'], name='team7_job_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} - {self.task_type} - {self.status}"
@@ -0,0 +1,136 @@
+"""Persistence for evaluations and their criterion scores (SDD Layer 3).
+
+`save_evaluation` writes one Evaluation and all of its DetailedScore rows in
+a single transaction (one INSERT each for the evaluation and, via
+bulk_create, the scores). `evaluation_response` builds the API payload from
+those in-memory objects, so nothing is read back.
+`bulk_import_evaluations` loads large batches of historical evaluations in
+chunked transactions. Both keep the per-user analytics (team7.analytics)
+up to date.
+"""
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+
+from .analytics import record_evaluation, recompute_user_analytics
+from .models import DetailedScore, Evaluation
+
+DB_ALIAS = 'team7'
+_ONE_DECIMAL = Decimal('0.1')
+
+
+def _score(value):
+    """Round like the DECIMAL(3, 1) columns do, so responses match what is stored."""
+    if value is None or value == '':
+        return None
+    try:
+        return Decimal(str(value)).quantize(_ONE_DECIMAL)
+    except InvalidOperation:
+        return None
+
+
+def _detailed_scores(evaluation, criteria):
+    return [
+        DetailedScore(
+            evaluation=evaluation,
+            criterion=crit.get('name'),
+            score_value=_score(crit.get('score')),
+            comment=crit.get('comment'),
+        )
+        for crit in criteria or []
+    ]
+
+
+def save_evaluation(*, user_id, question, task_type, result, rubric_version,
+                    submitted_text=None, audio_path=None, transcript_text=None):
+    """Atomically store an LLM result. Returns (evaluation, detailed_scores)."""
+    evaluation = Evaluation(
+        user_id=user_id,
+        question=question,
+        exam=question.exam,  # Save exam reference for history tracking
+        task_type=task_type,
+        submitted_text=submitted_text,
+        audio_path=audio_path,
+        transcript_text=transcript_text,
+        overall_score=_score(result.get('overall_score')),
+        ai_feedback=result.get('feedback'),
+        rubric_version_id=rubric_version,
+    )
+    scores = _detailed_scores(evaluation, result.get('criteria'))
+
+    with transaction.atomic(using=DB_ALIAS):
+        evaluation.save(using=DB_ALIAS)
+        DetailedScore.objects.using(DB_ALIAS).bulk_create(scores)
+        record_evaluation(evaluation)
+
+    return evaluation, scores
+
+
+def evaluation_response(evaluation, scores, **extra):
+    """FR-API-02 response body, from the objects save_evaluation returned."""
+    response = {
+        "status": "success",
+        "evaluation_id": str(evaluation.evaluation_id),
+        "overall_score": float(evaluation.overall_score) if evaluation.overall_score else None,
+        "feedback": evaluation.ai_feedback,
+        **extra,
+        "criteria": [
+            {
+                "name": ds.criterion,
+                "score": float(ds.score_value),
+                "comment": ds.comment
+            }
+            for ds in scores
+        ],
+        "created_at": evaluation.created_at.isoformat()
+    }
+    return response
+
+
+def bulk_import_evaluations(records, chunk_size=500):
+    """Insert historical evaluations in chunks, one transaction per chunk.
+
+    Each record is a dict with the Evaluation fields (user_id, question or
+    question_id, exam or exam_id, task_type, submitted_text, audio_path,
+    transcript_text, overall_score, ai_feedback, rubric_version_id and an
+    optional created_at) plus `criteria`: [{'name', 'score', 'comment'}].
+
+    Returns the number of evaluations inserted.
+    """
+    fields = {f.name for f in Evaluation._meta.concrete_fields} | {'question_id', 'exam_id'}
+    records = iter(records)
+    total = 0
+    user_ids = set()
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        evaluations, created_at, scores = [], [], []
+        for record in chunk:
+            evaluation = Evaluation(**{k: v for k, v in record.items() if k in fields and k != 'created_at'})
+            evaluation.overall_score = _score(evaluation.overall_score)
+            evaluations.append(evaluation)
+            user_ids.add(evaluation.user_id)
+            created_at.append(record.get('created_at'))
+            scores.extend(_detailed_scores(evaluation, record.get('criteria')))
+
+        with transaction.atomic(using=DB_ALIAS):
+            Evaluation.objects.using(DB_ALIAS).bulk_create(evaluations)
+            # created_at is auto_now_add, so historical timestamps are applied afterwards.
+            backdated = []
+            for evaluation, when in zip(evaluations, created_at):
+                if when is not None:
+                    evaluation.created_at = when
+                    backdated.append(evaluation)
+            if backdated:
+                Evaluation.objects.using(DB_ALIAS).bulk_update(backdated, ['created_at'])
+            DetailedScore.objects.using(DB_ALIAS).bulk_create(scores)
+
+        total += len(evaluations)
+
+    # Imported rows can be older than what the analytics have seen, so rebuild them.
+    recompute_user_analytics(user_ids)
+    return total
@@ -1,7 +1,15 @@
 import os
+from .llm.cached_client import CachedLLMClient
 from .llm.openai_client import OpenAIClient
+from .llm.rate_limiter import RateLimitedClient, RateLimiter
 from .pipeline.scorer import TOEFLScorer
 
+# Shared by every essay scored in this process (replaces the old 1 s sleeps).
+_rate_limiter = RateLimiter(
+    rate=float(os.getenv("SCORING_LLM_RATE", "4")),
+    burst=int(os.getenv("SCORING_LLM_BURST", "4")),
+)
+
 
 def score_essay(essay: str, question: str) -> float:
     """
@@ -12,12 +20,23 @@ def score_essay(essay: str, question: str) -> float:
     if not api_key:
         raise ValueError("OPENAI_API_KEY is not set")
 
+    model = "gpt-4o-mini"
     client = OpenAIClient(
         api_key=api_key,
-        model="gpt-4o-mini",
+        model=model,
         base_url="https://api.gpt4-all.xyz/v1"
     )
 
+    # Cache outermost, so cached answers do not use up rate-limit tokens.
+    client = RateLimitedClient(client, _rate_limiter)
+    try:
+        from core.llm_cache import get_llm_response_cache
+        cache = get_llm_response_cache()
+    except Exception:  # engine used outside the Django project
+        cache = None
+    if cache is not None:
+        client = CachedLLMClient(client, cache, model=model, rubric_version="scoring_engine_v1")
+
     scorer = TOEFLScorer(client)
 
     result = scorer.score(
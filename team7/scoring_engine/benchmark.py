@@ -0,0 +1,59 @@
+"""
+Wall-clock time of TOEFLScorer.score on the essays in tests/*.json, using a
+stub LLM client with configurable latency (no network).
+
+  legacy      one agent at a time, paced at 1 call/s (what the fixed sleeps did)
+  sequential  one agent at a time, no pacing
+  concurrent  the four agents in parallel behind the shared rate limiter
+
+Run from this directory:
+    python benchmark.py
+    python benchmark.py --latency 1.5 --jitter 0.3 --rate 8
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from llm.rate_limiter import RateLimiter
+from llm.stub_client import StubLLMClient
+from pipeline.scorer import TOEFLScorer
+
+FIXTURES = Path(__file__).resolve().parent / "tests"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per LLM call")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--rate", type=float, default=4.0, help="calls/s allowed by the shared limiter")
+    parser.add_argument("--burst", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    cases = [json.loads(p.read_text(encoding="utf-8")) for p in sorted(FIXTURES.glob("*.json"))]
+    client = StubLLMClient(latency=args.latency, jitter=args.jitter)
+
+    modes = {
+        "legacy": TOEFLScorer(client, concurrent=False, rate_limiter=RateLimiter(rate=1.0)),
+        "sequential": TOEFLScorer(client, concurrent=False),
+        "concurrent": TOEFLScorer(
+            client, max_workers=args.workers, rate_limiter=RateLimiter(rate=args.rate, burst=args.burst)
+        ),
+    }
+
+    print(f"{len(cases)} essays, stub latency {args.latency}s ±{args.jitter}s")
+    print(f"{'mode':<12} {'mean s':>8} {'max s':>8}  band scores")
+    for name, scorer in modes.items():
+        timings, bands = [], []
+        for case in cases:
+            started = time.perf_counter()
+            result = scorer.score(essay=case["essay"], question=case["question"])
+            timings.append(time.perf_counter() - started)
+            bands.append(result["band_score"])
+        print(f"{name:<12} {statistics.mean(timings):>8.2f} {max(timings):>8.2f}  {bands}")
+
+
+if __name__ == "__main__":
+    main()
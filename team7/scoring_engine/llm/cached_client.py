@@ -0,0 +1,29 @@
+from llm.base_client import BaseLLMClient
+
+
+class CachedLLMClient(BaseLLMClient):
+    """
+    Serves repeated (system prompt, user prompt) pairs from a response cache.
+
+    `cache` is any object with the `cached_call` interface of
+    core.llm_cache.LLMResponseCache; the engine itself stays free of Django.
+    Error answers from the wrapped client are not cached.
+    """
+
+    def __init__(self, client: BaseLLMClient, cache, model: str, rubric_version: str = "", temperature: float = 0.2):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.rubric_version = rubric_version
+        self.temperature = temperature
+
+    def generate(self, system_prompt: str, user_prompt: str) -> str:
+        return self.cache.cached_call(
+            lambda: self.client.generate(system_prompt, user_prompt),
+            model=self.model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=self.temperature,
+            rubric_version=self.rubric_version,
+            validate=lambda text: "Error:" not in text,
+        )
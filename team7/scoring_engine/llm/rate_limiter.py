@@ -0,0 +1,42 @@
+import threading
+import time
+
+from llm.base_client import BaseLLMClient
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread that calls the same provider:
+    at most `rate` calls per second on average, bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedClient(BaseLLMClient):
+    """Wraps any client so each generate() first takes a token from `limiter`."""
+
+    def __init__(self, client: BaseLLMClient, limiter: RateLimiter):
+        self.client = client
+        self.limiter = limiter
+
+    def generate(self, system_prompt: str, user_prompt: str) -> str:
+        self.limiter.acquire()
+        return self.client.generate(system_prompt, user_prompt)
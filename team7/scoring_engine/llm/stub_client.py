@@ -0,0 +1,25 @@
+import random
+import threading
+import time
+
+from llm.base_client import BaseLLMClient
+
+
+class StubLLMClient(BaseLLMClient):
+    """
+    Offline client for tests and benchmarks: sleeps `latency` seconds
+    (+/- `jitter`) and answers in the format the agents parse.
+    """
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0, score: int = 4):
+        self.latency = latency
+        self.jitter = jitter
+        self.score = score
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, system_prompt: str, user_prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        return f"Score: {self.score}\nEXPLANATION: stub response"
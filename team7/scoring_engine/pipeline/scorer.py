@@ -1,27 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from agents.task_agent import TaskAgent
 from agents.organization_agent import OrganizationAgent
 from agents.development_agent import DevelopmentAgent
 from agents.language_agent import LanguageAgent
 from core.score_fusion import compute_holistic_score, to_scaled_score
-import time
+from llm.rate_limiter import RateLimitedClient
+
 
 class TOEFLScorer:
-    def __init__(self, llm_client):
+    """
+    Runs the four analytic agents and fuses their scores.
+
+    The agents are independent, so by default their LLM calls run in parallel on
+    up to `max_workers` threads (concurrent=False runs them one by one). Pass a
+    shared `rate_limiter` to keep the provider's request rate in check instead
+    of sleeping between calls.
+    """
+
+    def __init__(self, llm_client, concurrent=True, max_workers=4, rate_limiter=None):
+        if rate_limiter is not None:
+            llm_client = RateLimitedClient(llm_client, rate_limiter)
         self.task_agent = TaskAgent(llm_client)
         self.org_agent = OrganizationAgent(llm_client)
         self.dev_agent = DevelopmentAgent(llm_client)
         self.lang_agent = LanguageAgent(llm_client)
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+
+    def _calls(self, essay, question):
+        return {
+            "task": lambda: self.task_agent.evaluate(essay, question),
+            "organization": lambda: self.org_agent.evaluate(essay),
+            "development": lambda: self.dev_agent.evaluate(essay),
+            "language": lambda: self.lang_agent.evaluate(essay),
+        }
 
     def score(self, essay, question):
-        results = {}
-        
-        results["task"] = self.task_agent.evaluate(essay, question)
-        time.sleep(1)
-        results["organization"] = self.org_agent.evaluate(essay)
-        time.sleep(1)
-        results["development"] = self.dev_agent.evaluate(essay)
-        time.sleep(1)
-        results["language"] = self.lang_agent.evaluate(essay)
+        calls = self._calls(essay, question)
+
+        if self.concurrent and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls))) as pool:
+                futures = {name: pool.submit(fn) for name, fn in calls.items()}
+                results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {name: fn() for name, fn in calls.items()}
 
         analytic_scores = {k: v["score"] for k, v in results.items()}
 
@@ -32,4 +55,4 @@ class TOEFLScorer:
             "analytic": results,
             "band_score": round(band, 1),
             "scaled_score": int(scaled) 
-        }
\ No newline at end of file
+        }
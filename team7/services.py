@@ -2,12 +2,14 @@ import json
 import logging
 import uuid
 import os
-import time
-import requests
 from django.conf import settings
 from django.utils import timezone
 from openai import OpenAI
-from .models import Evaluation, DetailedScore, Question
+from core.llm_cache import cached_chat_client
+from .asr import get_soniox_client
+from .analytics import get_user_states, median_tenths
+from .models import Evaluation, Question, TaskType, UserAnalytics
+from .persistence import evaluation_response, save_evaluation
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +27,10 @@ class WritingEvaluator:
 
     def __init__(self):
         """Initialize LLM client from Django settings."""
-        self.client = OpenAI(
+        self.client = cached_chat_client(OpenAI(
             api_key=getattr(settings, 'AI_GENERATOR_API_KEY', 'PLACEHOLDER_KEY'),
             base_url=getattr(settings, 'AI_GENERATOR_BASE_URL', 'https://api.gpt4-all.xyz/v1')
-        )
+        ), rubric_version=self.RUBRIC_VERSION)
         self.model = getattr(settings, 'AI_GENERATOR_MODEL', 'gemini-3-flash-preview')
 
     def validate_length(self, text):
@@ -120,10 +122,10 @@ class SpeakingEvaluator:
     def __init__(self):
         """Initialize OpenAI client for LLM and Soniox configuration for ASR."""
         # LLM client for evaluation
-        self.client = OpenAI(
+        self.client = cached_chat_client(OpenAI(
             api_key=getattr(settings, 'AI_GENERATOR_API_KEY', 'PLACEHOLDER_KEY'),
             base_url=getattr(settings, 'AI_GENERATOR_BASE_URL', 'https://api.gpt4-all.xyz/v1')
-        )
+        ), rubric_version=self.RUBRIC_VERSION)
         self.model = getattr(settings, 'AI_GENERATOR_MODEL', 'gemini-3-flash-preview')
         
         # Soniox ASR configuration
@@ -158,164 +160,18 @@ class SpeakingEvaluator:
     def transcribe_audio(self, audio_file, timeout=120):
         """Transcribe audio to text using Soniox Async API (ASR).
         
+        Uses the process-wide client in team7.asr (pooled connections,
+        streamed upload, background cleanup).
+        
         Args:
-            audio_file: Django UploadedFile object or file path
+            audio_file: Django UploadedFile / File object
             timeout: Maximum time to wait for transcription completion (seconds)
             
         Returns:
             dict: {'transcript': str, 'language': str} OR None on failure
         """
-        session = requests.Session()
-        session.headers['Authorization'] = f'Bearer {self.soniox_api_key}'
-        
-        file_id = None
-        transcription_id = None
-        
-        try:
-            # Step 1: Upload audio file to Soniox
-            logger.info(f"Starting Soniox ASR transcription for file: {audio_file.name if hasattr(audio_file, 'name') else 'unknown'}")
-            
-            # Reset file pointer to beginning
-            audio_file.seek(0)
-            
-            # Detect MIME type based on file extension
-            file_ext = os.path.splitext(audio_file.name)[1].lower() if hasattr(audio_file, 'name') else ''
-            mime_type_map = {
-                '.mp3': 'audio/mpeg',
-                '.wav': 'audio/wav',
-                '.flac': 'audio/flac',
-                '.m4a': 'audio/mp4',
-                '.mp4': 'audio/mp4',
-                '.ogg': 'audio/ogg',
-                '.webm': 'audio/webm',
-                '.aac': 'audio/aac',
-                '.aiff': 'audio/aiff',
-                '.amr': 'audio/amr',
-                '.asf': 'audio/x-ms-asf',
-            }
-            mime_type = mime_type_map.get(file_ext, 'audio/mpeg')
-            logger.info(f"Audio file extension: {file_ext}, MIME type: {mime_type}")
-            
-            # Upload file
-            logger.info("Uploading audio file to Soniox...")
-            files = {'file': (audio_file.name, audio_file, mime_type)}
-            upload_response = session.post(
-                f"{self.soniox_base_url}/v1/files",
-                files=files
-            )
-            
-            if not upload_response.ok:
-                logger.error(f"Soniox file upload failed: {upload_response.status_code}")
-                logger.error(f"Response body: {upload_response.text}")
-            
-            upload_response.raise_for_status()
-            file_id = upload_response.json()['id']
-            logger.info(f"File uploaded successfully. File ID: {file_id}")
-            
-            # Step 2: Create transcription request
-            logger.info("Creating transcription request...")
-            transcription_config = {
-                "model": self.soniox_model,
-                "file_id": file_id,
-                "language_hints": ["en"],  # TOEFL is English-only
-                "enable_language_identification": False,
-                "enable_speaker_diarization": False,
-            }
-            
-            create_response = session.post(
-                f"{self.soniox_base_url}/v1/transcriptions",
-                json=transcription_config
-            )
-            
-            if not create_response.ok:
-                logger.error(f"Soniox transcription creation failed: {create_response.status_code}")
-                logger.error(f"Response body: {create_response.text}")
-            
-            create_response.raise_for_status()
-            transcription_id = create_response.json()['id']
-            logger.info(f"Transcription created. Transcription ID: {transcription_id}")
-            
-            # Step 3: Poll for completion
-            logger.info("Waiting for transcription to complete...")
-            start_time = time.time()
-            while True:
-                if time.time() - start_time > timeout:
-                    logger.error(f"Soniox ASR timeout after {timeout}s")
-                    return None
-                
-                status_response = session.get(
-                    f"{self.soniox_base_url}/v1/transcriptions/{transcription_id}"
-                )
-                status_response.raise_for_status()
-                status_data = status_response.json()
-                
-                logger.info(f"Transcription status: {status_data.get('status')}")
-                
-                if status_data['status'] == 'completed':
-                    logger.info("Transcription completed successfully")
-                    break
-                elif status_data['status'] == 'error':
-                    error_msg = status_data.get('error_message', 'Unknown error')
-                    logger.error(f"Soniox ASR error: {error_msg}")
-                    logger.error(f"Full error response: {status_data}")
-                    return None
-                    
-                # Wait before polling again
-                time.sleep(1)
-            
-            # Step 4: Get transcript
-            logger.info("Fetching transcript...")
-            transcript_response = session.get(
-                f"{self.soniox_base_url}/v1/transcriptions/{transcription_id}/transcript"
-            )
-            transcript_response.raise_for_status()
-            transcript_data = transcript_response.json()
-            
-            # Extract text from tokens
-            tokens = transcript_data.get('tokens', [])
-            logger.info(f"Received {len(tokens)} tokens from Soniox")
-            
-            if not tokens:
-                logger.error("Soniox returned empty token list")
-                logger.error(f"Full transcript response: {transcript_data}")
-                return None
-            
-            transcript_text = ''.join([token['text'] for token in tokens]).strip()
-            
-            # Check if speech was detected (FR-SP validation)
-            if not transcript_text or len(transcript_text) < 10:
-                logger.warning(f"Soniox ASR: Transcript too short. Length: {len(transcript_text)} chars")
-                logger.warning(f"Transcript text: '{transcript_text}'")
-                return None
-            
-            logger.info(f"Soniox ASR transcription successful. Length: {len(transcript_text)} chars")
-            
-            return {
-                'transcript': transcript_text,
-                'language': 'en',
-                'token_count': len(tokens)
-            }
-            
-        except requests.exceptions.Timeout:
-            logger.error(f"Soniox API timeout after {timeout}s")
-            return None
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Soniox API request error: {str(e)}")
-            return None
-        except Exception as e:
-            logger.error(f"Soniox ASR transcription error: {str(e)}")
-            return None
-        finally:
-            # Cleanup: Delete transcription and file
-            try:
-                if transcription_id:
-                    logger.info(f"Cleaning up transcription: {transcription_id}")
-                    session.delete(f"{self.soniox_base_url}/v1/transcriptions/{transcription_id}")
-                if file_id:
-                    logger.info(f"Cleaning up uploaded file: {file_id}")
-                    session.delete(f"{self.soniox_base_url}/v1/files/{file_id}")
-            except Exception as cleanup_error:
-                logger.warning(f"Cleanup error (non-critical): {str(cleanup_error)}")
+        logger.info(f"Starting Soniox ASR transcription for file: {getattr(audio_file, 'name', 'unknown')}")
+        return get_soniox_client().transcribe(audio_file, timeout=timeout)
 
     def analyze_speaking(self, transcript_text, question_obj, mode="independent"):
         """Analyze transcript using LLM for Speaking scoring.
@@ -428,47 +284,20 @@ class EvaluationService:
 
         # 4. Data Persistence (Layer 3)
         try:
-            # Use explicit 'team7' database to ensure data is saved to team's database
-            eval_obj = Evaluation.objects.using('team7').create(
+            # One transaction: the evaluation plus all criterion scores in a single bulk INSERT
+            eval_obj, scores = save_evaluation(
                 user_id=user_id,
                 question=question,
-                exam=question.exam,  # Save exam reference for history tracking
                 task_type="writing",
+                result=result,
+                rubric_version=WritingEvaluator.RUBRIC_VERSION,
                 submitted_text=text,
-                overall_score=result.get('overall_score'),
-                ai_feedback=result.get('feedback'),
-                rubric_version_id=WritingEvaluator.RUBRIC_VERSION
             )
 
-            logger.info(f"Created evaluation with user_id: {eval_obj.user_id} (type: {type(eval_obj.user_id)})")
-            
-            # Save detailed criterion scores
-            for crit in result.get('criteria', []):
-                DetailedScore.objects.using('team7').create(
-                    evaluation=eval_obj,
-                    criterion=crit.get('name'),
-                    score_value=crit.get('score'),
-                    comment=crit.get('comment')
-                )
-
             logger.info(f"Evaluation created: {eval_obj.evaluation_id} for user {user_id}")
 
-            # 5. Response (FR-API-02)
-            return {
-                "status": "success",
-                "evaluation_id": str(eval_obj.evaluation_id),
-                "overall_score": float(eval_obj.overall_score) if eval_obj.overall_score else None,
-                "feedback": eval_obj.ai_feedback,
-                "criteria": [
-                    {
-                        "name": ds.criterion,
-                        "score": float(ds.score_value),
-                        "comment": ds.comment
-                    }
-                    for ds in eval_obj.detailed_scores.all()
-                ],
-                "created_at": eval_obj.created_at.isoformat()
-            }, 200
+            # 5. Response (FR-API-02), built from the saved objects without re-reading them
+            return evaluation_response(eval_obj, scores), 200
 
         except Exception as e:
             logger.exception(f"Error saving evaluation for user {user_id}: {str(e)}")
@@ -477,7 +306,7 @@ class EvaluationService:
                 "message": "Failed to save evaluation."
             }, 500
 
-    def evaluate_speaking(self, user_id, question_id, audio_file, audio_filename=None):
+    def evaluate_speaking(self, user_id, question_id, audio_file, audio_filename=None, stored_audio_path=None):
         """End-to-end speaking evaluation workflow (UC-02).
         
         Args:
@@ -485,6 +314,7 @@ class EvaluationService:
             question_id: UUID of question
             audio_file: Django UploadedFile object
             audio_filename: Optional custom filename for storage
+            stored_audio_path: Storage path when the audio was already saved (queued jobs)
             
         Returns:
             tuple: (response_dict, http_status_code)
@@ -529,63 +359,39 @@ class EvaluationService:
         from django.core.files.storage import default_storage
         from django.core.files.base import ContentFile
         
-        # Reset file pointer to beginning
-        audio_file.seek(0)
-        
-        # Generate unique filename
-        file_extension = os.path.splitext(audio_file.name)[1]
-        unique_filename = f"speaking/{user_id}/{uuid.uuid4()}{file_extension}"
-        
-        try:
-            audio_path = default_storage.save(unique_filename, ContentFile(audio_file.read()))
-            logger.info(f"Audio file saved to: {audio_path}")
-        except Exception as e:
-            logger.error(f"Failed to save audio file: {str(e)}")
-            audio_path = f"uploads/{unique_filename}"  # Fallback path
+        if stored_audio_path:
+            audio_path = stored_audio_path
+        else:
+            # Reset file pointer to beginning
+            audio_file.seek(0)
+
+            # Generate unique filename
+            file_extension = os.path.splitext(audio_file.name)[1]
+            unique_filename = f"speaking/{user_id}/{uuid.uuid4()}{file_extension}"
+
+            try:
+                audio_path = default_storage.save(unique_filename, ContentFile(audio_file.read()))
+                logger.info(f"Audio file saved to: {audio_path}")
+            except Exception as e:
+                logger.error(f"Failed to save audio file: {str(e)}")
+                audio_path = f"uploads/{unique_filename}"  # Fallback path
 
         # 6. Data Persistence (Layer 3)
         try:
-            # Use explicit 'team7' database to ensure data is saved to team's database
-            eval_obj = Evaluation.objects.using('team7').create(
+            eval_obj, scores = save_evaluation(
                 user_id=user_id,
                 question=question,
-                exam=question.exam,  # Save exam reference for history tracking
                 task_type="speaking",
+                result=result,
+                rubric_version=SpeakingEvaluator.RUBRIC_VERSION,
                 audio_path=audio_path,
                 transcript_text=transcript_text,
-                overall_score=result.get('overall_score'),
-                ai_feedback=result.get('feedback'),
-                rubric_version_id=SpeakingEvaluator.RUBRIC_VERSION
             )
 
-            # Save detailed criterion scores
-            for crit in result.get('criteria', []):
-                DetailedScore.objects.using('team7').create(
-                    evaluation=eval_obj,
-                    criterion=crit.get('name'),
-                    score_value=crit.get('score'),
-                    comment=crit.get('comment')
-                )
-
             logger.info(f"Speaking evaluation created: {eval_obj.evaluation_id} for user {user_id}")
 
             # 7. Response (FR-API-02)
-            return {
-                "status": "success",
-                "evaluation_id": str(eval_obj.evaluation_id),
-                "overall_score": float(eval_obj.overall_score) if eval_obj.overall_score else None,
-                "feedback": eval_obj.ai_feedback,
-                "transcript": transcript_text,
-                "criteria": [
-                    {
-                        "name": ds.criterion,
-                        "score": float(ds.score_value),
-                        "comment": ds.comment
-                    }
-                    for ds in eval_obj.detailed_scores.all()
-                ],
-                "created_at": eval_obj.created_at.isoformat()
-            }, 200
+            return evaluation_response(eval_obj, scores, transcript=transcript_text), 200
 
         except Exception as e:
             logger.exception(f"Error saving speaking evaluation for user {user_id}: {str(e)}")
@@ -748,22 +554,49 @@ class AnalyticsService:
             'count': n
         }
 
+    def _scope_analytics(self, state, with_moving_average=False):
+        """Statistics/improvement (and moving average) from a UserAnalytics row."""
+        if state is None or not state.count:
+            statistics = self.calculate_statistics([])
+            improvement = self.calculate_improvement_rate([])
+        else:
+            statistics = {
+                'mean': round(state.score_sum / state.count / 10, 2),
+                'min': state.min_score / 10,
+                'max': state.max_score / 10,
+                'median': round(median_tenths(state) / 10, 2),
+                'count': state.count
+            }
+            improvement = self.calculate_improvement_rate(
+                [state.first_score / 10, state.last_score / 10] if state.count >= 2 else []
+            )
+        analytics = {'statistics': statistics, 'improvement': improvement}
+        if with_moving_average:
+            recent = [tenths / 10 for tenths in (state.recent_scores if state else [])]
+            analytics['moving_average'] = self.calculate_moving_average(recent, window_size=3)
+        return analytics
+
     def get_user_analytics(self, user_id, limit=50):
         """Enhanced analytics with trends and statistics (UC-03).
+
+        Statistics come from the incrementally maintained UserAnalytics rows
+        (team7.analytics) and cover all of the user's scored evaluations;
+        the moving average covers the latest analytics.RECENT_WINDOW scores.
         
         Args:
             user_id: UUID of student
-            limit: Max records to analyze
+            limit: Max attempts to return
             
         Returns:
             tuple: (response_dict, http_status_code)
         """
         try:
-            evaluations = Evaluation.objects.filter(
-                user_id=user_id
-            ).select_related('question').prefetch_related('detailed_scores').order_by('-created_at')[:limit]
+            evaluations = list(
+                Evaluation.objects.using('team7').filter(user_id=user_id)
+                .prefetch_related('detailed_scores').order_by('-created_at')[:limit]
+            )
 
-            if not evaluations.exists():
+            if not evaluations:
                 logger.info(f"No evaluations found for user {user_id}")
                 return {
                     "status": "no_data",
@@ -772,31 +605,12 @@ class AnalyticsService:
                     "analytics": None
                 }, 200
 
-            # Reverse to get chronological order for trend calculation
-            evaluations_list = list(evaluations)
-            evaluations_list.reverse()
-
-            # Extract scores by task type
-            writing_scores = []
-            speaking_scores = []
-            all_scores = []
-            attempts = []
-
-            for eval_obj in evaluations_list:
-                score = float(eval_obj.overall_score) if eval_obj.overall_score else None
-                
-                if score is not None:
-                    all_scores.append(score)
-                    if eval_obj.task_type == 'writing':
-                        writing_scores.append(score)
-                    elif eval_obj.task_type == 'speaking':
-                        speaking_scores.append(score)
-                
-                attempts.append({
+            attempts = [
+                {
                     "evaluation_id": str(eval_obj.evaluation_id),
                     "task_type": eval_obj.task_type,
-                    "question_id": str(eval_obj.question.question_id),
-                    "overall_score": score,
+                    "question_id": str(eval_obj.question_id),
+                    "overall_score": float(eval_obj.overall_score) if eval_obj.overall_score else None,
                     "created_at": eval_obj.created_at.isoformat(),
                     "criteria": [
                         {
@@ -805,26 +619,19 @@ class AnalyticsService:
                         }
                         for ds in eval_obj.detailed_scores.all()
                     ]
-                })
+                }
+                for eval_obj in evaluations
+            ]
 
-            # Reverse attempts back to descending order for display
-            attempts.reverse()
+            states = get_user_states(user_id)
+            writing = states.get(TaskType.WRITING)
+            speaking = states.get(TaskType.SPEAKING)
 
             # Calculate analytics
             analytics = {
-                'overall': {
-                    'statistics': self.calculate_statistics(all_scores),
-                    'improvement': self.calculate_improvement_rate(all_scores),
-                    'moving_average': self.calculate_moving_average(all_scores, window_size=3)
-                },
-                'writing': {
-                    'statistics': self.calculate_statistics(writing_scores),
-                    'improvement': self.calculate_improvement_rate(writing_scores),
-                } if writing_scores else None,
-                'speaking': {
-                    'statistics': self.calculate_statistics(speaking_scores),
-                    'improvement': self.calculate_improvement_rate(speaking_scores),
-                } if speaking_scores else None
+                'overall': self._scope_analytics(states.get(UserAnalytics.SCOPE_ALL), with_moving_average=True),
+                'writing': self._scope_analytics(writing) if writing and writing.count else None,
+                'speaking': self._scope_analytics(speaking) if speaking and speaking.count else None
             }
 
             logger.info(f"Analytics calculated for user {user_id}: {analytics['overall']['statistics']['count']} evaluations")
@@ -841,4 +648,4 @@ class AnalyticsService:
             return {
                 "error": "INTERNAL_ERROR",
                 "message": "Failed to retrieve analytics."
-            }, 500
\ No newline at end of file
+            }, 500
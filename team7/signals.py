@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import invalidate_exam_catalog
+from .models import Exam, Question
+
+
+@receiver(post_save, sender=Exam)
+@receiver(post_delete, sender=Exam)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_catalog(sender, instance, **kwargs):
+    invalidate_exam_catalog()
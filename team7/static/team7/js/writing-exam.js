@@ -50,6 +50,27 @@ async function fetchExamFromAPI(examId) {
     }
 }
 
+/**
+ * Poll a queued evaluation job until it succeeds or fails
+ * @param {string} statusUrl - status_url returned with the 202 response
+ * @returns {Promise<Object>} Finished job ({status, status_code, result})
+ */
+async function waitForEvaluationJob(statusUrl, intervalMs = 2000, timeoutMs = 5 * 60 * 1000) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+        const response = await fetch(statusUrl, { headers: { 'Content-Type': 'application/json' } });
+        if (!response.ok) {
+            throw new Error(`خطای API: ${response.status}`);
+        }
+        const job = await response.json();
+        if (job.status === 'succeeded' || job.status === 'failed') {
+            return job;
+        }
+    }
+    throw new Error('زمان ارزیابی به پایان رسید. لطفاً بعداً نتیجه را در تاریخچه بررسی کنید.');
+}
+
 // ==================== INITIALIZATION ====================
 /**
  * Initialize exam - fetches from API
@@ -514,16 +535,24 @@ async function submitExam() {
                         })
                     });
 
-                    const result = await response.json();
+                    let result = await response.json();
+                    let status = response.status;
+
+                    // Evaluation runs in the background: poll the job until it finishes.
+                    if (status === 202) {
+                        const job = await waitForEvaluationJob(result.status_url);
+                        result = job.result || {};
+                        status = job.status_code || 500;
+                    }
 
-                    if (!response.ok) {
+                    if (status < 200 || status >= 300) {
                         // Handle specific error codes
-                        if (response.status === 503) {
+                        if (status === 503) {
                             throw new Error('سرویس ارزیابی موقتاً در دسترس نیست. لطفاً دوباره تلاش کنید.');
-                        } else if (response.status === 400) {
+                        } else if (status === 400) {
                             throw new Error(result.error || 'ورودی نامعتبر');
                         } else {
-                            throw new Error(`خطای API: ${response.status}`);
+                            throw new Error(`خطای API: ${status}`);
                         }
                     }
 
@@ -1,6 +1,293 @@
-from django.test import TestCase
+import uuid
+
+from django.test import SimpleTestCase, TestCase, override_settings
 
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team7/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+@override_settings(TEAM7_EVAL_INPROCESS_WORKERS=0, TEAM7_EVAL_RETRY_BASE_SECONDS=0)
+class EvaluationJobTests(TestCase):
+    databases = {"default", "team7"}
+
+    def test_claim_retry_and_finish(self):
+        from unittest import mock
+        from team7 import jobs
+        from team7.models import EvaluationJob, JobStatus, Question
+
+        question = Question.objects.using("team7").create(prompt_text="Q?")
+        body, status = jobs.enqueue_writing(uuid.uuid4(), question.question_id, "word " * 60)
+        self.assertEqual(status, 202)
+
+        service = mock.Mock()
+        service.evaluate_writing.side_effect = [
+            ({"error": "SERVICE_UNAVAILABLE"}, 503),
+            ({"status": "success", "overall_score": 4.0}, 200),
+        ]
+
+        job = jobs.claim_next_job("w1")
+        self.assertIsNone(jobs.claim_next_job("w2"))  # already taken
+        jobs.run_job(job, service)
+        self.assertEqual(EvaluationJob.objects.using("team7").get().status, JobStatus.QUEUED)
+
+        jobs.run_job(jobs.claim_next_job("w2"), service)
+        job = EvaluationJob.objects.using("team7").get()
+        self.assertEqual((job.status, job.attempts), (JobStatus.SUCCEEDED, 2))
+        self.assertEqual(jobs.job_status_payload(job)["result"]["overall_score"], 4.0)
+
+    def test_jobs_belong_to_the_authenticated_user_and_polling_starts_workers(self):
+        from unittest import mock
+        from core.jwt_utils import create_access_token
+        from core.models import User
+        from team7 import views
+        from team7.models import EvaluationJob, Question
+
+        user = User.objects.create_user(email="w@test.com", password="pass1234", first_name="W")
+        self.client.cookies["access_token"] = create_access_token(user)
+        question = Question.objects.using("team7").create(prompt_text="Q?")
+
+        res = self.client.post("/team7/api/submit-writing/", {
+            "user_id": str(uuid.uuid4()),  # ignored
+            "question_id": str(question.question_id),
+            "text": "word " * 60,
+        }, content_type="application/json")
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(EvaluationJob.objects.using("team7").get().user_id, user.id)
+
+        with mock.patch.object(views, "ensure_workers_started") as start:
+            res = self.client.get(res.json()["status_url"])
+        self.assertEqual(res.status_code, 200)
+        start.assert_called_once()
+
+    def test_heartbeat_keeps_live_leases_and_dead_ones_expire(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from team7 import jobs
+        from team7.models import EvaluationJob, JobStatus, Question
+
+        question = Question.objects.using("team7").create(prompt_text="Q?")
+        for _ in range(2):
+            jobs.enqueue_writing(uuid.uuid4(), question.question_id, "word " * 60)
+        pool = jobs.EvaluationWorkerPool(1)
+        live, dead = EvaluationJob.objects.using("team7").all()
+        stale = timezone.now() - timedelta(seconds=jobs._lease_seconds() + 1)
+        EvaluationJob.objects.using("team7").filter(job_id=live.job_id).update(
+            status=JobStatus.RUNNING, locked_at=stale, locked_by=pool.worker_ids[0]
+        )
+        EvaluationJob.objects.using("team7").filter(job_id=dead.job_id).update(
+            status=JobStatus.RUNNING, locked_at=stale, locked_by="gone:1:0"
+        )
+
+        self.assertEqual(pool.renew_leases(), 1)
+        self.assertEqual(jobs.claim_next_job("w1").job_id, dead.job_id)
+        self.assertIsNone(jobs.claim_next_job("w2"))
+
+    def test_stale_worker_cannot_overwrite_the_new_owners_result(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from team7 import jobs
+        from team7.models import EvaluationJob, JobStatus, Question
+
+        question = Question.objects.using("team7").create(prompt_text="Q?")
+        jobs.enqueue_writing(uuid.uuid4(), question.question_id, "word " * 60)
+        stale = jobs.claim_next_job("w1")
+        EvaluationJob.objects.using("team7").update(
+            locked_at=timezone.now() - timedelta(seconds=jobs._lease_seconds() + 1)
+        )
+        current = jobs.claim_next_job("w2")
+
+        service = mock.Mock()
+        service.evaluate_writing.return_value = ({"status": "success", "overall_score": 4.0}, 200)
+        jobs.run_job(current, service)
+        service.evaluate_writing.return_value = ({"error": "INVALID_INPUT"}, 400)
+        jobs.run_job(stale, service)
+
+        job = EvaluationJob.objects.using("team7").get()
+        self.assertEqual((job.status, job.result_status_code), (JobStatus.SUCCEEDED, 200))
+
+
+class EvaluationPersistenceTests(TestCase):
+    databases = {"default", "team7"}
+
+    def test_save_and_bulk_import(self):
+        from datetime import timedelta
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+        from team7.models import DetailedScore, Evaluation, Question
+        from team7.persistence import bulk_import_evaluations, evaluation_response, save_evaluation
+
+        question = Question.objects.using("team7").create(prompt_text="Q?")
+        result = {"overall_score": 3.75, "feedback": "ok",
+                  "criteria": [{"name": "Grammar", "score": 4.04, "comment": "c"}, {"name": "Vocabulary", "score": 3}]}
+        with CaptureQueriesContext(connections["team7"]) as queries:
+            evaluation, scores = save_evaluation(user_id=uuid.uuid4(), question=question, task_type="writing",
+                                                 result=result, rubric_version="v1", submitted_text="text")
+        score_inserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "team7_detailedscore"')]
+        self.assertEqual(len(score_inserts), 1)  # both criteria in one bulk INSERT
+        body = evaluation_response(evaluation, scores)
+        self.assertEqual(body["overall_score"], 3.8)
+        self.assertEqual([c["score"] for c in body["criteria"]], [4.0, 3.0])
+
+        old = timezone.now() - timedelta(days=30)
+        records = ({"user_id": uuid.uuid4(), "question_id": question.question_id, "task_type": "speaking",
+                    "overall_score": 4, "created_at": old, "criteria": [{"name": "Delivery", "score": 4}]}
+                   for _ in range(7))
+        self.assertEqual(bulk_import_evaluations(records, chunk_size=3), 7)
+        self.assertEqual(Evaluation.objects.using("team7").filter(created_at=old).count(), 7)
+        self.assertEqual(DetailedScore.objects.using("team7").count(), 9)
+
+
+class APILogPipelineTests(TestCase):
+    databases = {"default", "team7"}
+
+    def test_buffer_drops_when_full_and_compaction(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from team7.api_logging import APILogBuffer, compact_api_logs
+        from team7.models import APILog, APILogRollup
+
+        buffer = APILogBuffer(capacity=3, batch_size=10)
+        buffer._ensure_started = lambda: None  # flushed by hand below
+        minute = (timezone.now() - timedelta(days=10)).replace(second=0, microsecond=0)
+        for latency in (20, 300, 7000, 1):
+            buffer.append({"endpoint": "/team7/api/x/", "method": "GET", "status_code": 404, "latency_ms": latency,
+                           "timestamp": minute + timedelta(seconds=5), "error_body": b'{"error": "NOT_FOUND"}'})
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(buffer.stats()["dropped"], 1)
+        self.assertEqual(APILog.objects.using("team7").first().error_message, "NOT_FOUND")
+
+        self.assertEqual(compact_api_logs(timezone.now() - timedelta(days=1)), (3, 1))
+        rollup = APILogRollup.objects.using("team7").get()
+        self.assertEqual((rollup.minute, rollup.request_count, rollup.error_count), (minute, 3, 3))
+        self.assertEqual(rollup.histogram, [1, 0, 0, 1, 0, 0, 0, 1, 0])
+        self.assertFalse(APILog.objects.using("team7").exists())
+
+
+class HealthSnapshotTests(TestCase):
+    databases = {"default", "team7"}
+
+    def test_incremental_window_and_rate_limited_probe(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from team7.health import HealthMonitor, LatencySketch
+        from team7.models import APILog
+
+        sketch = LatencySketch()
+        for latency in range(1, 1001):
+            sketch.add(latency)
+        self.assertAlmostEqual(sketch.quantile(0.95), 950, delta=950 * 0.05)
+
+        now = timezone.now()
+        APILog.objects.using("team7").bulk_create(
+            [APILog(endpoint="/team7/api/a/", status_code=200, latency_ms=100, timestamp=now - timedelta(hours=1))
+             for _ in range(9)]
+            + [APILog(endpoint="/team7/api/b/", status_code=500, latency_ms=900, timestamp=now - timedelta(hours=1)),
+               APILog(endpoint="/team7/api/a/", status_code=200, latency_ms=5, timestamp=now - timedelta(hours=30))]
+        )
+        monitor = HealthMonitor()
+        monitor._llm_client = mock.Mock()
+        monitor._llm_client.models.list.return_value.data = ["model"]
+        monitor.refresh()
+        api = monitor.refresh()["checks"]["api_performance"]
+        self.assertEqual((api["total_requests_24h"], api["error_requests_24h"]), (10, 1))
+        self.assertEqual(api["slowest_endpoints"][0]["endpoint"], "/team7/api/b/")
+        self.assertEqual(monitor._llm_client.models.list.call_count, 1)
+
+
+class UserAnalyticsTests(TestCase):
+    databases = {"default", "team7"}
+
+    def test_incremental_state_matches_recompute(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from team7.analytics import recompute_user_analytics
+        from team7.models import Question, UserAnalytics
+        from team7.persistence import bulk_import_evaluations, save_evaluation
+        from team7.services import AnalyticsService
+
+        user_id = uuid.uuid4()
+        question = Question.objects.using("team7").create(prompt_text="Q?", task_type="speaking")
+        start = timezone.now() - timedelta(days=5)
+        bulk_import_evaluations({"user_id": user_id, "question": question, "task_type": "speaking",
+                                 "overall_score": score, "created_at": start + timedelta(hours=i)}
+                                for i, score in enumerate([2.0, 3.5, 3.0]))
+        for score in (4.0, 2.5):
+            save_evaluation(user_id=user_id, question=question, task_type="writing",
+                            result={"overall_score": score, "criteria": []}, rubric_version="v1")
+
+        body, status = AnalyticsService().get_user_analytics(str(user_id))
+        overall = body["analytics"]["overall"]
+        self.assertEqual(overall["statistics"], {"mean": 3.0, "min": 2.0, "max": 4.0, "median": 3.0, "count": 5})
+        self.assertEqual(overall["improvement"]["improvement"], 25.0)
+        self.assertEqual(overall["moving_average"], [None, None, 2.83, 3.5, 3.17])
+        self.assertEqual(body["analytics"]["writing"]["statistics"]["median"], 3.25)
+
+        incremental = {s.scope: (s.count, s.score_sum, s.histogram, s.recent_scores)
+                       for s in UserAnalytics.objects.using("team7").filter(user_id=user_id)}
+        recompute_user_analytics([user_id])
+        rebuilt = {s.scope: (s.count, s.score_sum, s.histogram, s.recent_scores)
+                   for s in UserAnalytics.objects.using("team7").filter(user_id=user_id)}
+        self.assertEqual(incremental, rebuilt)
+
+
+class ExamCatalogTests(TestCase):
+    databases = {"default", "team7"}
+
+    def test_cached_payload_etag_and_invalidation(self):
+        import json
+        from types import SimpleNamespace
+        from django.test import RequestFactory
+        from team7.models import Exam, Question
+        from team7.views import list_exams
+
+        def get(params="", etag=None):
+            headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+            request = RequestFactory().get(f"/team7/api/exams/{params}", **headers)
+            request.user = SimpleNamespace(is_authenticated=True)
+            return list_exams(request)
+
+        with self.captureOnCommitCallbacks(using="team7", execute=True):
+            exam = Exam.objects.using("team7").create(title="A", exam_type="writing", total_time=60)
+            Question.objects.using("team7").create(exam=exam, prompt_text="Q1")
+            Question.objects.using("team7").create(exam=exam, prompt_text="Q2")
+
+        with self.assertNumQueries(2, using="team7"):  # exams + prefetched questions
+            first = get()
+        with self.assertNumQueries(0, using="team7"):
+            self.assertEqual(get(etag=first["ETag"]).status_code, 304)
+        self.assertEqual(len(json.loads(first.content)["exams"][0]["questions"]), 2)
+        self.assertEqual(json.loads(get("?exam_type=speaking").content), {"exams": []})
+        self.assertEqual(get(f"?exam_id={exam.exam_id}")["ETag"], first["ETag"])
+        self.assertEqual(get(f"?exam_id={uuid.uuid4()}").status_code, 404)
+
+        with self.captureOnCommitCallbacks(using="team7", execute=True):
+            Question.objects.using("team7").create(exam=exam, prompt_text="Q3")
+            # Until the write commits, the version (and the cached payload) stays put.
+            self.assertEqual(get(etag=first["ETag"]).status_code, 304)
+        second = get(etag=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(json.loads(second.content)["exams"][0]["questions"]), 3)
+
+
+class SonioxClientTests(SimpleTestCase):
+    def test_transcribe_against_fake_server(self):
+        import io
+        from team7.asr import SonioxClient
+        from team7.fake_soniox import FakeSonioxServer
+
+        audio = io.BytesIO(b"\0" * 200_000)
+        audio.name = "answer.webm"
+        with FakeSonioxServer(processing_delay=0.3) as server:
+            client = SonioxClient("key", server.base_url, "stt-async-v4", poll_initial=0.05)
+            result = client.transcribe(audio, timeout=5)
+            client.reaper.join()
+
+            self.assertTrue(result["transcript"].startswith("I believe"))
+            # Whole multipart body arrived, cleanup ran in the background.
+            self.assertGreater(server.counters["bytes_uploaded"], 200_000)
+            self.assertEqual(server.counters["deletes"], 2)
@@ -12,6 +12,8 @@ team_patterns = [
     path('speaking-exam/', views.speaking_exam, name='speaking_exam'),
     path('api/submit-writing/', views.submit_writing, name='submit_writing'),
     path('api/submit-speaking/', views.submit_speaking, name='submit_speaking'),
+    path('api/jobs/<uuid:job_id>/', views.evaluation_job_status, name='evaluation_job_status'),
+    path('api/asr/soniox-webhook/', views.soniox_webhook, name='soniox_webhook'),
     path('api/submit-speaking-mock/', views.submit_speaking_mock, name='submit_speaking_mock'),
     path('api/history/', views.get_history, name='get_history'),
     path('api/v1/history/<str:user_id>/', views.get_history, name='get_history_v1'),
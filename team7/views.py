@@ -3,15 +3,17 @@ from django.http import HttpResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
 from core.auth import api_login_required
 import json
 import logging
-from django.db import connection
-from django.db import models
-from django.utils import timezone
-from datetime import timedelta
-from .models import Question, Evaluation, DetailedScore, APILog, Exam, TaskType
+import uuid
+from .models import Question, Evaluation, DetailedScore, TaskType
 from .services import EvaluationService, AnalyticsService
+from .catalog import get_catalog_payload
+from .health import get_health_monitor
+from .jobs import enqueue_speaking, enqueue_writing, ensure_workers_started, job_status_payload
+from .models import EvaluationJob, JobStatus
 
 logger = logging.getLogger(__name__)
 TEAM_NAME = "team7"
@@ -64,32 +66,36 @@ def submit_writing(request):
     
     Expects JSON:
         {
-            "user_id": "uuid",
             "question_id": "uuid",
             "text": "essay text..."
         }
+
+    The submission is stored for the authenticated user; a user_id in the body is ignored.
     
     Returns JSON with evaluation result and detailed scores.
     """
     try:
         data = json.loads(request.body)
-        user_id = data.get('user_id')
+        user_id = request.user.id
         question_id = data.get('question_id')
         text = data.get('text', '').strip()
 
         logger.info(f"submit_writing received: user_id={user_id}, question_id={question_id}, text_length={len(text)}")
 
         # Input validation
-        if not all([user_id, question_id, text]):
+        if not all([question_id, text]):
             logger.warning(f"Missing required fields in writing submission. user_id={user_id}, question_id={question_id}, has_text={bool(text)}")
             return JsonResponse({
                 "error": "INVALID_INPUT",
-                "message": "Missing user_id, question_id, or text"
+                "message": "Missing question_id or text"
             }, status=400)
 
-        # Call service orchestrator
-        service = EvaluationService()
-        result, status_code = service.evaluate_writing(user_id, question_id, text)
+        if getattr(settings, 'TEAM7_EVAL_ASYNC', True):
+            # Queue it; the client polls status_url for the evaluation.
+            result, status_code = enqueue_writing(user_id, question_id, text)
+        else:
+            service = EvaluationService()
+            result, status_code = service.evaluate_writing(user_id, question_id, text)
 
         logger.info(f"submit_writing result: status_code={status_code}")
         return JsonResponse(result, status=status_code)
@@ -108,6 +114,40 @@ def submit_writing(request):
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def soniox_webhook(request):
+    """Soniox completion callback: wakes the worker waiting on that transcription."""
+    from .asr import WEBHOOK_AUTH_HEADER, get_soniox_client
+
+    client = get_soniox_client()
+    if client.webhook_secret and request.headers.get(WEBHOOK_AUTH_HEADER) != client.webhook_secret:
+        return JsonResponse({"error": "FORBIDDEN"}, status=403)
+    try:
+        transcription_id = json.loads(request.body)["id"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return JsonResponse({"error": "INVALID_INPUT"}, status=400)
+
+    client.notify_completed(transcription_id)
+    return JsonResponse({"ok": True})
+
+
+@require_http_methods(["GET"])
+@api_login_required
+def evaluation_job_status(request, job_id):
+    """Status of a queued writing/speaking evaluation; includes the result once finished."""
+    job = EvaluationJob.objects.using('team7').filter(job_id=job_id, user_id=request.user.id).first()
+    if job is None:
+        return JsonResponse({
+            "error": "JOB_NOT_FOUND",
+            "message": "Invalid job ID"
+        }, status=404)
+    if job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+        # Resumes jobs queued before this process started.
+        ensure_workers_started()
+    return JsonResponse(job_status_payload(job))
+
+
 @require_http_methods(["GET"])
 @api_login_required
 def get_history(request, user_id=None):
@@ -151,25 +191,26 @@ def submit_speaking(request):
     """Controller endpoint for speaking submission (UC-02, FR-SP, FR-API-02).
     
     Expects multipart/form-data:
-        - user_id: UUID string
         - question_id: UUID string
         - audio_file: Audio file (webm, mp4, mp3, wav, flac, m4a, etc.)
+
+    The submission is stored for the authenticated user; a user_id field is ignored.
     
     Returns JSON with evaluation result, transcript, and detailed scores.
     """
     try:
         # Extract form data
-        user_id = request.POST.get('user_id')
+        user_id = request.user.id
         question_id = request.POST.get('question_id')
         
         logger.info(f"submit_speaking POST data: user_id={user_id}, question_id={question_id}, POST keys={list(request.POST.keys())}")
         
         # Input validation
-        if not all([user_id, question_id]):
+        if not question_id:
             logger.warning(f"Missing required fields in speaking submission. user_id={user_id}, question_id={question_id}")
             return JsonResponse({
                 "error": "INVALID_INPUT",
-                "message": "Missing user_id or question_id"
+                "message": "Missing question_id"
             }, status=400)
 
         # Check for audio file in request.FILES
@@ -185,14 +226,16 @@ def submit_speaking(request):
         # Log file info including content type
         logger.info(f"Received speaking submission: user={user_id}, question={question_id}, file={audio_file.name}, size={audio_file.size} bytes, content_type={audio_file.content_type}")
 
-        # Call service orchestrator
-        service = EvaluationService()
-        result, status_code = service.evaluate_speaking(
-            user_id=user_id,
-            question_id=question_id,
-            audio_file=audio_file,
-            audio_filename=audio_file.name
-        )
+        if getattr(settings, 'TEAM7_EVAL_ASYNC', True):
+            result, status_code = enqueue_speaking(user_id, question_id, audio_file)
+        else:
+            service = EvaluationService()
+            result, status_code = service.evaluate_speaking(
+                user_id=user_id,
+                question_id=question_id,
+                audio_file=audio_file,
+                audio_filename=audio_file.name
+            )
 
         return JsonResponse(result, status=status_code)
 
@@ -342,116 +385,11 @@ def admin_health(request):
         - System uptime statistics
     
     Returns comprehensive health status for admin dashboard.
+    The checks run in the background (team7.health); this view only serves
+    the latest snapshot, so frequent monitoring polls stay cheap.
     """
-    health_status = {
-        "service": "team7",
-        "timestamp": timezone.now().isoformat(),
-        "status": "healthy",
-        "checks": {}
-    }
-
-    # 1. Database Check
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-        
-        health_status["checks"]["database"] = {
-            "status": "healthy",
-            "message": "Database connection successful"
-        }
-    except Exception as e:
-        health_status["status"] = "degraded"
-        health_status["checks"]["database"] = {
-            "status": "unhealthy",
-            "message": f"Database error: {str(e)}"
-        }
-        logger.error(f"Database health check failed: {str(e)}")
-
-    # 2. External AI Service Check (LLM)
-    try:
-        from django.conf import settings
-        from openai import OpenAI
-        
-        client = OpenAI(
-            api_key="g4a-1rcT4Qz2aq7XJT_qGXaoPavi8YyDzpuYfzHPzmEa8so",
-            base_url="https://api.gpt4-all.xyz/v1"
-        )
-        
-        # Quick ping to LLM service (with timeout)
-        models = client.models.list()
-        
-        health_status["checks"]["llm_service"] = {
-            "status": "healthy",
-            "message": "LLM API accessible",
-            "models_available": len(models.data) if hasattr(models, 'data') else 0
-        }
-    except Exception as e:
-        health_status["status"] = "degraded"
-        health_status["checks"]["llm_service"] = {
-            "status": "unhealthy",
-            "message": f"LLM service error: {str(e)}"
-        }
-        logger.warning(f"LLM service health check failed: {str(e)}")
-
-    # 3. API Performance Metrics (last 24 hours)
-    try:
-        yesterday = timezone.now() - timedelta(hours=24)
-        recent_logs = APILog.objects.filter(timestamp__gte=yesterday)
-        
-        total_requests = recent_logs.count()
-        error_requests = recent_logs.filter(status_code__gte=400).count()
-        error_rate = (error_requests / total_requests * 100) if total_requests > 0 else 0
-        
-        # Calculate average latency
-        avg_latency = recent_logs.aggregate(
-            avg_latency=models.Avg('latency_ms')
-        )['avg_latency'] or 0
-        
-        # Get slowest endpoints
-        slow_endpoints = recent_logs.values('endpoint').annotate(
-            avg_latency=models.Avg('latency_ms'),
-            count=models.Count('log_id')
-        ).order_by('-avg_latency')[:5]
-        
-        health_status["checks"]["api_performance"] = {
-            "status": "healthy" if error_rate < 10 and avg_latency < 5000 else "degraded",
-            "total_requests_24h": total_requests,
-            "error_requests_24h": error_requests,
-            "error_rate": round(error_rate, 2),
-            "avg_latency_ms": round(avg_latency, 2),
-            "slowest_endpoints": list(slow_endpoints)
-        }
-        
-        # Update overall status based on error rate
-        if error_rate > 25:
-            health_status["status"] = "unhealthy"
-        elif error_rate > 10:
-            health_status["status"] = "degraded"
-            
-    except Exception as e:
-        health_status["checks"]["api_performance"] = {
-            "status": "unknown",
-            "message": f"Unable to calculate metrics: {str(e)}"
-        }
-        logger.error(f"API performance check failed: {str(e)}")
-
-    # 4. Database Statistics
-    try:
-        total_evaluations = Evaluation.objects.count()
-        total_questions = Question.objects.count()
-        evaluations_today = Evaluation.objects.filter(
-            created_at__gte=timezone.now().date()
-        ).count()
-        
-        health_status["checks"]["database_stats"] = {
-            "status": "info",
-            "total_evaluations": total_evaluations,
-            "total_questions": total_questions,
-            "evaluations_today": evaluations_today
-        }
-    except Exception as e:
-        logger.error(f"Database stats check failed: {str(e)}")
+    monitor = get_health_monitor()
+    health_status = {**monitor.current(), "snapshot_age_seconds": monitor.snapshot_age_seconds()}
 
     # Determine HTTP status code
     if health_status["status"] == "healthy":
@@ -467,6 +405,12 @@ def admin_health(request):
 def favicon(request):
     return HttpResponse(status=204)
 
+def _if_none_match(request):
+    """ETags listed in If-None-Match, weak ones compared by value."""
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
 @api_login_required
 @require_http_methods(["GET"])
 def list_exams(request):
@@ -512,77 +456,42 @@ def list_exams(request):
         exam_type = request.GET.get('exam_type')
         exam_id = request.GET.get('exam_id')
         
-        # Build query
-        query = Exam.objects.all()
-        
         if exam_id:
             # If specific exam requested, return just that one
             try:
-                import uuid
-                # Convert string to UUID if needed
-                exam_uuid = uuid.UUID(exam_id)
-                query = query.filter(exam_id=exam_uuid)
+                # Normalize to the catalog's key format
+                exam_id = str(uuid.UUID(exam_id))
             except (ValueError, TypeError) as e:
                 logger.error(f"Invalid exam_id format: {exam_id} - {str(e)}")
                 return JsonResponse({
                     "error": f"Invalid exam ID format: {str(e)}"
                 }, status=400)
+            exam_type = None
         elif exam_type:
             # If filtering by type
             if exam_type not in [TaskType.WRITING, TaskType.SPEAKING]:
                 return JsonResponse({
                     "error": f"Invalid exam_type. Must be '{TaskType.WRITING}' or '{TaskType.SPEAKING}'"
                 }, status=400)
-            query = query.filter(exam_type=exam_type)
         
-        # Build response with exams and their questions
-        exams_data = []
-        for exam in query.order_by('title'):
-            questions_data = []
-            
-            # Determine badge and instruction based on exam type
-            if exam.exam_type == TaskType.WRITING:
-                badge = 'TOEFL Writing Exam'
-                instruction = 'Instructions: Read the topic carefully and write your response in a logical and clear manner.'
-            else:  # SPEAKING
-                badge = 'TOEFL Speaking Exam'
-                instruction = 'Instructions: Read the topic carefully and speak about it with clarity and fluency.'
-            
-            for question in exam.questions.all():
-                questions_data.append({
-                    "id": str(question.question_id),
-                    "title": question.title or f"Question {question.question_id}",
-                    "badge": badge,
-                    "instruction": instruction,
-                    "content": question.prompt_text,
-                    "requirements": question.requirements if question.requirements else [],
-                    "tips": question.tips if question.tips else [],
-                    "preparationTime": 45,
-                    "speakingTime": 120 if exam.exam_type == 'speaking' else None,
-                    "task_type": question.task_type,
-                    "mode": question.mode,
-                    "resource_url": question.resource_url
-                })
-            
-            exams_data.append({
-                "id": str(exam.exam_id),
-                "title": exam.title,
-                "type": exam.exam_type,
-                "totalQuestions": exam.total_questions,
-                "totalTime": exam.total_time,
-                "difficulty": exam.difficulty,
-                "questions": questions_data
-            })
+        # Pre-serialized catalog payload (team7.catalog)
+        payload = get_catalog_payload(exam_type, exam_id)
         
         # If specific exam not found
-        if exam_id and not exams_data:
+        if payload is None:
             return JsonResponse({
                 "error": f"Exam {exam_id} not found"
             }, status=404)
         
-        return JsonResponse({
-            "exams": exams_data
-        })
+        body, etag = payload
+        client_etags = _if_none_match(request)
+        if etag in client_etags or "*" in client_etags:
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
     except Exception as e:
         logger.exception(f"Error in list_exams: {str(e)}")
         return JsonResponse({